@@ -11,7 +11,6 @@ from bd.database import DatabaseConnection
 from dao.aluno_dao import AlunoDAO
 from dao.nivel_dao import NivelDAO
 from model.aluno_class import Aluno
-from model.parametros_class import Parametros
 
 
 class AlunoService:
@@ -84,13 +83,11 @@ class AlunoService:
             print("❌ Erro: O contato não pode ser vazio!")
             return
         
-        # Verificar se já existe uma aluno com esse contato
-        alunosExistentes = self.__alunoDao.buscarPorNome("")  # Buscar todas para verificar contato
-        todosAlunos = self.__alunoDao.listarTodas()
-        for a in todosAlunos:
-            if a.contato.lower() == contato.lower():
-                print(f"❌ Erro: Já existe uma aluno com o contato '{contato}' (ID: {a.id})")
-                return
+        # Verificar se já existe uma aluno com esse contato (consulta indexada de uma linha)
+        alunoExistente = self.__alunoDao.buscarPorContato(contato)
+        if alunoExistente:
+            print(f"❌ Erro: Já existe uma aluno com o contato '{contato}' (ID: {alunoExistente.id})")
+            return
         
         # Selecionar nivel
         nivel = self.selecionarNivel()
@@ -100,6 +97,11 @@ class AlunoService:
         # Campos opcionais        
         ativoStr = input("Aluno está ativa? (S/n): ").strip().lower()
         ativo = ativoStr != 'n'
+
+        tipoConducao = input("Tipo de condução (ex.: condutor, conduzido): ").strip().lower()
+        if not tipoConducao:
+            print("❌ Erro: O tipo de condução não pode ser vazio!")
+            return
         
         try:
             aluno = Aluno(
@@ -108,7 +110,7 @@ class AlunoService:
                 contato=contato,
                 nivel=nivel,
                 ativo=ativo,
-                tipoConducao=Parametros
+                tipoConducao=tipoConducao
             )
             
             alunoId = self.__alunoDao.salvar(aluno)
@@ -133,22 +135,24 @@ class AlunoService:
         print("\n--- LISTAR TODOS OS ALUNOS ---")
         
         try:
-            alunos = self.__alunoDao.listarTodas()
+            # Gerador: cada linha é impressa assim que chega, sem carregar todos os alunos
+            total = 0
+            for aluno in self.__alunoDao.iterar():
+                if total == 0:
+                    print("\n" + "-"*80)
+                    print(f"{'ID':<5} | {'Nome':<25} | {'Contato':<25} | {'Nivel':<15} | {'Status':<8}")
+                    print("-"*80)
+                
+                status = "Ativa" if aluno.ativo else "Inativa"
+                print(f"{aluno.id:<5} | {aluno.nome[:24]:<25} | {aluno.contato[:24]:<25} | {aluno.nivel.nome[:14]:<15} | {status:<8}")
+                total += 1
             
-            if not alunos:
+            if total == 0:
                 print("⚠️  Nenhuma aluno cadastrado.")
                 return
             
-            print(f"\nTotal de alunos: {len(alunos)}")
-            print("\n" + "-"*80)
-            print(f"{'ID':<5} | {'Nome':<25} | {'Contato':<25} | {'Nivel':<15} | {'Status':<8}")
-            print("-"*80)
-            
-            for aluno in alunos:
-                status = "Ativa" if aluno.ativo else "Inativa"
-                print(f"{aluno.id:<5} | {aluno.nome[:24]:<25} | {aluno.contato[:24]:<25} | {aluno.nivel.nome[:14]:<15} | {status:<8}")
-            
             print("-"*80)
+            print(f"Total de alunos: {total}")
         
         except Exception as e:
             print(f"❌ Erro ao listar alunos: {e}")
@@ -261,11 +265,10 @@ class AlunoService:
             novoContato = input(f"Contato [{aluno.contato}]: ").strip()
             if novoContato:
                 # Verificar se já existe outra aluno com esse contato
-                todosAlunos = self.__alunoDao.listarTodas()
-                for a in todosAlunos:
-                    if a.id != alunoId and a.contato.lower() == novoContato.lower():
-                        print(f"❌ Erro: Já existe outra aluno com o contato '{novoContato}' (ID: {a.id})")
-                        return
+                outro = self.__alunoDao.buscarPorContato(novoContato)
+                if outro and outro.id != alunoId:
+                    print(f"❌ Erro: Já existe outra aluno com o contato '{novoContato}' (ID: {outro.id})")
+                    return
                 aluno.contato = novoContato
             
             # Nivel
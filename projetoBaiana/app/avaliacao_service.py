@@ -9,14 +9,26 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from bd.database import DatabaseConnection
 from dao.avaliacao_dao import AvaliacaoDAO
+from dao.estiloDanca_dao import EstiloDancaDAO
+from dao.evento_dao import EventoDAO
+from dao.itemAvaliacao_dao import ItemAvaliacaoDAO
+from dao.nivel_dao import NivelDAO
 from model.avaliacao_class import Avaliacao
 
+# Faixa aceita no lançamento de notas
+NOTA_MINIMA = 0
+NOTA_MAXIMA = 10
+
 
 class AvaliacaoService:
     
     def __init__(self, db: DatabaseConnection):
         self.__db = db
         self.__avaliacaoDao = AvaliacaoDAO(db)
+        self.__eventoDao = EventoDAO(db)
+        self.__nivelDao = NivelDAO(db)
+        self.__estiloDancaDao = EstiloDancaDAO(db)
+        self.__itemAvaliacaoDao = ItemAvaliacaoDAO(db)
     
     def exibirMenu(self):
         """Exibe o menu principal de opções"""
@@ -29,6 +41,8 @@ class AvaliacaoService:
         print("4. Buscar avaliação por data")
         print("5. Atualizar avaliação")
         print("6. Deletar avaliação")
+        print("7. Gerar fichas de um evento")
+        print("8. Lançar notas (grade alunos x parâmetros)")
         print("0. Sair")
         print("="*50)
     
@@ -207,6 +221,225 @@ class AvaliacaoService:
         except Exception as e:
             print(f"❌ Erro ao deletar avaliacao: {e}")
     
+    def gerarFichas(self):
+        """Cria de uma vez as avaliações (com itens sem nota) de todos os alunos ativos de um nível num evento"""
+        print("\n--- GERAR FICHAS DE UM EVENTO ---")
+        
+        try:
+            eventoId = int(input("Digite o ID do evento: ").strip())
+            evento = self.__eventoDao.buscarPorId(eventoId)
+            if not evento:
+                print(f"⚠️  Evento com ID {eventoId} não encontrado.")
+                return
+            
+            nivelId = int(input("Digite o ID do nível: ").strip())
+            nivel = self.__nivelDao.buscarPorId(nivelId)
+            if not nivel:
+                print(f"⚠️  Nível com ID {nivelId} não encontrado.")
+                return
+            
+            estiloStr = input("Digite o ID do estilo (Enter para todos): ").strip()
+            estilo = None
+            if estiloStr:
+                estilo = self.__estiloDancaDao.buscarPorId(int(estiloStr))
+                if not estilo:
+                    print(f"⚠️  Estilo com ID {estiloStr} não encontrado.")
+                    return
+            
+            data = input("Digite a data das avaliações (Enter para a data do evento): ").strip() or evento.dataEvento
+            
+            ids, quantidadeItens = self.__avaliacaoDao.gerarFichas(eventoId, nivelId, data,
+                                                                  estiloId=estilo.id if estilo else None)
+            
+            if not ids:
+                print("⚠️  Nenhuma ficha gerada: todos os alunos ativos do nível já têm avaliação neste evento.")
+                return
+            
+            print(f"\n✅ Fichas geradas com sucesso!")
+            print(f"   Evento: {evento.nome}")
+            print(f"   Nível: {nivel.nome}")
+            print(f"   Estilo: {estilo.nome if estilo else 'todos'}")
+            print(f"   Avaliações criadas: {len(ids)}")
+            print(f"   Itens a avaliar: {quantidadeItens}")
+        
+        except ValueError:
+            print("❌ Erro: ID deve ser um número inteiro!")
+        except Exception as e:
+            print(f"❌ Erro ao gerar fichas: {e}")
+    
+    def lancarNotas(self):
+        """Grade alunos x parâmetros de um evento: uma linha de notas por entrada, gravada
+        em lote (por linha ou a ficha inteira de uma vez), com desfazer"""
+        print("\n--- LANÇAR NOTAS (GRADE) ---")
+        
+        try:
+            eventoId = int(input("Digite o ID do evento: ").strip())
+            nivelStr = input("Digite o ID do nível (Enter para todos): ").strip()
+            nivelId = int(nivelStr) if nivelStr else None
+        except ValueError:
+            print("❌ Erro: ID deve ser um número inteiro!")
+            return
+        
+        try:
+            colunas, linhas = self.__montarGrade(self.__itemAvaliacaoDao.notasDoEvento(eventoId, nivelId))
+            if not linhas:
+                print("⚠️  Nenhuma ficha com itens neste evento (use 'Gerar fichas de um evento').")
+                return
+            
+            modo = input("Gravar (1) a cada linha ou (2) a ficha inteira no final? [1]: ").strip() or '1'
+            porLinha = modo != '2'
+            
+            # historico: lotes já gravados [(itemId, notaAnterior, notaNova), ...];
+            # pendentes: linhas digitadas e ainda não gravadas (só no modo ficha inteira)
+            historico, pendentes = [], []
+            self.__exibirGrade(colunas, linhas)
+            print(f"\nDigite: <nº da linha> <notas de {NOTA_MINIMA} a {NOTA_MAXIMA} na ordem das colunas> "
+                  f"('-' mantém a nota)")
+            print("Comandos: v = ver grade | d = desfazer" + (" | g = gravar ficha" if not porLinha else "")
+                  + " | s = sair")
+            
+            while True:
+                entrada = input("\nNotas> ").strip().lower()
+                
+                if entrada == 's':
+                    if pendentes and input(f"⚠️  {len(pendentes)} linha(s) não gravada(s) serão descartadas. "
+                                           "Sair mesmo? (s/N): ").strip().lower() != 's':
+                        continue
+                    break
+                elif entrada == 'v':
+                    self.__exibirGrade(colunas, linhas)
+                elif entrada == 'd':
+                    if pendentes:
+                        self.__aplicar(linhas, pendentes.pop(), desfazer=True)
+                        print("↩️  Última linha descartada (não estava gravada).")
+                    elif historico:
+                        lote = historico[-1]
+                        # Em ordem inversa: um item alterado duas vezes no lote volta ao valor
+                        # de antes da primeira alteração (a última gravação prevalece)
+                        if not self.__gravar((itemId, anterior) for itemId, anterior, _ in reversed(lote)):
+                            continue
+                        historico.pop()
+                        self.__aplicar(linhas, lote, desfazer=True)
+                        print(f"↩️  Desfeito: {len(lote)} nota(s) voltaram ao valor anterior.")
+                    else:
+                        print("⚠️  Nada para desfazer.")
+                elif entrada == 'g' and not porLinha:
+                    if not pendentes:
+                        print("⚠️  Nenhuma linha pendente.")
+                        continue
+                    lote = [alteracao for linha in pendentes for alteracao in linha]
+                    if not self.__gravar((itemId, nova) for itemId, _, nova in lote):
+                        print(f"⚠️  As {len(pendentes)} linha(s) continuam pendentes; tente 'g' de novo.")
+                        continue
+                    historico.append(lote)
+                    print(f"✅ Ficha gravada: {len(pendentes)} linha(s), {len(lote)} nota(s) numa única transação.")
+                    pendentes.clear()
+                elif entrada:
+                    alteracoes = self.__lerLinha(entrada, colunas, linhas)
+                    if alteracoes is None:
+                        continue
+                    if not alteracoes:
+                        print("⚠️  Nenhuma nota alterada.")
+                        continue
+                    if porLinha:
+                        # Grade e histórico só mudam depois que o banco aceitou a linha
+                        if not self.__gravar((itemId, nova) for itemId, _, nova in alteracoes):
+                            continue
+                        self.__aplicar(linhas, alteracoes)
+                        historico.append(alteracoes)
+                        print(f"✅ {len(alteracoes)} nota(s) gravada(s).")
+                    else:
+                        # Pendente: aparece na grade, mas só vai para o banco com 'g'
+                        self.__aplicar(linhas, alteracoes)
+                        pendentes.append(alteracoes)
+                        print(f"📝 Linha registrada ({len(pendentes)} pendente(s); 'g' grava a ficha).")
+        
+        except Exception as e:
+            print(f"❌ Erro ao lançar notas: {e}")
+    
+    def __montarGrade(self, rows):
+        """colunas: [(parametroId, nome)]; linhas: [(aluno, {parametroId: [itemId, nota]})]"""
+        parametros, linhas, porAvaliacao = {}, [], {}
+        for row in rows:
+            parametros[row['parametro_id']] = row['parametro']
+            if row['avaliacao_id'] not in porAvaliacao:
+                porAvaliacao[row['avaliacao_id']] = {}
+                linhas.append((row['aluno'], porAvaliacao[row['avaliacao_id']]))
+            porAvaliacao[row['avaliacao_id']][row['parametro_id']] = [row['item_id'], row['nota']]
+        
+        colunas = sorted(parametros.items(), key=lambda p: (p[1], p[0]))
+        return colunas, linhas
+    
+    def __exibirGrade(self, colunas, linhas):
+        largura = 8
+        print("\n" + "-"*(36 + (largura + 1)*len(colunas)))
+        print(f"{'Nº':<4} | {'Aluno':<28}|" + "|".join(f"{nome[:largura]:^{largura}}" for _, nome in colunas))
+        print("-"*(36 + (largura + 1)*len(colunas)))
+        for numero, (aluno, itens) in enumerate(linhas, start=1):
+            celulas = []
+            for parametroId, _ in colunas:
+                item = itens.get(parametroId)
+                # '·' = o aluno não tem esse parâmetro; '-' = ainda sem nota
+                celulas.append("·" if item is None else ("-" if item[1] is None else str(item[1])))
+            print(f"{numero:<4} | {aluno[:27]:<28}|" + "|".join(f"{c:^{largura}}" for c in celulas))
+        print("-"*(36 + (largura + 1)*len(colunas)))
+    
+    def __lerLinha(self, entrada, colunas, linhas):
+        """Valida '<nº> n1 n2 ...'; retorna [(itemId, notaAnterior, notaNova)] ou None se inválida"""
+        partes = entrada.split()
+        try:
+            numero = int(partes[0])
+        except ValueError:
+            print("❌ Erro: comece a linha pelo número do aluno na grade!")
+            return None
+        if not 1 <= numero <= len(linhas):
+            print(f"❌ Erro: linha {numero} não existe (1 a {len(linhas)}).")
+            return None
+        
+        aluno, itens = linhas[numero - 1]
+        celulas = [itens[parametroId] for parametroId, _ in colunas if parametroId in itens]
+        notas = partes[1:]
+        if len(notas) != len(celulas):
+            print(f"❌ Erro: {aluno} tem {len(celulas)} parâmetro(s), foram digitadas {len(notas)} nota(s).")
+            return None
+        
+        alteracoes = []
+        for (itemId, anterior), texto in zip(celulas, notas):
+            if texto == '-':
+                continue
+            try:
+                nota = int(texto)
+            except ValueError:
+                nota = None
+            if nota is None or not NOTA_MINIMA <= nota <= NOTA_MAXIMA:
+                print(f"❌ Erro: nota inválida '{texto}' (use inteiros de {NOTA_MINIMA} a {NOTA_MAXIMA}). Linha não registrada.")
+                return None
+            if nota != anterior:
+                alteracoes.append((itemId, anterior, nota))
+        return alteracoes
+    
+    def __gravar(self, notas):
+        """Grava [(itemId, nota)] numa única transação. Se o banco recusar, avisa e retorna
+        False: nada foi gravado e o lançamento continua."""
+        try:
+            self.__itemAvaliacaoDao.atualizarNotas(notas)
+            return True
+        except Exception as e:
+            print(f"❌ Erro ao gravar notas (nada foi gravado): {e}")
+            return False
+    
+    def __aplicar(self, linhas, alteracoes, desfazer: bool = False):
+        # Mantém a grade em memória igual ao que foi gravado/desfeito. Ao desfazer percorre
+        # de trás para frente, para que prevaleça o anterior da primeira alteração de cada item
+        if desfazer:
+            valores = {itemId: anterior for itemId, anterior, _ in reversed(alteracoes)}
+        else:
+            valores = {itemId: nova for itemId, _, nova in alteracoes}
+        for _, itens in linhas:
+            for item in itens.values():
+                if item[0] in valores:
+                    item[1] = valores[item[0]]
+    
     def executar(self):
         """Método principal que executa o loop do menu"""
         try:
@@ -229,6 +462,10 @@ class AvaliacaoService:
                     self.atualizarAvaliacao()
                 elif opcao == '6':
                     self.deletarAvaliacao()
+                elif opcao == '7':
+                    self.gerarFichas()
+                elif opcao == '8':
+                    self.lancarNotas()
                 else:
                     print("❌ Opção inválida! Tente novamente.")
                 
@@ -91,7 +91,8 @@ class EventoService:
         print("\n--- LISTAR TODOS OS EVENTOS ---")
         
         try:
-            eventos = self.__eventoDao.listarTodas()
+            # Só as colunas exibidas, como registros leves (sem montar objetos Evento)
+            eventos = self.__eventoDao.consulta().selecionar('id', 'nome', 'dataEvento').ordenarPor('dataEvento').registros()
             
             if not eventos:
                 print("⚠️  Nenhum evento cadastrado.")
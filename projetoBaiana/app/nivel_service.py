@@ -42,17 +42,15 @@ class NivelService:
             return
         
         try:
-            # Verificar se já existe um nivel com esse nome
-            nivelExistente = self.__nivelDao.buscarPorNome(nome)
-            if nivelExistente:
+            # Criar nova nivel: o INSERT atômico já recusa nome repetido, sem consulta prévia
+            nivel = Nivel(id=None, nome=nome)
+            if not self.__nivelDao.inserirSeNovo(nivel):
+                nivelExistente = self.__nivelDao.buscarPorNome(nome)
                 print(f"❌ Erro: Já existe um nivel com o nome '{nome}' (ID: {nivelExistente.id})")
                 return
             
-            # Criar nova nivel
-            nivel = Nivel(id=None, nome=nome)
-            nivelId = self.__nivelDao.salvar(nivel)
             print(f"✅ Nivel criada com sucesso!")
-            print(f"   ID: {nivelId}")
+            print(f"   ID: {nivel.id}")
             print(f"   Nome: {nivel.nome}")
         
         except Exception as e:
@@ -0,0 +1,304 @@
+"""
+Serviço de promoção de alunos entre níveis: lê em lote as notas de um ou mais eventos
+(uma temporada inteira numa passada só), aplica os critérios de cada nível sobre as
+colunas de notas e grava todas as trocas de nível numa única transação
+"""
+import sys
+import os
+from collections import namedtuple
+
+# Adicionar o diretório pai ao path para permitir imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import numpy as np
+except ImportError:
+    # NumPy é opcional: sem ele o cálculo é feito em Python puro
+    np = None
+
+from bd.database import DatabaseConnection
+from dao.aluno_dao import AlunoDAO
+from dao.nivel_dao import NivelDAO
+from dao.notasColunares_dao import NotasColunaresDAO
+
+# Critério de um nível: média ponderada mínima, menor nota aceita em qualquer item,
+# quantidade mínima de avaliações e nível de destino. O destino é obrigatório em calcular():
+# a tabela nivel não guarda ordem de progressão, e a ordem dos ids é só a de cadastro.
+RegraPromocao = namedtuple('RegraPromocao', 'mediaMinima notaMinima avaliacoesMinimas destino',
+                           defaults=(None, 1, None))
+# Uma troca de nível decidida pelo cálculo
+Promocao = namedtuple('Promocao', 'alunoId nivelAtual nivelNovo media notaMinima avaliacoes')
+
+# Critérios sugeridos no menu (o destino é sempre informado pelo usuário)
+CRITERIOS_SUGERIDOS = RegraPromocao(mediaMinima=7.0)
+
+
+class PromocaoService:
+    
+    def __init__(self, db: DatabaseConnection, usarNumpy: bool | None = None):
+        """usarNumpy=None usa NumPy se estiver instalado"""
+        if usarNumpy and np is None:
+            raise ValueError("NumPy não está instalado")
+        self.__db = db
+        self.__numpy = np is not None if usarNumpy is None else usarNumpy
+        self.__alunoDao = AlunoDAO(db)
+        self.__nivelDao = NivelDAO(db)
+        self.__notasDao = NotasColunaresDAO(db)
+    
+    def calcular(self, eventoIds=None, regras: dict | None = None, regraPadrao: RegraPromocao | None = None):
+        """Simulação (nada é gravado): decide quem sobe de nível com as notas dos eventos
+        indicados (todos, se None). regras: {nivelId: RegraPromocao}, cada uma com o nível de
+        destino explícito; níveis sem regra usam regraPadrao (None = não promove).
+        Retorna (promoções, {nivelId: (avaliados, promovidos)})."""
+        regras = regras or {}
+        niveis = {row[0] for row in self.__nivelDao.consulta().selecionar('id').tuplas()}
+        for nivelId, regra in (*regras.items(), (None, regraPadrao)):
+            if regra is None:
+                continue
+            origem = f" do nível {nivelId}" if nivelId is not None else " padrão"
+            if regra.destino is None:
+                raise ValueError(f"Regra de promoção{origem} sem nível de destino")
+            if regra.destino not in niveis:
+                raise ValueError(f"Regra de promoção{origem}: nível de destino {regra.destino} não existe")
+        
+        def regraDo(nivelId):
+            regra = regras.get(nivelId, regraPadrao)
+            # Quem já está no nível de destino não é "promovido" para ele
+            return regra if regra is not None and regra.destino != nivelId else None
+        
+        colunas = self.__notasDao.carregarParaPromocao(eventoIds)
+        if self.__numpy:
+            alunos, niveis, medias, minimas, quantidades = self.__agregarNumpy(*colunas)
+            aprovados = self.__avaliarNumpy(niveis, medias, minimas, quantidades, regraDo)
+        else:
+            alunos, niveis, medias, minimas, quantidades = self.__agregarPython(*colunas)
+            aprovados = self.__avaliarPython(niveis, medias, minimas, quantidades, regraDo)
+        
+        promocoes = [Promocao(alunos[i], niveis[i], regraDo(niveis[i]).destino, medias[i], minimas[i], quantidades[i])
+                     for i in aprovados]
+        
+        resumo = {}
+        for nivelId in niveis:
+            avaliados, promovidos = resumo.get(nivelId, (0, 0))
+            resumo[nivelId] = (avaliados + 1, promovidos)
+        for promocao in promocoes:
+            avaliados, promovidos = resumo[promocao.nivelAtual]
+            resumo[promocao.nivelAtual] = (avaliados, promovidos + 1)
+        return promocoes, dict(sorted(resumo.items()))
+    
+    def aplicar(self, promocoes):
+        """Grava todas as trocas de nível numa única transação (executemany); retorna quantas
+        foram aplicadas (alunos que mudaram de nível depois do cálculo ficam de fora)"""
+        return self.__alunoDao.atualizarNiveis((p.alunoId, p.nivelAtual, p.nivelNovo) for p in promocoes)
+    
+    # Agregação por aluno: (alunos, niveis, medias, minimas, quantidades de avaliações)
+    
+    def __agregarPython(self, alunos, avaliacoes, niveis, notas, pesos):
+        # Uma passada só: [nível, soma dos pesos, soma ponderada, menor nota, avaliações]
+        acumulado = {}
+        for aluno, avaliacao, nivel, nota, peso in zip(alunos, avaliacoes, niveis, notas, pesos):
+            dados = acumulado.get(aluno)
+            if dados is None:
+                acumulado[aluno] = [nivel, peso, peso * nota, nota, {avaliacao}]
+            else:
+                dados[1] += peso
+                dados[2] += peso * nota
+                dados[3] = min(dados[3], nota)
+                dados[4].add(avaliacao)
+        
+        ids = sorted(acumulado)
+        return (ids, [acumulado[a][0] for a in ids],
+                [acumulado[a][2] / acumulado[a][1] if acumulado[a][1] else None for a in ids],
+                [acumulado[a][3] for a in ids], [len(acumulado[a][4]) for a in ids])
+    
+    def __agregarNumpy(self, alunos, avaliacoes, niveis, notas, pesos):
+        if not len(alunos):
+            return [], [], [], [], []
+        alunos, avaliacoes, niveis, notas = (np.frombuffer(c, dtype=np.intc).astype(np.int64)
+                                             for c in (alunos, avaliacoes, niveis, notas))
+        pesos = np.frombuffer(pesos, dtype=np.float64)
+        
+        ordem = np.argsort(alunos, kind='stable')
+        alunos, avaliacoes, niveis, notas, pesos = (c[ordem] for c in (alunos, avaliacoes, niveis, notas, pesos))
+        ids, inicios, grupo = np.unique(alunos, return_index=True, return_inverse=True)
+        
+        somaPesos = np.bincount(grupo, weights=pesos, minlength=len(ids))
+        somaPonderada = np.bincount(grupo, weights=pesos * notas, minlength=len(ids))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            medias = np.where(somaPesos > 0, somaPonderada / somaPesos, np.nan)
+        minimas = np.minimum.reduceat(notas, inicios)
+        # Avaliações distintas por aluno: pares (aluno, avaliação) únicos contados por aluno
+        base = int(avaliacoes.max()) + 1
+        pares = np.unique(grupo * base + avaliacoes)
+        quantidades = np.bincount(pares // base, minlength=len(ids))
+        
+        return (ids.tolist(), niveis[inicios].tolist(), medias.tolist(), minimas.tolist(),
+                quantidades.tolist())
+    
+    # Critérios: índices dos alunos aprovados
+    
+    def __avaliarPython(self, niveis, medias, minimas, quantidades, regraDo):
+        aprovados = []
+        for i, nivelId in enumerate(niveis):
+            regra = regraDo(nivelId)
+            if (regra is not None and medias[i] is not None and medias[i] >= regra.mediaMinima
+                    and (regra.notaMinima is None or minimas[i] >= regra.notaMinima)
+                    and quantidades[i] >= regra.avaliacoesMinimas):
+                aprovados.append(i)
+        return aprovados
+    
+    def __avaliarNumpy(self, niveis, medias, minimas, quantidades, regraDo):
+        if not niveis:
+            return []
+        niveis, medias, minimas, quantidades = (np.asarray(c, dtype=t) for c, t in
+                                                ((niveis, np.int64), (medias, np.float64),
+                                                 (minimas, np.float64), (quantidades, np.int64)))
+        # Tabelas de critérios indexadas pelo id do nível: uma comparação por coluna inteira
+        tamanho = int(niveis.max()) + 1
+        mediaMinima = np.full(tamanho, np.inf)
+        notaMinima = np.full(tamanho, -np.inf)
+        avaliacoesMinimas = np.zeros(tamanho)
+        for nivelId in np.unique(niveis).tolist():
+            regra = regraDo(nivelId)
+            if regra is not None:
+                mediaMinima[nivelId] = regra.mediaMinima
+                notaMinima[nivelId] = -np.inf if regra.notaMinima is None else regra.notaMinima
+                avaliacoesMinimas[nivelId] = regra.avaliacoesMinimas
+        
+        aprovados = ((medias >= mediaMinima[niveis]) & (minimas >= notaMinima[niveis])
+                     & (quantidades >= avaliacoesMinimas[niveis]))
+        return np.flatnonzero(aprovados).tolist()
+    
+    # Linha de comando
+    
+    def exibirMenu(self):
+        """Exibe o menu principal de opções"""
+        print("\n" + "="*50)
+        print("  PROMOÇÃO DE ALUNOS ENTRE NÍVEIS")
+        print("="*50)
+        print("1. Simular promoções (não grava nada)")
+        print("2. Aplicar promoções")
+        print("0. Sair")
+        print("="*50)
+    
+    def __lerCriterios(self):
+        """Pergunta eventos, níveis de origem e destino e critérios; retorna
+        (eventoIds, {origem: regra}) ou None se inválido"""
+        sugerido = CRITERIOS_SUGERIDOS
+        try:
+            texto = input("IDs dos eventos separados por vírgula (Enter para todos): ").strip()
+            eventoIds = [int(parte) for parte in texto.split(',') if parte.strip()] or None
+            origem = int(input("ID do nível de origem: ").strip())
+            destino = int(input("ID do nível de destino: ").strip())
+            media = input(f"Média mínima [{sugerido.mediaMinima}]: ").strip()
+            nota = input(f"Menor nota aceita em qualquer item [{sugerido.notaMinima or 'sem mínimo'}]: ").strip()
+            regra = sugerido._replace(mediaMinima=float(media) if media else sugerido.mediaMinima,
+                                      notaMinima=int(nota) if nota else sugerido.notaMinima,
+                                      destino=destino)
+            return eventoIds, {origem: regra}
+        except ValueError:
+            print("❌ Erro: use números (IDs inteiros, média e nota numéricas)!")
+            return None
+    
+    def __exibirRelatorio(self, promocoes, resumo):
+        niveis = {row[0]: row[1] for row in self.__nivelDao.consulta().selecionar('id', 'nome').tuplas()}
+        print("\n" + "-"*60)
+        print(f"{'Nível':<25} | {'Avaliados':>10} | {'Promovidos':>10}")
+        print("-"*60)
+        for nivelId, (avaliados, promovidos) in resumo.items():
+            print(f"{niveis.get(nivelId, nivelId)!s:<25} | {avaliados:>10} | {promovidos:>10}")
+        print("-"*60)
+        
+        if not promocoes:
+            print("⚠️  Nenhum aluno atingiu os critérios.")
+            return
+        
+        alunos = self.__alunoDao.buscarPorIds(p.alunoId for p in promocoes)
+        print(f"\n{'ID':<6} | {'Aluno':<30} | {'De':<12} | {'Para':<12} | {'Média':>6}")
+        print("-"*80)
+        for p in promocoes:
+            aluno = alunos.get(p.alunoId)
+            print(f"{p.alunoId:<6} | {(aluno.nome if aluno else '?')[:30]:<30} | "
+                  f"{niveis.get(p.nivelAtual, '?')[:12]:<12} | {niveis.get(p.nivelNovo, '?')[:12]:<12} | {p.media:>6.2f}")
+        print("-"*80)
+    
+    def simular(self, aplicar: bool = False):
+        """Calcula e mostra o relatório; com aplicar=True pede confirmação e grava"""
+        print("\n--- " + ("APLICAR" if aplicar else "SIMULAR") + " PROMOÇÕES ---")
+        criterios = self.__lerCriterios()
+        if criterios is None:
+            return
+        eventoIds, regras = criterios
+        
+        try:
+            promocoes, resumo = self.calcular(eventoIds, regras)
+            self.__exibirRelatorio(promocoes, resumo)
+            if not aplicar or not promocoes:
+                return
+            
+            confirmacao = input(f"\n⚠️  Promover {len(promocoes)} aluno(s)? (s/N): ").strip().lower()
+            if confirmacao != 's':
+                print("❌ Operação cancelada.")
+                return
+            
+            aplicadas = self.aplicar(promocoes)
+            print(f"\n✅ {aplicadas} aluno(s) promovido(s) numa única transação.")
+            if aplicadas < len(promocoes):
+                print(f"⚠️  {len(promocoes) - aplicadas} aluno(s) já tinham mudado de nível e foram ignorados.")
+        
+        except Exception as e:
+            print(f"❌ Erro ao calcular promoções: {e}")
+    
+    def executar(self):
+        """Método principal que executa o loop do menu"""
+        try:
+            while True:
+                self.exibirMenu()
+                opcao = input("\nEscolha uma opção: ").strip()
+                
+                if opcao == '0':
+                    print("\n👋 Encerrando o sistema...")
+                    break
+                elif opcao == '1':
+                    self.simular()
+                elif opcao == '2':
+                    self.simular(aplicar=True)
+                else:
+                    print("❌ Opção inválida! Tente novamente.")
+                
+                input("\nPressione Enter para continuar...")
+        
+        except KeyboardInterrupt:
+            print("\n\n👋 Sistema encerrado pelo usuário.")
+        except Exception as e:
+            print(f"\n❌ Erro inesperado: {e}")
+            import traceback
+            traceback.print_exc()
+
+
+def main():
+    """Função principal para executar o serviço"""
+    db = DatabaseConnection('exemplo_bd.db')
+    
+    try:
+        # Conectar ao banco
+        db.conectar()
+        
+        # Garantir que as tabelas existam
+        db.criarTabelas()
+        
+        # Criar e executar o serviço
+        service = PromocaoService(db)
+        service.executar()
+    
+    except Exception as e:
+        print(f"❌ Erro ao inicializar o sistema: {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        db.fechar()
+        print("✓ Conexão com banco de dados encerrada.")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,7 +13,6 @@ from dao.aluno_dao import AlunoDAO
 from dao.nivel_dao import NivelDAO
 from model.usuario_class import Usuario
 from model.aluno_class import Aluno
-from model.parametros_class import Parametros
 from model.nivel_class import Nivel
 
 
@@ -42,17 +41,19 @@ class UsuarioService:
     
     def listarAlunosDisponiveis(self):
         """Lista todas as alunos disponíveis para vincular a um usuário"""
-        alunos = self.__alunoDao.listarTodas()
+        # Só id/nome/contato, como registros leves: sem montar Aluno nem buscar o nivel
+        alunos = self.__alunoDao.consulta().selecionar('id', 'nome', 'contato').ordenarPor('nome').registros()
         if not alunos:
             print("⚠️  Nenhuma aluno cadastrada. Cadastre uma aluno primeiro!")
             return None
         
+        # Ids de quem já tem usuário (o id do usuário é o id do aluno), numa consulta só
+        comUsuario = {id for (id,) in self.__usuarioDao.consulta().selecionar('id').tuplas()}
+        
         print("\nAlunos disponíveis:")
         print("-"*50)
         for a in alunos:
-            # Verificar se já tem usuário
-            usuarioExistente = self.__usuarioDao.buscarPorAlunoId(a.id)
-            status = " (já tem usuário)" if usuarioExistente else ""
+            status = " (já tem usuário)" if a.id in comUsuario else ""
             print(f"  {a.id}. {a.nome} - {a.contato}{status}")
         print("-"*50)
         return alunos
@@ -133,13 +134,6 @@ class UsuarioService:
             print("❌ Erro: O contato não pode ser vazio!")
             return
         
-        # Verificar se já existe uma aluno com esse contato
-        todosAlunos = self.__alunoDao.listarTodas()
-        for a in todosAlunos:
-            if a.contato.lower() == contato.lower():
-                print(f"❌ Erro: Já existe um aluno com o contato '{contato}' (ID: {a.id})")
-                return
-        
         # Selecionar nivel
         nivel = self.selecionarNivel()
         if not nivel:
@@ -148,6 +142,11 @@ class UsuarioService:
         # Campos opcionais      
         ativoStr = input("Aluno está ativa? (S/n): ").strip().lower()
         ativo = ativoStr != 'n'
+
+        tipoConducao = input("Tipo de condução (ex.: condutor, conduzido): ").strip().lower()
+        if not tipoConducao:
+            print("❌ Erro: O tipo de condução não pode ser vazio!")
+            return
         
         # Dados de acesso do usuário
         login = input("Login: ").strip()
@@ -155,12 +154,6 @@ class UsuarioService:
             print("❌ Erro: O login não pode ser vazio!")
             return
         
-        # Verificar se já existe um usuário com esse login
-        usuarioExistente = self.__usuarioDao.buscarPorLogin(login)
-        if usuarioExistente:
-            print(f"❌ Erro: Já existe um usuário com o login '{login}' (ID: {usuarioExistente.id})")
-            return
-        
         senha = input("Senha: ").strip()
         if not senha:
             print("❌ Erro: A senha não pode ser vazia!")
@@ -173,29 +166,35 @@ class UsuarioService:
             return
         
         try:
-            # Criar o aluno primeiro (transparente para o usuário)
-            aluno = Aluno(
-                id=None,
-                nome=nome,
-                contato=contato,
-                nivel=nivel,
-                ativo=ativo,
-                tipoConducao=Parametros
-            )
-            
-            alunoId = self.__alunoDao.salvar(aluno)
-            
-            # Criar o usuário vinculado à aluno (transparente para o usuário)
-            usuario = Usuario(
-                id=None,
-                login=login,
-                senha=senha,
-                tipo=tipo,
-                aluno=aluno
-            )
-            
-            usuarioId = self.__usuarioDao.salvar(usuario)
-            print(f"\n✅ Usuário cadastrado com sucesso! (ID: {usuarioId})")
+            # Aluno e usuário são gravados juntos: um único commit, ou nada se algo falhar.
+            # Contato (sem diferenciar maiúsculas) e login repetidos são recusados pelos
+            # próprios INSERTs, sem consulta prévia.
+            with self.__db.transacao():
+                # Criar o aluno primeiro (transparente para o usuário)
+                aluno = Aluno(
+                    id=None,
+                    nome=nome,
+                    contato=contato,
+                    nivel=nivel,
+                    ativo=ativo,
+                    tipoConducao=tipoConducao
+                )
+                
+                if not self.__alunoDao.inserirSeNovo(aluno):
+                    raise ValueError(f"Já existe um aluno com o contato '{contato}'")
+                
+                # Criar o usuário vinculado à aluno (transparente para o usuário)
+                usuario = Usuario(
+                    id=None,
+                    login=login,
+                    senha=senha,
+                    tipo=tipo,
+                    aluno=aluno
+                )
+                
+                if not self.__usuarioDao.inserirSeNovo(usuario):
+                    raise ValueError(f"Já existe um usuário com o login '{login}'")
+            print(f"\n✅ Usuário cadastrado com sucesso! (ID: {usuario.id})")
             self.exibirDetalhesUsuario(usuario)
         
         except ValueError as e:
@@ -0,0 +1,42 @@
+"""
+Caches da sessão: valores derivados do banco (ex.: modelos de ficha de avaliação) montados
+uma vez por DatabaseConnection e descartados pelos DAOs quando as tabelas de origem mudam
+"""
+import threading
+
+
+class CacheSessao:
+    def __init__(self):
+        self.__valores = {}
+        # Versão por nome: uma montagem que cruzou com invalidar() não é guardada
+        self.__versoes = {}
+        self.__lock = threading.Lock()
+
+    def obter(self, nome: str, fabrica):
+        """Retorna o valor guardado em `nome` ou monta-o com fabrica() (fora do lock,
+        já que fabrica normalmente consulta o banco)"""
+        with self.__lock:
+            if nome in self.__valores:
+                return self.__valores[nome]
+            versao = self.__versoes.setdefault(nome, 0)
+
+        valor = fabrica()
+        with self.__lock:
+            if self.__versoes[nome] == versao:
+                valor = self.__valores.setdefault(nome, valor)
+        return valor
+
+    def atual(self, nome: str):
+        """Valor guardado em `nome`, sem montar (None se ainda não foi montado)"""
+        with self.__lock:
+            return self.__valores.get(nome)
+
+    def invalidar(self, *nomes: str):
+        """Descarta os caches indicados (todos, se nenhum nome for passado)"""
+        with self.__lock:
+            for nome in nomes or list(self.__versoes):
+                self.__valores.pop(nome, None)
+                self.__versoes[nome] = self.__versoes.get(nome, 0) + 1
+
+    def limpar(self):
+        self.invalidar()
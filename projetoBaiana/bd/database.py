@@ -1,139 +1,315 @@
 import sqlite3
+import threading
+from contextlib import contextmanager
+
+from bd.cache_sessao import CacheSessao
+from bd.mapa_identidade import MapaIdentidade
+from bd.migracoes import criarIndices, migrar
+from bd.pool_conexoes import PoolConexoes
+
+# Perfis de PRAGMA aplicados a cada conexão aberta pelo pool (na ordem listada).
+# cache_size negativo é em KiB; mmap_size em bytes; busy_timeout em ms.
+PERFIS_PRAGMA = {
+    # WAL com fsync a cada commit: nenhuma transação confirmada se perde
+    "durable": {
+        "busy_timeout": 5000,
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -16000,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+    },
+    # WAL + mmap: escritores de notas e leitores de relatórios em paralelo
+    "balanced": {
+        "busy_timeout": 5000,
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64000,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+    },
+    # Cargas em massa: sem fsync, cache grande (pode perder o último lote numa queda de energia)
+    "bulk-load": {
+        "busy_timeout": 30000,
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -256000,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+    },
+    # Relatórios: somente leitura, mmap grande e cache generoso
+    "read-only-reporting": {
+        "busy_timeout": 10000,
+        "query_only": "ON",
+        "synchronous": "NORMAL",
+        "cache_size": -128000,
+        "mmap_size": 1073741824,
+        "temp_store": "MEMORY",
+    },
+}
+
+PERFIL_PADRAO = "balanced"
+
+# Consultas representativas e o índice que o planejador deve escolher para cada uma
+CONSULTAS_INDEXADAS = [
+    ("SELECT * FROM aluno WHERE nivel_id = ? ORDER BY nome;", "idx_aluno_nivel_nome"),
+    ("SELECT id, nome FROM aluno ORDER BY nome;", "idx_aluno_nome"),
+    ("SELECT * FROM avaliacao WHERE aluno_id = ?;", "idx_avaliacao_aluno"),
+    ("SELECT * FROM avaliacao WHERE examinador_id = ?;", "idx_avaliacao_examinador"),
+    ("SELECT * FROM avaliacao WHERE evento_id = ?;", "idx_avaliacao_evento"),
+    ("SELECT * FROM avaliacao ORDER BY data;", "idx_avaliacao_data"),
+    ("SELECT parametro_id, nota FROM itemAvaliacao WHERE avaliacao_id = ?;", "idx_item_avaliacao"),
+    ("SELECT avaliacao_id, nota FROM itemAvaliacao WHERE parametro_id = ?;", "idx_item_parametro"),
+    ("SELECT * FROM parametros WHERE nivel_id = ?;", "idx_parametros_nivel"),
+    ("SELECT * FROM parametros WHERE estilo_id = ?;", "idx_parametros_estilo"),
+    ("SELECT parametro_id FROM parametro_estilo WHERE estilo_id = ?;", "idx_parametro_estilo_estilo"),
+    ("SELECT * FROM aluno WHERE contato = ? COLLATE NOCASE;", "idx_aluno_contato_nocase"),
+    ("SELECT * FROM examinador WHERE contato = ? COLLATE NOCASE;", "idx_examinador_contato_nocase"),
+]
 
 class DatabaseConnection:
-    def __init__(self, dbPath: str = 'exemplo_bd.db'):
+    def __init__(self, dbPath: str = 'exemplo_bd.db', tamanhoPool: int = 5, timeoutPool: float = 30.0,
+                 perfil: str = PERFIL_PADRAO):
+        if perfil not in PERFIS_PRAGMA:
+            raise ValueError(f"Perfil de PRAGMA desconhecido: '{perfil}' "
+                             f"(disponíveis: {', '.join(PERFIS_PRAGMA)})")
+        
         self.__dbPath = dbPath
-        self.__conn = None
+        self.__perfil = perfil
+        self.__tamanhoPool = tamanhoPool
+        self.__timeoutPool = timeoutPool
+        self.__pool = None
+        # Cada thread enxerga apenas a conexão que pegou emprestada do pool
+        self.__local = threading.local()
+        self.__lock = threading.Lock()
+        self.__mapaIdentidade = MapaIdentidade()
+        self.__cacheSessao = CacheSessao()
+    
+    def __configurarConexao(self, conn):
+        conn.execute("PRAGMA foreign_keys = ON")
+        for pragma, valor in PERFIS_PRAGMA[self.__perfil].items():
+            conn.execute(f"PRAGMA {pragma} = {valor}")
+    
+    @property
+    def perfil(self):
+        """Nome do perfil de PRAGMA usado nas conexões deste banco"""
+        return self.__perfil
+    
+    @property
+    def mapaIdentidade(self):
+        """Mapa de identidade da sessão (entidades de referência já carregadas)"""
+        return self.__mapaIdentidade
+    
+    def cacheSessao(self, nome: str, fabrica):
+        """Valor derivado do banco guardado na sessão: montado por fabrica() só na primeira
+        chamada (ou na primeira depois de invalidarCaches)"""
+        if any(getattr(self.__local, 'pendentes', ())):
+            # A transação desta thread tem alterações ainda não confirmadas (ver aoConfirmar):
+            # monta com a visão dela, sem ler nem guardar o valor compartilhado
+            return fabrica()
+        return self.__cacheSessao.obter(nome, fabrica)
+    
+    def cacheCarregado(self, nome: str):
+        """Valor do cache da sessão se já foi montado, senão None (para atualizá-lo no lugar)"""
+        return self.__cacheSessao.atual(nome)
+    
+    def invalidarCaches(self, *nomes: str):
+        """Descarta os caches da sessão indicados (todos, se nenhum nome for passado)"""
+        self.__cacheSessao.invalidar(*nomes)
+    
+    def aoConfirmar(self, funcao):
+        """Agenda funcao() para logo depois do COMMIT da transação desta thread (descartada se
+        ela, ou o savepoint em que foi agendada, for desfeita); fora de transação executa já.
+        É assim que os DAOs atualizam os caches da sessão, que são vistos por todas as threads."""
+        pendentes = getattr(self.__local, 'pendentes', None)
+        if pendentes:
+            pendentes[-1].append(funcao)
+        else:
+            funcao()
+    
+    def pragmasAtivos(self):
+        """Lê da conexão os valores efetivos dos PRAGMAs do perfil (para conferência em operação)"""
+        with self.conexao() as conn:
+            valores = {"perfil": self.__perfil}
+            for pragma in ("foreign_keys", *PERFIS_PRAGMA[self.__perfil]):
+                valores[pragma] = conn.execute(f"PRAGMA {pragma};").fetchone()[0]
+            return valores
+    
+    def __obterPool(self):
+        with self.__lock:
+            if self.__pool is None:
+                self.__pool = PoolConexoes(self.__dbPath, tamanho=self.__tamanhoPool,
+                                           timeout=self.__timeoutPool,
+                                           configurar=self.__configurarConexao)
+            return self.__pool
+    
+    @property
+    def pool(self):
+        return self.__obterPool()
     
     def conectar(self):
-        if self.__conn is None:
-            # isolation_level=None ativa autocommit (cada operação é commitada automaticamente)
-            self.__conn = sqlite3.connect(self.__dbPath, isolation_level=None)
-            self.__conn.row_factory = sqlite3.Row
-            self.__conn.execute("PRAGMA foreign_keys = ON")
-        return self.__conn
+        """Retorna a conexão da thread atual, fixando uma do pool se ainda não houver"""
+        conn = getattr(self.__local, 'conn', None)
+        if conn is None:
+            conn = self.__obterPool().obter()
+            self.__local.conn = conn
+        self.__local.fixada = True
+        return conn
+    
+    @contextmanager
+    def conexao(self, timeout: float | None = None):
+        """Empresta uma conexão do pool para a thread atual durante o bloco.
+        Chamadas aninhadas na mesma thread reaproveitam a mesma conexão; ela só volta ao
+        pool quando o último bloco que a usa termina, seja ele o primeiro a abrir ou não
+        (ex.: um gerador iterar() que acaba dentro de um transacao() aberto depois dele)."""
+        conn = getattr(self.__local, 'conn', None)
+        if conn is None:
+            conn = self.__obterPool().obter(timeout)
+            self.__local.conn = conn
+        self.__local.usos = getattr(self.__local, 'usos', 0) + 1
+        try:
+            yield conn
+        finally:
+            self.__local.usos -= 1
+            self.__devolverSeLivre()
+    
+    def __devolverSeLivre(self):
+        # Devolve a conexão da thread só se ninguém mais a usa: nenhum bloco conexao() aberto,
+        # nenhuma transação/savepoint pendente e não fixada por conectar()
+        conn = getattr(self.__local, 'conn', None)
+        if (conn is None or getattr(self.__local, 'usos', 0) > 0 or getattr(self.__local, 'fixada', False)
+                or getattr(self.__local, 'profundidade', 0) > 0):
+            return
+        self.__local.conn = None
+        self.__obterPool().devolver(conn)
+    
+    @contextmanager
+    def usarCursor(self):
+        """Cursor sobre a conexão emprestada à thread atual (uso: with db.usarCursor() as cur)"""
+        with self.conexao() as conn:
+            yield conn.cursor()
+    
+    @contextmanager
+    def transacao(self, imediata: bool = True):
+        """Unidade de trabalho: tudo dentro do bloco é gravado com um único COMMIT
+        ou desfeito junto se ocorrer um erro. Blocos aninhados viram SAVEPOINTs."""
+        with self.conexao() as conn:
+            profundidade = getattr(self.__local, 'profundidade', 0)
+            savepoint = f"sp_{profundidade}"
+            
+            if profundidade == 0:
+                # IMMEDIATE pega o lock de escrita logo no início e evita deadlock de upgrade no WAL
+                conn.execute("BEGIN IMMEDIATE;" if imediata else "BEGIN;")
+            else:
+                conn.execute(f"SAVEPOINT {savepoint};")
+            
+            self.__local.profundidade = profundidade + 1
+            # Uma lista de aoConfirmar() por nível de aninhamento
+            if profundidade == 0:
+                self.__local.pendentes = []
+            self.__local.pendentes.append([])
+            try:
+                yield conn
+            except BaseException:
+                self.__local.pendentes.pop()
+                if profundidade == 0:
+                    conn.execute("ROLLBACK;")
+                else:
+                    conn.execute(f"ROLLBACK TO {savepoint};")
+                    conn.execute(f"RELEASE {savepoint};")
+                # Instâncias e caches montados dentro do bloco podem refletir alterações
+                # desfeitas (vale também para o rollback de um savepoint)
+                self.__mapaIdentidade.limpar()
+                self.__cacheSessao.limpar()
+                raise
+            else:
+                confirmados = self.__local.pendentes.pop()
+                if profundidade == 0:
+                    try:
+                        conn.execute("COMMIT;")
+                    except sqlite3.Error:
+                        if conn.in_transaction:
+                            conn.execute("ROLLBACK;")
+                        self.__mapaIdentidade.limpar()
+                        self.__cacheSessao.limpar()
+                        raise
+                    for funcao in confirmados:
+                        funcao()
+                else:
+                    conn.execute(f"RELEASE {savepoint};")
+                    # Só valem quando a transação externa for confirmada
+                    self.__local.pendentes[-1].extend(confirmados)
+            finally:
+                self.__local.profundidade = profundidade
+    
+    @property
+    def emTransacao(self):
+        """Indica se a thread atual está dentro de um bloco transacao()"""
+        return getattr(self.__local, 'profundidade', 0) > 0
+    
+    def inserirVarios(self, sql: str, linhas):
+        """Executa um INSERT em lote (executemany) numa transação e retorna os ids gerados,
+        na mesma ordem das linhas de entrada"""
+        linhas = list(linhas)
+        if not linhas:
+            return []
+        
+        with self.transacao() as conn:
+            conn.executemany(sql, linhas)
+            ultimoId = conn.execute("SELECT last_insert_rowid();").fetchone()[0]
+        
+        # Com o lock de escrita da transação ninguém intercala inserts, então os
+        # rowids do lote são consecutivos e terminam em last_insert_rowid()
+        return list(range(ultimoId - len(linhas) + 1, ultimoId + 1))
+    
+    def executarVarios(self, sql: str, linhas):
+        """Executa um UPDATE/DELETE em lote (executemany) numa transação; retorna as linhas afetadas"""
+        linhas = list(linhas)
+        if not linhas:
+            return 0
+        
+        with self.transacao() as conn:
+            return conn.executemany(sql, linhas).rowcount
+    
+    def liberar(self):
+        """Devolve ao pool a conexão fixada na thread atual por conectar()
+        (se um bloco conexao() ainda a usa, ela volta quando ele terminar)"""
+        self.__local.fixada = False
+        self.__devolverSeLivre()
     
     def fechar(self):
         """Fecha a conexão com o banco de dados"""
-        if self.__conn:
-            self.__conn.close()
-            self.__conn = None
-    
-
+        self.liberar()
+        with self.__lock:
+            if self.__pool is not None:
+                self.__pool.fechar()
+                self.__pool = None
     
     def cursor(self):
         """Retorna um cursor para executar queries"""
-        if self.__conn is None:
-            self.conectar()
-        return self.__conn.cursor()
+        return self.conectar().cursor()
 
     def criarTabelas(self):
-        cur = self.cursor()
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS aluno(
-                id INTEGER PRIMARY KEY AUTOINCREMENT,  
-                nome TEXT NOT NULL,  
-                nivel_id INTEGER,  
-                contato TEXT NOT NULL UNIQUE,  
-                tipoConducao TEXT NOT NULL UNIQUE,
-                ativo INTEGER DEFAULT 1, 
-                FOREIGN KEY (nivel_id) REFERENCES nivel(nivel_id),
-                FOREIGN KEY (tipoConducao) REFERENCES parametros(tipoConducao)
-            );
-            """
-        )
-        
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS nivel(
-                id INTEGER PRIMARY KEY AUTOINCREMENT,  
-                nome TEXT NOT NULL UNIQUE
-            );
-        """)
-
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS avaliacao(
-                id INTEGER PRIMARY KEY AUTOINCREMENT,  
-                data TEXT,  
-                aluno_id INTEGER,  
-                obs TEXT,  
-                nivel_id INTEGER,  
-                examinador_id INTEGER,  
-                evento_id INTEGER,
-                FOREIGN KEY(aluno_id) REFERENCES aluno (aluno_id),
-                FOREIGN KEY (nivel_id) REFERENCES nivel(nivel_id),
-                FOREIGN KEY (examinador_id) REFERENCES examinador(examinador_id),
-                FOREIGN KEY (evento_id) REFERENCES evento(evento_id)
-            );
-        """)
-
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS parametros(
-                id INTEGER PRIMARY KEY AUTOINCREMENT,  
-                nome TEXT NOT NULL UNIQUE,  
-                tipoConducao TEXT,  
-                estilo_id INTEGER,  
-                nivel_id INTEGER, 
-                FOREIGN KEY (nivel_id) REFERENCES nivel(nivel_id),
-                FOREIGN KEY (estilo_id) REFERENCES estiloDanca(estilo_id)
-            );
-        """)
-
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS estiloDanca(
-                id INTEGER PRIMARY KEY AUTOINCREMENT,  
-                estilo TEXT NOT NULL UNIQUE
-            );
-        """)
-
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS itemAvaliacao(
-                id INTEGER PRIMARY KEY AUTOINCREMENT,  
-                parametro_id INTEGER,  
-                nota INTEGER,
-                FOREIGN KEY (parametro_id) REFERENCES parametros(parametro_id)
-            );
-        """)
-
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS evento(
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                pessoaHomenageada TEXT NOT NULL,  
-                dataEvento TEXT NOT NULL UNIQUE,  
-                evento TEXT NOT NULL UNIQUE
-            );
-        """)
-
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS examinador(
-                id INTEGER PRIMARY KEY AUTOINCREMENT,  
-                nome TEXT NOT NULL,  
-                contato INTEGER NOT NULL UNIQUE 
-            );
-        """)
+        """Leva o esquema à versão atual aplicando só as migrações pendentes
+        (ver bd/migracoes.py); retorna as versões aplicadas"""
+        return migrar(self)
 
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS parametro_estilo(
-                parametro_id INTEGER NOT NULL,  
-                estilo_id INTEGER NOT NULL,
-                PRIMARY KEY (parametro_id, estilo_id),
-                FOREIGN KEY (parametro_id) REFERENCES parametros(id) ON DELETE CASCADE,
-                FOREIGN KEY (estilo_id) REFERENCES estiloDanca(id) ON DELETE CASCADE
-                
-            );
-        """)
+    def criarIndices(self):
+        """Cria os índices gerenciados que ainda não existem; retorna os nomes dos pulados"""
+        with self.usarCursor() as cur:
+            return criarIndices(cur)
 
-        # Tabela usuario (relacionamento 1:1 com aluno)
-        cur.execute("""
-        CREATE TABLE IF NOT EXISTS usuario (
-            id INTEGER NOT NULL,
-            login TEXT NOT NULL UNIQUE,
-            senha TEXT NOT NULL,
-            tipo TEXT NOT NULL,
-            PRIMARY KEY (id),
-            FOREIGN KEY (id) REFERENCES aluno(id) ON DELETE CASCADE
-        );
-        """)
+    def verificarIndices(self):
+        """Roda EXPLAIN QUERY PLAN nas CONSULTAS_INDEXADAS e retorna
+        {indice: (usado, plano)} para conferir que o planejador usa cada índice"""
+        resultado = {}
+        with self.usarCursor() as cur:
+            for sql, indice in CONSULTAS_INDEXADAS:
+                parametros = (None,) * sql.count('?')
+                cur.execute("EXPLAIN QUERY PLAN " + sql, parametros)
+                plano = "; ".join(row['detail'] for row in cur.fetchall())
+                resultado[indice] = (indice in plano, plano)
+        return resultado
 
     def limparTabelas(self):
         cur = self.meuCursor()
@@ -0,0 +1,64 @@
+"""
+Mapa de identidade da sessão: uma única instância por (tabela, id) para as
+entidades de referência (nivel, estiloDanca, examinador)
+"""
+import threading
+
+
+class MapaIdentidade:
+    def __init__(self):
+        self.__objetos = {}
+        self.__lock = threading.Lock()
+        self.__acertos = 0
+        self.__falhas = 0
+
+    def obter(self, tabela: str, id: int):
+        """Retorna a instância já carregada ou None, contabilizando acerto/falha"""
+        with self.__lock:
+            objeto = self.__objetos.get((tabela, id))
+            if objeto is None:
+                self.__falhas += 1
+            else:
+                self.__acertos += 1
+            return objeto
+
+    def registrar(self, tabela: str, id: int, fabrica):
+        """Retorna a instância existente para a chave ou registra a criada por fabrica()"""
+        with self.__lock:
+            objeto = self.__objetos.get((tabela, id))
+            if objeto is None:
+                objeto = fabrica()
+                self.__objetos[(tabela, id)] = objeto
+            return objeto
+
+    def invalidar(self, tabela: str, id: int | None = None):
+        """Descarta uma instância (ou todas da tabela, se id for None)"""
+        with self.__lock:
+            if id is not None:
+                self.__objetos.pop((tabela, id), None)
+            else:
+                for chave in [c for c in self.__objetos if c[0] == tabela]:
+                    del self.__objetos[chave]
+
+    def limpar(self):
+        with self.__lock:
+            self.__objetos.clear()
+
+    @property
+    def acertos(self):
+        return self.__acertos
+
+    @property
+    def falhas(self):
+        return self.__falhas
+
+    def estatisticas(self):
+        """Contadores de acerto/falha das buscas por id e tamanho atual do mapa"""
+        with self.__lock:
+            total = self.__acertos + self.__falhas
+            return {
+                "acertos": self.__acertos,
+                "falhas": self.__falhas,
+                "taxaAcerto": self.__acertos / total if total else 0.0,
+                "tamanho": len(self.__objetos),
+            }
@@ -0,0 +1,622 @@
+"""
+Migrações versionadas do esquema, controladas por PRAGMA user_version.
+Cada passo roda uma única vez; com o esquema em dia a inicialização é só uma leitura do PRAGMA.
+"""
+import sqlite3
+
+# Índices secundários gerenciados por criarIndices(): (nome, tabela, colunas), agrupados
+# pela migração que os cria. Cada grupo é congelado depois de publicado: índices novos
+# entram num grupo novo, com sua própria migração.
+# Os "cobrindo" trazem todas as colunas que a consulta lê, dispensando o acesso à tabela.
+INDICES_V3 = (
+    # AlunoDAO.buscarPorNivel (WHERE nivel_id = ? ORDER BY nome) sem ordenação extra
+    ("idx_aluno_nivel_nome", "aluno", "nivel_id, nome"),
+    # listarTodas (ORDER BY nome); cobre listagens de id/nome
+    ("idx_aluno_nome", "aluno", "nome"),
+    ("idx_avaliacao_aluno", "avaliacao", "aluno_id, evento_id"),
+    ("idx_avaliacao_examinador", "avaliacao", "examinador_id"),
+    ("idx_avaliacao_evento", "avaliacao", "evento_id, aluno_id"),
+    ("idx_avaliacao_data", "avaliacao", "data"),
+    # Cobrindo: notas de uma avaliação (e listarTodos ORDER BY avaliacao_id)
+    ("idx_item_avaliacao", "itemAvaliacao", "avaliacao_id, parametro_id, nota"),
+    # Cobrindo: notas de um parâmetro em todas as avaliações
+    ("idx_item_parametro", "itemAvaliacao", "parametro_id, avaliacao_id, nota"),
+    ("idx_parametros_nivel", "parametros", "nivel_id, estilo_id"),
+    ("idx_parametros_estilo", "parametros", "estilo_id"),
+    # Lado reverso da PK (parametro_id, estilo_id): parâmetros de um estilo
+    ("idx_parametro_estilo_estilo", "parametro_estilo", "estilo_id, parametro_id"),
+)
+
+# buscarPorContato: checagem de contato repetido sem diferenciar maiúsculas
+# (o de aluno é recriado como UNIQUE pela v7)
+INDICES_V5 = (
+    ("idx_aluno_contato_nocase", "aluno", "contato COLLATE NOCASE"),
+    ("idx_examinador_contato_nocase", "examinador", "contato COLLATE NOCASE"),
+)
+
+# Todos os índices do esquema atual (DatabaseConnection.criarIndices)
+INDICES = INDICES_V3 + INDICES_V5
+
+
+def colunasDe(cur, tabela: str):
+    """Conjunto com os nomes das colunas da tabela (vazio se ela não existir)"""
+    cur.execute(f"PRAGMA table_info({tabela});")
+    return {row[1] for row in cur.fetchall()}
+
+
+def criarIndices(cur, indices=INDICES):
+    """Cria os índices indicados (todos os de INDICES por padrão) que ainda não existem.
+    Índices sobre colunas que o esquema atual não tem são pulados; retorna os nomes dos
+    que foram pulados."""
+    pulados = []
+    for nome, tabela, colunas in indices:
+        existentes = colunasDe(cur, tabela)
+        if not all(coluna.split()[0] in existentes for coluna in colunas.split(',')):
+            pulados.append(nome)
+            continue
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {nome} ON {tabela} ({colunas});")
+
+    # Atualiza as estatísticas do planejador para os índices novos
+    cur.execute("PRAGMA optimize;")
+    return pulados
+
+
+def _v1EsquemaInicial(cur):
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS aluno(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL,
+            nivel_id INTEGER,
+            contato TEXT NOT NULL UNIQUE,
+            tipoConducao TEXT NOT NULL UNIQUE,
+            ativo INTEGER DEFAULT 1,
+            FOREIGN KEY (nivel_id) REFERENCES nivel(nivel_id),
+            FOREIGN KEY (tipoConducao) REFERENCES parametros(tipoConducao)
+        );
+        """
+    )
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS nivel(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL UNIQUE
+        );
+    """)
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS avaliacao(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            data TEXT,
+            aluno_id INTEGER,
+            obs TEXT,
+            nivel_id INTEGER,
+            examinador_id INTEGER,
+            evento_id INTEGER,
+            FOREIGN KEY(aluno_id) REFERENCES aluno (aluno_id),
+            FOREIGN KEY (nivel_id) REFERENCES nivel(nivel_id),
+            FOREIGN KEY (examinador_id) REFERENCES examinador(examinador_id),
+            FOREIGN KEY (evento_id) REFERENCES evento(evento_id)
+        );
+    """)
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS parametros(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL UNIQUE,
+            tipoConducao TEXT,
+            estilo_id INTEGER,
+            nivel_id INTEGER,
+            FOREIGN KEY (nivel_id) REFERENCES nivel(nivel_id),
+            FOREIGN KEY (estilo_id) REFERENCES estiloDanca(estilo_id)
+        );
+    """)
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS estiloDanca(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            estilo TEXT NOT NULL UNIQUE
+        );
+    """)
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS itemAvaliacao(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            parametro_id INTEGER,
+            avaliacao_id INTEGER,
+            nota INTEGER,
+            FOREIGN KEY (parametro_id) REFERENCES parametros(parametro_id),
+            FOREIGN KEY (avaliacao_id) REFERENCES avaliacao(id) ON DELETE CASCADE
+        );
+    """)
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS evento(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            pessoaHomenageada TEXT NOT NULL,
+            dataEvento TEXT NOT NULL UNIQUE,
+            evento TEXT NOT NULL UNIQUE
+        );
+    """)
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS examinador(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL,
+            contato INTEGER NOT NULL UNIQUE
+        );
+    """)
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS parametro_estilo(
+            parametro_id INTEGER NOT NULL,
+            estilo_id INTEGER NOT NULL,
+            PRIMARY KEY (parametro_id, estilo_id),
+            FOREIGN KEY (parametro_id) REFERENCES parametros(id) ON DELETE CASCADE,
+            FOREIGN KEY (estilo_id) REFERENCES estiloDanca(id) ON DELETE CASCADE
+
+        );
+    """)
+
+    # Tabela usuario (relacionamento 1:1 com aluno)
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS usuario (
+        id INTEGER NOT NULL,
+        login TEXT NOT NULL UNIQUE,
+        senha TEXT NOT NULL,
+        tipo TEXT NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY (id) REFERENCES aluno(id) ON DELETE CASCADE
+    );
+    """)
+
+
+# Esquema alinhado com os DAOs: tabela -> (DDL, {coluna: nomes possíveis na tabela antiga}).
+# Os nomes alternativos cobrem bancos criados por versões antigas (ex.: nivel.corNivel, aluno.aluno_id).
+ESQUEMA_V2 = {
+    "nivel": ("""
+        CREATE TABLE {tabela}(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL UNIQUE
+        );
+    """, {"id": ("id", "nivel_id"), "nome": ("nome", "corNivel")}),
+
+    "estiloDanca": ("""
+        CREATE TABLE {tabela}(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL UNIQUE
+        );
+    """, {"id": ("id", "estilo_id"), "nome": ("nome", "estilo")}),
+
+    "evento": ("""
+        CREATE TABLE {tabela}(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL UNIQUE,
+            dataEvento TEXT NOT NULL UNIQUE,
+            homenageado TEXT NOT NULL
+        );
+    """, {"id": ("id", "evento_id"), "nome": ("nome", "evento"),
+          "dataEvento": ("dataEvento",), "homenageado": ("homenageado", "pessoaHomenageada")}),
+
+    "examinador": ("""
+        CREATE TABLE {tabela}(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL,
+            contato INTEGER NOT NULL UNIQUE
+        );
+    """, {"id": ("id", "examinador_id"), "nome": ("nome",), "contato": ("contato",)}),
+
+    # tipoConducao deixa de ser UNIQUE (vários alunos conduzem do mesmo jeito)
+    "aluno": ("""
+        CREATE TABLE {tabela}(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL,
+            nivel_id INTEGER,
+            contato TEXT NOT NULL UNIQUE,
+            tipoConducao TEXT NOT NULL,
+            ativo INTEGER DEFAULT 1,
+            FOREIGN KEY (nivel_id) REFERENCES nivel(id)
+        );
+    """, {"id": ("id", "aluno_id"), "nome": ("nome",), "nivel_id": ("nivel_id",),
+          "contato": ("contato",), "tipoConducao": ("tipoConducao",), "ativo": ("ativo",)}),
+
+    "parametros": ("""
+        CREATE TABLE {tabela}(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL UNIQUE,
+            tipoConducao TEXT,
+            estilo_id INTEGER,
+            nivel_id INTEGER,
+            FOREIGN KEY (nivel_id) REFERENCES nivel(id) ON DELETE CASCADE,
+            FOREIGN KEY (estilo_id) REFERENCES estiloDanca(id) ON DELETE CASCADE
+        );
+    """, {"id": ("id", "parametro_id"), "nome": ("nome", "parametro"), "tipoConducao": ("tipoConducao",),
+          "estilo_id": ("estilo_id",), "nivel_id": ("nivel_id",)}),
+
+    "avaliacao": ("""
+        CREATE TABLE {tabela}(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            data TEXT,
+            aluno_id INTEGER,
+            obs TEXT,
+            nivel_id INTEGER,
+            examinador_id INTEGER,
+            evento_id INTEGER,
+            FOREIGN KEY (aluno_id) REFERENCES aluno(id) ON DELETE CASCADE,
+            FOREIGN KEY (nivel_id) REFERENCES nivel(id),
+            FOREIGN KEY (examinador_id) REFERENCES examinador(id) ON DELETE SET NULL,
+            FOREIGN KEY (evento_id) REFERENCES evento(id) ON DELETE SET NULL
+        );
+    """, {"id": ("id", "ava_id"), "data": ("data",), "aluno_id": ("aluno_id",), "obs": ("obs",),
+          "nivel_id": ("nivel_id",), "examinador_id": ("examinador_id",), "evento_id": ("evento_id",)}),
+
+    "itemAvaliacao": ("""
+        CREATE TABLE {tabela}(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            parametro_id INTEGER,
+            avaliacao_id INTEGER,
+            nota INTEGER,
+            FOREIGN KEY (parametro_id) REFERENCES parametros(id) ON DELETE CASCADE,
+            FOREIGN KEY (avaliacao_id) REFERENCES avaliacao(id) ON DELETE CASCADE
+        );
+    """, {"id": ("id", "ava_id"), "parametro_id": ("parametro_id",), "avaliacao_id": ("avaliacao_id",),
+          "nota": ("nota",)}),
+
+    "parametro_estilo": ("""
+        CREATE TABLE {tabela}(
+            parametro_id INTEGER NOT NULL,
+            estilo_id INTEGER NOT NULL,
+            PRIMARY KEY (parametro_id, estilo_id),
+            FOREIGN KEY (parametro_id) REFERENCES parametros(id) ON DELETE CASCADE,
+            FOREIGN KEY (estilo_id) REFERENCES estiloDanca(id) ON DELETE CASCADE
+        );
+    """, {"parametro_id": ("parametro_id",), "estilo_id": ("estilo_id",)}),
+
+    # Tabela usuario (relacionamento 1:1 com aluno)
+    "usuario": ("""
+        CREATE TABLE {tabela}(
+            id INTEGER NOT NULL,
+            login TEXT NOT NULL UNIQUE,
+            senha TEXT NOT NULL,
+            tipo TEXT NOT NULL,
+            PRIMARY KEY (id),
+            FOREIGN KEY (id) REFERENCES aluno(id) ON DELETE CASCADE
+        );
+    """, {"id": ("id",), "login": ("login",), "senha": ("senha",), "tipo": ("tipo",)}),
+}
+
+
+def _reconstruirTabela(cur, tabela: str, ddl: str, colunas: dict):
+    """Recria a tabela com o DDL novo e copia os dados (roteiro de 12 passos do SQLite)"""
+    existentes = colunasDe(cur, tabela)
+    if not existentes:
+        cur.execute(ddl.format(tabela=tabela))
+        return
+
+    destinos, origens = [], []
+    for destino, candidatas in colunas.items():
+        origem = next((c for c in candidatas if c in existentes), None)
+        if origem is not None:
+            destinos.append(destino)
+            origens.append(origem)
+
+    nova = f"{tabela}_nova"
+    cur.execute(ddl.format(tabela=nova))
+    cur.execute(f"INSERT INTO {nova} ({', '.join(destinos)}) "
+                f"SELECT DISTINCT {', '.join(origens)} FROM {tabela};")
+    cur.execute(f"DROP TABLE {tabela};")
+    cur.execute(f"ALTER TABLE {nova} RENAME TO {tabela};")
+
+
+def _v2AlinharColunas(cur):
+    # Corrige as FKs que apontavam para colunas inexistentes (nivel_id, aluno_id...) e
+    # renomeia as colunas que os DAOs já usavam (estiloDanca.nome, evento.nome/homenageado)
+    for tabela, (ddl, colunas) in ESQUEMA_V2.items():
+        _reconstruirTabela(cur, tabela, ddl, colunas)
+
+
+def _v3Indices(cur):
+    criarIndices(cur, INDICES_V3)
+
+
+# Índices FTS5 de conteúdo externo: tabela -> colunas indexadas. remove_diacritics 2 faz
+# "Joao" achar "João"; unicode61 já ignora maiúsculas/minúsculas.
+TABELAS_FTS = {
+    "aluno": ("nome",),
+    "evento": ("nome", "homenageado"),
+    "parametros": ("nome",),
+}
+
+
+def buscaTextualPendente(cur):
+    """True se o SQLite tem FTS5 mas as tabelas *_fts ainda não existem: a migração 4 rodou
+    num SQLite sem o módulo (ou ainda não rodou)"""
+    if not cur.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5');").fetchone()[0]:
+        return False
+    return cur.execute("SELECT 1 FROM sqlite_master WHERE name = 'aluno_fts';").fetchone() is None
+
+
+def criarBuscaTextual(cur):
+    """Cria as tabelas FTS5 e seus gatilhos e indexa o que já existe. Retorna False, sem
+    criar nada, se o SQLite não tem FTS5 (os DAOs continuam com LIKE, ver
+    dao/busca_textual.py); migrar() tenta de novo quando o módulo estiver disponível."""
+    for tabela, colunas in TABELAS_FTS.items():
+        fts = f"{tabela}_fts"
+        lista = ", ".join(colunas)
+        novos = ", ".join(f"new.{c}" for c in colunas)
+        antigos = ", ".join(f"old.{c}" for c in colunas)
+        try:
+            cur.execute(f"""
+                CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+                    {lista}, content='{tabela}', content_rowid='id',
+                    tokenize="unicode61 remove_diacritics 2"
+                );
+            """)
+        except sqlite3.OperationalError:
+            # SQLite compilado sem FTS5 (falha já na primeira tabela)
+            return False
+
+        # Gatilhos mantêm o índice em sincronia com a tabela de conteúdo
+        cur.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {tabela}_fts_ai AFTER INSERT ON {tabela} BEGIN
+                INSERT INTO {fts} (rowid, {lista}) VALUES (new.id, {novos});
+            END;
+        """)
+        cur.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {tabela}_fts_ad AFTER DELETE ON {tabela} BEGIN
+                INSERT INTO {fts} ({fts}, rowid, {lista}) VALUES ('delete', old.id, {antigos});
+            END;
+        """)
+        cur.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {tabela}_fts_au AFTER UPDATE OF {lista} ON {tabela} BEGIN
+                INSERT INTO {fts} ({fts}, rowid, {lista}) VALUES ('delete', old.id, {antigos});
+                INSERT INTO {fts} (rowid, {lista}) VALUES (new.id, {novos});
+            END;
+        """)
+        # Indexa as linhas que já existiam
+        cur.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild');")
+    return True
+
+
+def _v4BuscaTextual(cur):
+    criarBuscaTextual(cur)
+
+
+def recalcularResultado(filtro: str):
+    """Instruções que refazem o resultado das avaliações escolhidas por `filtro` (condição
+    sobre avaliacao_id, ex.: "= new.avaliacao_id"). Parâmetro sem peso (ou item sem
+    parâmetro) pesa 1; notas NULL não entram na média."""
+    return (f"DELETE FROM resultadoAvaliacao WHERE avaliacao_id {filtro};", f"""
+    INSERT INTO resultadoAvaliacao (avaliacao_id, quantidade, somaPesos, somaPonderada)
+    SELECT i.avaliacao_id, COUNT(*), SUM(COALESCE(p.peso, 1)), SUM(COALESCE(p.peso, 1) * i.nota)
+    FROM itemAvaliacao i
+    LEFT JOIN parametros p ON p.id = i.parametro_id
+    WHERE i.avaliacao_id {filtro} AND i.nota IS NOT NULL
+      AND EXISTS (SELECT 1 FROM avaliacao a WHERE a.id = i.avaliacao_id)
+    GROUP BY i.avaliacao_id;
+    """)
+
+
+def _gatilho(filtro: str):
+    return "\n".join(recalcularResultado(filtro))
+
+
+def _v5ContatoSemMaiusculas(cur):
+    criarIndices(cur, INDICES_V5)
+
+
+def _v6PontuacaoAvaliacao(cur):
+    # Peso de cada parâmetro na nota final da avaliação
+    if "peso" not in colunasDe(cur, "parametros"):
+        cur.execute("ALTER TABLE parametros ADD COLUMN peso REAL NOT NULL DEFAULT 1;")
+
+    # Resumo materializado: uma linha por avaliação com nota, lida pela PK (avaliacao_id)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS resultadoAvaliacao(
+            avaliacao_id INTEGER PRIMARY KEY,
+            quantidade INTEGER NOT NULL,
+            somaPesos REAL NOT NULL,
+            somaPonderada REAL NOT NULL,
+            media REAL GENERATED ALWAYS AS (somaPonderada / NULLIF(somaPesos, 0)) VIRTUAL,
+            FOREIGN KEY (avaliacao_id) REFERENCES avaliacao(id) ON DELETE CASCADE
+        );
+    """)
+
+    # Gatilhos: cada mudança em itemAvaliacao refaz só o resumo da avaliação afetada
+    # (poucas linhas, pelo índice idx_item_avaliacao); mudar um peso refaz as avaliações
+    # que usam o parâmetro (pelo idx_item_parametro)
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS itemAvaliacao_resultado_ai AFTER INSERT ON itemAvaliacao BEGIN
+            {_gatilho("= new.avaliacao_id")}
+        END;
+    """)
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS itemAvaliacao_resultado_ad AFTER DELETE ON itemAvaliacao BEGIN
+            {_gatilho("= old.avaliacao_id")}
+        END;
+    """)
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS itemAvaliacao_resultado_au
+        AFTER UPDATE OF nota, parametro_id, avaliacao_id ON itemAvaliacao BEGIN
+            {_gatilho("IN (old.avaliacao_id, new.avaliacao_id)")}
+        END;
+    """)
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS parametros_resultado_au AFTER UPDATE OF peso ON parametros
+        WHEN new.peso IS NOT old.peso BEGIN
+            {_gatilho("IN (SELECT avaliacao_id FROM itemAvaliacao WHERE parametro_id = new.id)")}
+        END;
+    """)
+
+    # Preenche o resumo das avaliações que já têm notas
+    for instrucao in recalcularResultado("IS NOT NULL"):
+        cur.execute(instrucao)
+
+
+def _v7ContatoAlunoUnico(cur):
+    # UNIQUE(contato) da tabela diferencia maiúsculas; o índice único NOCASE é o alvo do
+    # ON CONFLICT de AlunoDAO.inserirSeNovo. Mesmo nome do índice da v5, que ele substitui.
+    repetidos = cur.execute("""
+        SELECT group_concat(contato, ' / ') FROM aluno
+        GROUP BY contato COLLATE NOCASE HAVING count(*) > 1;
+    """).fetchall()
+    if repetidos:
+        raise sqlite3.IntegrityError(
+            "Contatos de aluno repetidos (sem diferenciar maiúsculas), corrija antes de migrar: "
+            + ", ".join(row[0] for row in repetidos))
+
+    cur.execute("DROP INDEX IF EXISTS idx_aluno_contato_nocase;")
+    cur.execute("CREATE UNIQUE INDEX idx_aluno_contato_nocase ON aluno (contato COLLATE NOCASE);")
+
+
+def _pesoDoItem(linha: str):
+    # Peso do parâmetro do item `linha` (new/old); sem parâmetro pesa 1, como em recalcularResultado
+    return f"COALESCE((SELECT peso FROM parametros WHERE id = {linha}.parametro_id), 1)"
+
+
+def _somarItem(linha: str):
+    """UPSERT que soma ao resumo da avaliação a contribuição do item `linha` (new/old)"""
+    return f"""
+        INSERT INTO resultadoAvaliacao (avaliacao_id, quantidade, somaPesos, somaPonderada)
+        SELECT {linha}.avaliacao_id, 1, peso, peso * {linha}.nota
+        FROM (SELECT {_pesoDoItem(linha)} AS peso)
+        WHERE {linha}.nota IS NOT NULL
+          AND EXISTS (SELECT 1 FROM avaliacao WHERE id = {linha}.avaliacao_id)
+        ON CONFLICT (avaliacao_id) DO UPDATE SET
+            quantidade = quantidade + 1,
+            somaPesos = somaPesos + excluded.somaPesos,
+            somaPonderada = somaPonderada + excluded.somaPonderada;
+    """
+
+
+def _subtrairItem(linha: str):
+    """Tira do resumo da avaliação a contribuição do item `linha`; sem notas, a linha sai"""
+    return f"""
+        UPDATE resultadoAvaliacao SET
+            quantidade = quantidade - 1,
+            somaPesos = somaPesos - {_pesoDoItem(linha)},
+            somaPonderada = somaPonderada - {_pesoDoItem(linha)} * {linha}.nota
+        WHERE avaliacao_id = {linha}.avaliacao_id AND {linha}.nota IS NOT NULL;
+        DELETE FROM resultadoAvaliacao WHERE avaliacao_id = {linha}.avaliacao_id AND quantidade <= 0;
+    """
+
+
+def _trocarPeso(antigo: str, novo: str):
+    """Ajusta as avaliações com notas do parâmetro old.id quando o peso dele passa de
+    `antigo` para `novo`: uma busca pelo idx_item_parametro, sem reler as outras notas"""
+    return f"""
+        UPDATE resultadoAvaliacao SET
+            somaPesos = somaPesos + ({novo} - {antigo}) * (
+                SELECT COUNT(*) FROM itemAvaliacao i
+                WHERE i.parametro_id = old.id AND i.avaliacao_id = resultadoAvaliacao.avaliacao_id
+                  AND i.nota IS NOT NULL),
+            somaPonderada = somaPonderada + ({novo} - {antigo}) * (
+                SELECT SUM(i.nota) FROM itemAvaliacao i
+                WHERE i.parametro_id = old.id AND i.avaliacao_id = resultadoAvaliacao.avaliacao_id
+                  AND i.nota IS NOT NULL)
+        WHERE avaliacao_id IN (SELECT avaliacao_id FROM itemAvaliacao
+                               WHERE parametro_id = old.id AND nota IS NOT NULL);
+    """
+
+
+def _v8ResultadoPorDiferenca(cur):
+    # Os gatilhos da v6 refaziam o resumo inteiro da avaliação a cada item (O(k²) numa
+    # carga de k itens); estes aplicam só a diferença de cada linha e media é derivada
+    for gatilho in ("itemAvaliacao_resultado_ai", "itemAvaliacao_resultado_ad",
+                    "itemAvaliacao_resultado_au", "parametros_resultado_au"):
+        cur.execute(f"DROP TRIGGER IF EXISTS {gatilho};")
+
+    cur.execute(f"""
+        CREATE TRIGGER itemAvaliacao_resultado_ai AFTER INSERT ON itemAvaliacao
+        WHEN new.nota IS NOT NULL BEGIN
+            {_somarItem("new")}
+        END;
+    """)
+    cur.execute(f"""
+        CREATE TRIGGER itemAvaliacao_resultado_ad AFTER DELETE ON itemAvaliacao
+        WHEN old.nota IS NOT NULL BEGIN
+            {_subtrairItem("old")}
+        END;
+    """)
+    cur.execute(f"""
+        CREATE TRIGGER itemAvaliacao_resultado_au
+        AFTER UPDATE OF nota, parametro_id, avaliacao_id ON itemAvaliacao BEGIN
+            {_subtrairItem("old")}
+            {_somarItem("new")}
+        END;
+    """)
+    cur.execute(f"""
+        CREATE TRIGGER parametros_resultado_au AFTER UPDATE OF peso ON parametros
+        WHEN new.peso IS NOT old.peso BEGIN
+            {_trocarPeso("old.peso", "new.peso")}
+        END;
+    """)
+    # Os itens do parâmetro são apagados em cascata depois dele, quando o peso já não pode
+    # ser lido (vale 1): antes de apagar, as notas dele passam a contar com peso 1
+    cur.execute(f"""
+        CREATE TRIGGER parametros_resultado_bd BEFORE DELETE ON parametros BEGIN
+            {_trocarPeso("old.peso", "1")}
+        END;
+    """)
+
+    # Parte de um resumo exato
+    for instrucao in recalcularResultado("IS NOT NULL"):
+        cur.execute(instrucao)
+
+
+# (versão, descrição, passo). Novas migrações entram sempre no fim da lista.
+MIGRACOES = [
+    (1, "esquema inicial", _v1EsquemaInicial),
+    (2, "alinha colunas e chaves estrangeiras com os DAOs", _v2AlinharColunas),
+    (3, "índices secundários", _v3Indices),
+    (4, "busca textual FTS5 por nome", _v4BuscaTextual),
+    (5, "índices de contato sem diferenciar maiúsculas", _v5ContatoSemMaiusculas),
+    (6, "peso dos parâmetros e resumo de resultado por avaliação", _v6PontuacaoAvaliacao),
+    (7, "contato de aluno único sem diferenciar maiúsculas", _v7ContatoAlunoUnico),
+    (8, "resumo de resultado atualizado por diferença", _v8ResultadoPorDiferenca),
+]
+
+VERSAO_ATUAL = MIGRACOES[-1][0]
+
+
+def versaoAtual(conn):
+    """Versão do esquema gravada no arquivo (PRAGMA user_version)"""
+    return conn.execute("PRAGMA user_version;").fetchone()[0]
+
+
+def migrar(db):
+    """Aplica, numa única transação, as migrações com versão maior que user_version.
+    Retorna a lista das versões aplicadas (vazia se o esquema já estava em dia)."""
+    with db.conexao() as conn:
+        # Caminho rápido: esquema em dia custa só estas leituras
+        if versaoAtual(conn) >= VERSAO_ATUAL and not buscaTextualPendente(conn):
+            return []
+
+        # Reconstruir tabelas exige as FKs desligadas, e o PRAGMA não tem efeito dentro de transação
+        conn.execute("PRAGMA foreign_keys = OFF;")
+        try:
+            aplicadas = []
+            with db.transacao() as conn:
+                # Relê dentro do lock de escrita: outro processo pode ter migrado antes
+                versao = versaoAtual(conn)
+                cur = conn.cursor()
+                for numero, _descricao, passo in MIGRACOES:
+                    if numero <= versao:
+                        continue
+                    passo(cur)
+                    cur.execute(f"PRAGMA user_version = {numero};")
+                    aplicadas.append(numero)
+
+                # A v4 não cria a busca textual num SQLite sem FTS5; se o módulo passou a
+                # existir (SQLite atualizado), cria agora sem mexer na versão
+                if buscaTextualPendente(cur):
+                    criarBuscaTextual(cur)
+
+                violacoes = cur.execute("PRAGMA foreign_key_check;").fetchall()
+                if violacoes:
+                    raise sqlite3.IntegrityError(
+                        "Migração deixaria chaves estrangeiras inválidas: "
+                        + ", ".join(f"{row[0]}(rowid={row[1]}) -> {row[2]}" for row in violacoes))
+            return aplicadas
+        finally:
+            conn.execute("PRAGMA foreign_keys = ON;")
@@ -0,0 +1,115 @@
+"""
+Pool de conexões SQLite compartilhado entre threads
+"""
+import queue
+import sqlite3
+import threading
+
+
+class PoolConexoes:
+    def __init__(self, dbPath: str, tamanho: int = 5, timeout: float = 30.0,
+                 configurar=None, verificarSaude: bool = True):
+        if tamanho < 1:
+            raise ValueError("O tamanho do pool deve ser pelo menos 1")
+
+        self.__dbPath = dbPath
+        self.__tamanho = tamanho
+        self.__timeout = timeout
+        self.__configurar = configurar
+        self.__verificarSaude = verificarSaude
+
+        # Conexões ociosas (LIFO reaproveita a conexão "mais quente")
+        self.__livres = queue.LifoQueue()
+        # Cada vaga do semáforo é uma conexão que pode estar emprestada
+        self.__vagas = threading.BoundedSemaphore(tamanho)
+        self.__lock = threading.Lock()
+        self.__emUso = 0
+        self.__fechado = False
+
+    @property
+    def tamanho(self):
+        return self.__tamanho
+
+    @property
+    def emUso(self):
+        return self.__emUso
+
+    @property
+    def ociosas(self):
+        return self.__livres.qsize()
+
+    def __novaConexao(self):
+        # isolation_level=None ativa autocommit (cada operação é commitada automaticamente)
+        # check_same_thread=False: a conexão pode ser usada por outra thread depois
+        # de devolvida, mas nunca por duas threads ao mesmo tempo
+        conn = sqlite3.connect(self.__dbPath, isolation_level=None,
+                               check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        if self.__configurar:
+            self.__configurar(conn)
+        return conn
+
+    def __saudavel(self, conn):
+        try:
+            conn.execute("SELECT 1;").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def obter(self, timeout: float | None = None):
+        """Empresta uma conexão do pool, esperando até `timeout` segundos por uma vaga"""
+        if self.__fechado:
+            raise sqlite3.ProgrammingError("O pool de conexões está fechado")
+
+        espera = self.__timeout if timeout is None else timeout
+        if not self.__vagas.acquire(timeout=espera):
+            raise TimeoutError(f"Nenhuma conexão livre no pool após {espera}s "
+                               f"({self.__tamanho} em uso)")
+
+        try:
+            conn = None
+            while conn is None:
+                try:
+                    conn = self.__livres.get_nowait()
+                except queue.Empty:
+                    conn = self.__novaConexao()
+                    break
+
+                if self.__verificarSaude and not self.__saudavel(conn):
+                    conn.close()
+                    conn = None
+        except BaseException:
+            self.__vagas.release()
+            raise
+
+        with self.__lock:
+            self.__emUso += 1
+        return conn
+
+    def devolver(self, conn):
+        """Devolve ao pool uma conexão obtida com obter()"""
+        with self.__lock:
+            self.__emUso -= 1
+
+        try:
+            if self.__fechado:
+                conn.close()
+                return
+
+            # Nunca devolver uma conexão com transação pendurada
+            if conn.in_transaction:
+                conn.rollback()
+            self.__livres.put(conn)
+        except sqlite3.Error:
+            conn.close()
+        finally:
+            self.__vagas.release()
+
+    def fechar(self):
+        """Fecha as conexões ociosas; as emprestadas são fechadas ao serem devolvidas"""
+        self.__fechado = True
+        while True:
+            try:
+                self.__livres.get_nowait().close()
+            except queue.Empty:
+                break
@@ -0,0 +1,154 @@
+"""
+Benchmark dos modelos com __slots__ (Aluno, Avaliacao, ItemAvaliacao, Usuario) contra as versões antigas,
+com __dict__ por instância: memória de N objetos e tempo de leitura/escrita das propriedades.
+
+Uso (a partir de projetoBaiana/):
+    python benchmarks/bench_modelos.py [quantidade]
+"""
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from model.aluno_class import Aluno
+from model.avaliacao_class import Avaliacao
+from model.itemAvaliacao_class import ItemAvaliacao
+from model.usuario_class import Usuario
+
+# Como os modelos eram antes dos __slots__: mesmas propriedades, atributos no __dict__
+class _Rastreavel:
+  def _alterar(self, campo, atual, novo):
+    if novo is not atual and novo != atual:
+      self.__dict__.setdefault('_alterados', set()).add(campo)
+    return novo
+
+class ItemAvaliacaoComDict(_Rastreavel):
+  def __init__(self, id, parametro, avaliacao, nota):
+    self.__id = id
+    self.__parametro = parametro
+    self.__avaliacao = avaliacao
+    self.__nota = nota
+
+  @property
+  def id(self):
+    return self.__id
+
+  @property
+  def parametro(self):
+    return self.__parametro
+
+  @property
+  def avaliacao(self):
+    return self.__avaliacao
+
+  @property
+  def nota(self):
+    return self.__nota
+
+  @nota.setter
+  def nota(self, value):
+    self.__nota = self._alterar('nota', self.__nota, value)
+
+class AlunoComDict(_Rastreavel):
+  def __init__(self, id, nome, contato, nivel, tipoConducao, ativo=True):
+    self.__id = id
+    self.__nome = nome
+    self.__contato = contato
+    self.__nivel = nivel
+    self.__tipoConducao = tipoConducao
+    self.__ativo = ativo
+
+  @property
+  def id(self):
+    return self.__id
+
+  @property
+  def nome(self):
+    return self.__nome
+
+  @nome.setter
+  def nome(self, value):
+    self.__nome = self._alterar('nome', self.__nome, value)
+
+class AvaliacaoComDict(_Rastreavel):
+  def __init__(self, id, data, examinador, aluno, nivel, evento, obs=None):
+    self.__id = id
+    self.__data = data
+    self.__examinador = examinador
+    self.__aluno = aluno
+    self.__nivel = nivel
+    self.__evento = evento
+    self.__obs = obs
+
+  @property
+  def id(self):
+    return self.__id
+
+  @property
+  def data(self):
+    return self.__data
+
+  @data.setter
+  def data(self, value):
+    self.__data = self._alterar('data', self.__data, value)
+
+class UsuarioComDict(_Rastreavel):
+  def __init__(self, id, login, senha, tipo, aluno):
+    self.__id = id
+    self.__login = login
+    self.__senha = senha
+    self.__tipo = tipo
+    self.__aluno = aluno
+
+  @property
+  def id(self):
+    return self.__id
+
+  @property
+  def login(self):
+    return self.__login
+
+  @login.setter
+  def login(self, value):
+    self.__login = self._alterar('login', self.__login, value)
+
+def memoria(fabrica, quantidade):
+  """Bytes alocados para manter `quantidade` objetos vivos"""
+  tracemalloc.start()
+  objetos = [fabrica(i) for i in range(quantidade)]
+  atual, _ = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+  del objetos
+  return atual
+
+def tempo(instrucao, obj, repeticoes=1_000_000):
+  return min(timeit.repeat(instrucao, globals={'o': obj}, number=repeticoes, repeat=3))
+
+def comparar(titulo, novo, antigo, quantidade, leitura, escrita):
+  memNovo, memAntigo = memoria(novo, quantidade), memoria(antigo, quantidade)
+  print(f"\n{titulo} ({quantidade} objetos)")
+  print(f"  memória:  slots {memNovo / 2**20:7.1f} MiB | dict {memAntigo / 2**20:7.1f} MiB "
+        f"({memNovo / memAntigo:.0%})")
+  for rotulo, instrucao in (("leitura", leitura), ("escrita", escrita)):
+    tNovo, tAntigo = tempo(instrucao, novo(1)), tempo(instrucao, antigo(1))
+    print(f"  {rotulo}:  slots {tNovo * 1000:7.1f} ms | dict {tAntigo * 1000:7.1f} ms  (1M acessos)")
+
+def main():
+  quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+  comparar("ItemAvaliacao", lambda i: ItemAvaliacao(i, 1, 1, i % 10),
+           lambda i: ItemAvaliacaoComDict(i, 1, 1, i % 10),
+           quantidade, "o.nota", "o.nota = 7")
+  comparar("Aluno", lambda i: Aluno(i, f"Aluno {i}", f"c{i}", 1, "condutor"),
+           lambda i: AlunoComDict(i, f"Aluno {i}", f"c{i}", 1, "condutor"),
+           quantidade, "o.nome", "o.nome = 'Ana'")
+  comparar("Avaliacao", lambda i: Avaliacao(i, "2024-05-01", 1, i, 1, 1),
+           lambda i: AvaliacaoComDict(i, "2024-05-01", 1, i, 1, 1),
+           quantidade, "o.data", "o.data = '2024-06-01'")
+  comparar("Usuario", lambda i: Usuario(i, f"login{i}", "senha", "aluno", i),
+           lambda i: UsuarioComDict(i, f"login{i}", "senha", "aluno", i),
+           quantidade, "o.login", "o.login = 'ana'")
+
+if __name__ == '__main__':
+  main()
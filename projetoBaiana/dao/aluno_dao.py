@@ -3,56 +3,150 @@ DAO (Data Access Object) para operações de banco de dados da tabela aluno
 """
 
 from bd.database import DatabaseConnection
+from dao.busca_textual import buscarRows
+from dao.carregador_lote import CarregadorLote
+from dao.consulta import Consulta
 from dao.nivel_dao import NivelDAO
+from dao.paginacao import LIMITE_PAGINA, TAMANHO_LOTE, iterarLotes
+from dao import existencia
+from dao.atualizacao import atualizar, atualizarVarios
 from model.aluno_class import Aluno
+from model.nivel_class import Nivel
 from model.parametros_class import Parametros
 
+# Propriedade do modelo -> coluna: salvar() grava só as alteradas (ver dao/atualizacao.py)
+COLUNAS = {'nome': 'nome', 'contato': 'contato', 'tipoConducao': 'tipoConducao', 'ativo': 'ativo', 'nivel': 'nivel_id'}
+
+# Aluno e seu nivel numa única consulta: criarDeRow monta o Nivel a partir de
+# nivel_nome em vez de buscar o nivel linha a linha (LEFT JOIN mantém alunos sem nivel)
+SELECT_ALUNO_COM_NIVEL = """
+    SELECT a.*, n.nome AS nivel_nome
+    FROM aluno a
+    LEFT JOIN nivel n ON n.id = a.nivel_id
+"""
+
 class AlunoDAO:
     def __init__(self, db: DatabaseConnection):
         self.__db = db
     
     def salvar(self, aluno: Aluno):
-        cur = self.__db.cursor()
+        with self.__db.usarCursor() as cur:
+            # Converter boolean para integer (SQLite)
+            ativoInt = 1 if aluno.ativo else 0
         
-        # Converter boolean para integer (SQLite)
-        ativoInt = 1 if aluno.ativo else 0
+            nivelId = aluno.nivel.id
         
-        nivelId = aluno.nivel.id
+            if aluno.id is None:
+                # INSERT
+                cur.execute("""
+                    INSERT INTO aluno (nome, contato, tipoConducao,
+                                     ativo, nivel_id)
+                    VALUES (?, ?, ?, ?, ?);
+                """, (aluno.nome, aluno.contato, aluno.tipoConducao,
+                      ativoInt, nivelId))
+
+                aluno.id = cur.lastrowid
+                aluno.limparAlteracoes()
+            else:
+                # UPDATE: só as colunas alteradas (nenhuma instrução se nada mudou)
+                atualizar(cur, 'aluno', aluno, COLUNAS)
         
-        if aluno.id is None:
-            # INSERT
-            cur.execute("""
+            return aluno.id
+    
+    def salvarVarios(self, alunos):
+        """Insere os novos e atualiza os existentes numa única transação (executemany).
+        Retorna os ids na mesma ordem de entrada."""
+        alunos = list(alunos)
+        novos = [a for a in alunos if a.id is None]
+        existentes = [a for a in alunos if a.id is not None]
+        
+        with self.__db.transacao():
+            ids = self.__db.inserirVarios("""
                 INSERT INTO aluno (nome, contato, tipoConducao,
                                  ativo, nivel_id)
                 VALUES (?, ?, ?, ?, ?);
-            """, (aluno.nome, aluno.contato, aluno.tipoConducao,
-                  ativoInt, nivelId))
-
-            aluno.id = cur.lastrowid
-        else:
-            # UPDATE
+            """, [(a.nome, a.contato, a.tipoConducao, 1 if a.ativo else 0, a.nivel.id) for a in novos])
+            for a, id in zip(novos, ids):
+                a.id = id
+                a.limparAlteracoes()
+            
+            atualizarVarios(self.__db, 'aluno', existentes, COLUNAS)
+        
+        return [a.id for a in alunos]
+    
+    def inserirSeNovo(self, aluno: Aluno):
+        """Insere o aluno numa única instrução atômica (sem SELECT antes).
+        Retorna True se foi criado; False se o contato já está cadastrado, sem diferenciar
+        maiúsculas (índice único idx_aluno_contato_nocase)."""
+        with self.__db.usarCursor() as cur:
             cur.execute("""
-                UPDATE aluno SET nome = ?, contato = ?, tipoConducao = ?, ativo = ?,
-                               nivel_id = ?
-                WHERE id = ?;
+                INSERT INTO aluno (nome, contato, tipoConducao,
+                                 ativo, nivel_id)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (contato COLLATE NOCASE) DO NOTHING
+                RETURNING id;
             """, (aluno.nome, aluno.contato, aluno.tipoConducao,
-                  ativoInt, nivelId))
+                  1 if aluno.ativo else 0, aluno.nivel.id))
+            row = cur.fetchone()
         
-        return aluno.id
+            if row is None:
+                return False
+            aluno.id = row['id']
+            aluno.limparAlteracoes()
+            return True
+    
+    def upsert(self, aluno: Aluno):
+        """Cria o aluno ou, se o contato já existe, atualiza os dados do registro existente.
+        Preenche aluno.id nos dois casos; retorna True se foi criado."""
+        with self.__db.transacao() as conn:
+            if self.inserirSeNovo(aluno):
+                return True
+            
+            row = conn.execute("""
+                UPDATE aluno SET nome = ?, tipoConducao = ?, ativo = ?, nivel_id = ?
+                WHERE contato = ? COLLATE NOCASE
+                RETURNING id;
+            """, (aluno.nome, aluno.tipoConducao, 1 if aluno.ativo else 0,
+                  aluno.nivel.id, aluno.contato)).fetchone()
+            aluno.id = row['id']
+            aluno.limparAlteracoes()
+            return False
     
     def buscarPorId(self, id: int):
-        cur = self.__db.cursor()
-        cur.execute("SELECT * FROM aluno WHERE id = ?;", (id,))
-        row = cur.fetchone()
+        with self.__db.usarCursor() as cur:
+            cur.execute(SELECT_ALUNO_COM_NIVEL + "WHERE a.id = ?;", (id,))
+            row = cur.fetchone()
         
-        if row:
-            return self.criarDeRow(row)
-        return None
+            if row:
+                return self.criarDeRow(row)
+            return None
+    
+    def buscarPorIds(self, ids):
+        """Carrega vários alunos de uma vez: um IN em aluno e um IN em nivel; retorna {id: Aluno}"""
+        rows = CarregadorLote(self.__db, "SELECT * FROM aluno").carregar(ids)
+        niveis = NivelDAO(self.__db).buscarPorIds(row['nivel_id'] for row in rows.values())
+        
+        return {id: self.__montar(row, niveis.get(row['nivel_id'])) for id, row in rows.items()}
+    
+    def buscarPorContato(self, contato: str):
+        """Aluno com esse contato, sem diferenciar maiúsculas (usa idx_aluno_contato_nocase)"""
+        with self.__db.usarCursor() as cur:
+            cur.execute(SELECT_ALUNO_COM_NIVEL + "WHERE a.contato = ? COLLATE NOCASE;", (contato,))
+            row = cur.fetchone()
+        
+            if row:
+                return self.criarDeRow(row)
+            return None
     
     def buscarPorNome(self, nome: str):
-        cur = self.__db.cursor()
-        cur.execute("SELECT * FROM aluno WHERE nome LIKE ?;", (f'%{nome}%',))
-        rows = cur.fetchall()
+        """Busca por prefixo de palavras, sem acento nem caixa ("joao s" acha "João Silva"),
+        com os mais relevantes primeiro"""
+        rows = buscarRows(
+            self.__db,
+            SELECT_ALUNO_COM_NIVEL + "JOIN aluno_fts f ON f.rowid = a.id WHERE aluno_fts MATCH ? ORDER BY f.rank;",
+            SELECT_ALUNO_COM_NIVEL + "WHERE a.nome LIKE ?;",
+            nome
+        )
         
         resultado = []
         for row in rows:
@@ -60,39 +154,88 @@ class AlunoDAO:
         return resultado
     
     def listarTodas(self, comNivel: bool = False):
-        cur = self.__db.cursor()
+        with self.__db.usarCursor() as cur:
+            if comNivel:
+                # Apenas alunos que têm nivel (equivalente ao INNER JOIN)
+                cur.execute(SELECT_ALUNO_COM_NIVEL + "WHERE n.id IS NOT NULL ORDER BY a.nome;")
+            else:
+                cur.execute(SELECT_ALUNO_COM_NIVEL + "ORDER BY a.nome;")
         
+            rows = cur.fetchall()
+            resultado = []
+            for row in rows:
+                resultado.append(self.criarDeRow(row))
+            return resultado
+    
+    def iterar(self, comNivel: bool = False, tamanhoLote: int = TAMANHO_LOTE):
+        """Mesmo conteúdo e ordem de listarTodas(), mas gerado aos poucos (fetchmany):
+        a memória usada não cresce com o número de alunos"""
         if comNivel:
-            cur.execute("""
-                SELECT a.*, n.nome as nivel_nome
-                FROM aluno a
-                JOIN nivel n ON a.nivel_id = n.id
-                ORDER BY a.nome;
-            """)
+            sql = SELECT_ALUNO_COM_NIVEL + "WHERE n.id IS NOT NULL ORDER BY a.nome;"
         else:
-            cur.execute("SELECT * FROM aluno ORDER BY nome;")
+            sql = SELECT_ALUNO_COM_NIVEL + "ORDER BY a.nome;"
         
-        rows = cur.fetchall()
-        resultado = []
-        for row in rows:
-            resultado.append(self.criarDeRow(row))
-        return resultado
+        for lote in iterarLotes(self.__db, sql, (), tamanhoLote):
+            for row in lote:
+                yield self.criarDeRow(row)
+    
+    def pagina(self, aposId: int = 0, limite: int = LIMITE_PAGINA):
+        """Página por keyset: até `limite` alunos com id > aposId, em ordem de id.
+        Para a próxima página passe o id do último aluno recebido."""
+        with self.__db.usarCursor() as cur:
+            cur.execute(SELECT_ALUNO_COM_NIVEL + "WHERE a.id > ? ORDER BY a.id LIMIT ?;", (aposId, limite))
+            rows = cur.fetchall()
+        
+            resultado = []
+            for row in rows:
+                resultado.append(self.criarDeRow(row))
+            return resultado
     
     def buscarPorNivel(self, nivelId: int):
-        cur = self.__db.cursor()
-        cur.execute("SELECT * FROM aluno WHERE nivel_id = ? ORDER BY nome;", (nivelId,))
-        rows = cur.fetchall()
+        with self.__db.usarCursor() as cur:
+            cur.execute(SELECT_ALUNO_COM_NIVEL + "WHERE a.nivel_id = ? ORDER BY a.nome;", (nivelId,))
+            rows = cur.fetchall()
         
-        resultado = []
-        for row in rows:
-            resultado.append(self.criarDeRow(row))
-        return resultado
+            resultado = []
+            for row in rows:
+                resultado.append(self.criarDeRow(row))
+            return resultado
+    
+    def consulta(self):
+        """Consulta composta sobre aluno (com o nivel no mesmo JOIN), ex.:
+        consulta().onde('ativo', 1).onde('nivel_id', 2).texto('ana').ordenarPor('nome').listar()"""
+        return Consulta(
+            self.__db, 'aluno',
+            origem="FROM aluno a LEFT JOIN nivel n ON n.id = a.nivel_id",
+            projecao="a.*, n.nome AS nivel_nome",
+            alias='a',
+            fabrica=self.criarDeRow,
+            chaveTexto='a.id',
+            ftsTexto='aluno_fts'
+        )
+    
+    def existe(self, campo: str, valor):
+        """True se há aluno com campo = valor (uma linha lida, nenhum objeto montado)"""
+        return existencia.existe(self.__db, 'aluno', campo, valor)
+    
+    def contar(self, filtros: dict | None = None):
+        """Quantidade de alunos que atendem a todos os filtros {campo: valor}"""
+        return existencia.contar(self.__db, 'aluno', filtros)
     
     def criarDeRow(self, row):
-        # Buscar a nivel usando o NivelDAO
-        nivelDao = NivelDAO(self.__db)
-        nivel = nivelDao.buscarPorId(row['nivel_id'])
+        if 'nivel_nome' in row.keys():
+            # Nivel já veio no JOIN (SELECT_ALUNO_COM_NIVEL): nenhuma consulta extra
+            nivel = None
+            if row['nivel_nome'] is not None:
+                nivel = NivelDAO(self.__db).criarDeRow({'id': row['nivel_id'], 'nome': row['nivel_nome']})
+        else:
+            # Buscar a nivel usando o NivelDAO
+            nivelDao = NivelDAO(self.__db)
+            nivel = nivelDao.buscarPorId(row['nivel_id'])
         
+        return self.__montar(row, nivel)
+    
+    def __montar(self, row, nivel):
         return Aluno(
             id=row['id'],
             nome=row['nome'],
@@ -102,11 +245,20 @@ class AlunoDAO:
             nivel=nivel
         )
     
+    def atualizarNiveis(self, mudancas):
+        """Troca o nível de vários alunos [(alunoId, nivelAtual, nivelNovo), ...] com um
+        executemany numa única transação. Só muda quem ainda está em nivelAtual;
+        retorna quantos alunos foram atualizados."""
+        return self.__db.executarVarios(
+            "UPDATE aluno SET nivel_id = ? WHERE id = ? AND nivel_id = ?;",
+            [(nivelNovo, alunoId, nivelAtual) for alunoId, nivelAtual, nivelNovo in mudancas]
+        )
+    
     def deletar(self, aluno: Aluno):        
-        cur = self.__db.cursor()
-        cur.execute("DELETE FROM aluno WHERE id = ?;", (aluno.id,))
+        with self.__db.usarCursor() as cur:
+            cur.execute("DELETE FROM aluno WHERE id = ?;", (aluno.id,))
 
-        return cur.rowcount > 0
+            return cur.rowcount > 0
     
     def obterNivel(self, aluno: Aluno):
         return aluno.nivel
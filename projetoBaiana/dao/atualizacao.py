@@ -0,0 +1,42 @@
+"""
+UPDATEs parciais a partir do rastreamento de alterações dos modelos (model/rastreavel.py):
+só as colunas das propriedades alteradas entram no SET, e nada é executado se nada mudou
+"""
+
+from bd.database import DatabaseConnection
+
+def valorColuna(valor):
+    # Relações podem vir como objeto do modelo, Referencia ou id cru; bool vira 0/1
+    valor = getattr(valor, 'id', valor)
+    return int(valor) if isinstance(valor, bool) else valor
+
+def __montarUpdate(tabela: str, colunas: dict, alterados):
+    propriedades = [p for p in colunas if p in alterados]
+    sets = ", ".join(f"{colunas[p]} = ?" for p in propriedades)
+    return propriedades, f"UPDATE {tabela} SET {sets} WHERE id = ?;"
+
+def atualizar(cur, tabela: str, obj, colunas: dict):
+    """UPDATE só das colunas alteradas de obj (colunas: {propriedade: coluna}).
+    Retorna False, sem tocar no banco, quando nada mudou."""
+    if not obj.alterados:
+        return False
+
+    propriedades, sql = __montarUpdate(tabela, colunas, obj.alterados)
+    cur.execute(sql, [valorColuna(getattr(obj, p)) for p in propriedades] + [obj.id])
+    obj.limparAlteracoes()
+    return True
+
+def atualizarVarios(db: DatabaseConnection, tabela: str, objs, colunas: dict):
+    """Como atualizar(), em lote: um executemany por combinação de colunas alteradas.
+    Retorna quantos objetos tinham alterações."""
+    grupos = {}
+    for obj in objs:
+        if obj.alterados:
+            grupos.setdefault(obj.alterados, []).append(obj)
+
+    for alterados, grupo in grupos.items():
+        propriedades, sql = __montarUpdate(tabela, colunas, alterados)
+        db.executarVarios(sql, [[valorColuna(getattr(o, p)) for p in propriedades] + [o.id] for o in grupo])
+        for obj in grupo:
+            obj.limparAlteracoes()
+    return sum(len(grupo) for grupo in grupos.values())
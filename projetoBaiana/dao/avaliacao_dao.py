@@ -3,46 +3,147 @@ DAO (Data Access Object) para operações de banco de dados da tabela avaliacao
 """
 
 from bd.database import DatabaseConnection
+from dao.aluno_dao import AlunoDAO
+from dao.busca_textual import buscarRows
+from dao.carregador_lote import TAMANHO_LOTE_IN, CarregadorLote, prefetchReferencias
+from dao.consulta import Consulta
+from dao.evento_dao import EventoDAO
+from dao.examinador_dao import ExaminadorDAO
+from dao.nivel_dao import NivelDAO
+from dao.paginacao import LIMITE_PAGINA, TAMANHO_LOTE, iterarLotes
+from dao import existencia
+from dao.atualizacao import atualizar, atualizarVarios
 from model.avaliacao_class import Avaliacao
+from model.referencia import Referencia
+
+# Propriedade do modelo -> coluna: salvar() grava só as alteradas (ver dao/atualizacao.py)
+COLUNAS = {'data': 'data', 'examinador': 'examinador_id', 'aluno': 'aluno_id', 'nivel': 'nivel_id',
+           'evento': 'evento_id', 'obs': 'obs'}
 
 class AvaliacaoDAO:
     def __init__(self, db: DatabaseConnection):
         self.__db = db
+        # DAOs das relações carregadas sob demanda (ver criarDeRow e prefetch)
+        self.__relacoes = {
+            'examinador': ExaminadorDAO(db),
+            'aluno': AlunoDAO(db),
+            'nivel': NivelDAO(db),
+            'evento': EventoDAO(db),
+        }
+    
+    def __idDe(self, valor):
+        # examinador/aluno/nivel/evento podem vir como objeto do modelo, Referencia (ver criarDeRow) ou id cru
+        return getattr(valor, 'id', valor)
     
     def salvar(self, avaliacao: Avaliacao):
-        cur = self.__db.cursor()
-        
-        # Converter boolean para integer (SQLite)
-        if avaliacao.id is None:
-            # INSERT
-            cur.execute("""
-                INSERT INTO avaliacao (data, examinador, aluno, nivel, evento, obs)
-                VALUES (?, ?, ?, ?, ?, ?);
-            """, (avaliacao.data, avaliacao.examinador, avaliacao.aluno, avaliacao.nivel, avaliacao.evento, avaliacao.obs))
+        with self.__db.usarCursor() as cur:
+            # Converter boolean para integer (SQLite)
+            if avaliacao.id is None:
+                # INSERT
+                cur.execute("""
+                    INSERT INTO avaliacao (data, examinador_id, aluno_id, nivel_id, evento_id, obs)
+                    VALUES (?, ?, ?, ?, ?, ?);
+                """, (avaliacao.data, self.__idDe(avaliacao.examinador), self.__idDe(avaliacao.aluno), self.__idDe(avaliacao.nivel), self.__idDe(avaliacao.evento), avaliacao.obs))
 
-            avaliacao.id = cur.lastrowid
-        else:
-            # UPDATE
-            cur.execute("""
-                UPDATE avaliacao SET data = ?, examinador = ?, aluno = ?, nivel = ?, evento = ?, obs = ?
-                WHERE id = ?;
-            """, (avaliacao.data, avaliacao.examinador, avaliacao.aluno, avaliacao.nivel, avaliacao.evento, avaliacao.obs))
+                avaliacao.id = cur.lastrowid
+                avaliacao.limparAlteracoes()
+            else:
+                # UPDATE: só as colunas alteradas (nenhuma instrução se nada mudou)
+                atualizar(cur, 'avaliacao', avaliacao, COLUNAS)
         
-        return avaliacao.id
+            return avaliacao.id
     
+    def salvarVarios(self, avaliacoes):
+        """Insere os novos e atualiza os existentes numa única transação (executemany).
+        Retorna os ids na mesma ordem de entrada."""
+        avaliacoes = list(avaliacoes)
+        novos = [a for a in avaliacoes if a.id is None]
+        existentes = [a for a in avaliacoes if a.id is not None]
+        
+        with self.__db.transacao():
+            ids = self.__db.inserirVarios("""
+                INSERT INTO avaliacao (data, examinador_id, aluno_id, nivel_id, evento_id, obs)
+                VALUES (?, ?, ?, ?, ?, ?);
+            """, [(a.data, self.__idDe(a.examinador), self.__idDe(a.aluno), self.__idDe(a.nivel), self.__idDe(a.evento), a.obs) for a in novos])
+            for a, id in zip(novos, ids):
+                a.id = id
+                a.limparAlteracoes()
+            
+            atualizarVarios(self.__db, 'avaliacao', existentes, COLUNAS)
+        
+        return [a.id for a in avaliacoes]
+
+    def gerarFichas(self, eventoId: int, nivelId: int, data: str,
+                    examinadorId: int | None = None, estiloId: int | None = None):
+        """Prepara as fichas de um evento numa única transação: uma avaliação para cada aluno
+        ativo do nível que ainda não tem avaliação no evento, e um item sem nota para cada
+        parâmetro do nível vinculado (parametro_estilo) ao estilo indicado, ou a qualquer estilo
+        se estiloId for None. Como em ParametrosDAO.modeloFicha, a ficha traz os parâmetros do
+        tipo de condução do aluno (comparado sem diferenciar maiúsculas) e os sem tipo de
+        condução, que valem para todos.
+        Tudo com INSERT ... SELECT no banco. Retorna (ids das avaliações criadas, quantidade de itens)."""
+        with self.__db.transacao() as conn:
+            ids = [row['id'] for row in conn.execute("""
+                INSERT INTO avaliacao (data, examinador_id, aluno_id, nivel_id, evento_id)
+                SELECT ?, ?, a.id, a.nivel_id, ?
+                FROM aluno a
+                WHERE a.nivel_id = ? AND a.ativo = 1
+                  AND NOT EXISTS (SELECT 1 FROM avaliacao v WHERE v.aluno_id = a.id AND v.evento_id = ?)
+                ORDER BY a.nome
+                RETURNING id;
+            """, (data, examinadorId, eventoId, nivelId, eventoId)).fetchall()]
+            ids.sort()
+
+            # Itens só das avaliações recém-criadas (pelos ids devolvidos, em lotes de IN)
+            quantidadeItens = 0
+            for inicio in range(0, len(ids), TAMANHO_LOTE_IN):
+                lote = ids[inicio:inicio + TAMANHO_LOTE_IN]
+                marcadores = ", ".join("?" * len(lote))
+                cur = conn.execute(f"""
+                    INSERT INTO itemAvaliacao (parametro_id, avaliacao_id, nota)
+                    SELECT p.id, v.id, NULL
+                    FROM avaliacao v
+                    JOIN aluno a ON a.id = v.aluno_id
+                    JOIN parametros p ON p.nivel_id = v.nivel_id
+                                    AND (p.tipoConducao IS NULL OR p.tipoConducao = a.tipoConducao COLLATE NOCASE)
+                    WHERE v.id IN ({marcadores})
+                      AND EXISTS (SELECT 1 FROM parametro_estilo pe
+                                  WHERE pe.parametro_id = p.id AND (? IS NULL OR pe.estilo_id = ?))
+                    ORDER BY v.id, p.id;
+                """, (*lote, estiloId, estiloId))
+                quantidadeItens += cur.rowcount
+            return ids, quantidadeItens
+
     def buscarPorId(self, id: int):
-        cur = self.__db.cursor()
-        cur.execute("SELECT * FROM avaliacao WHERE id = ?;", (id,))
-        row = cur.fetchone()
+        with self.__db.usarCursor() as cur:
+            cur.execute("SELECT * FROM avaliacao WHERE id = ?;", (id,))
+            row = cur.fetchone()
         
-        if row:
-            return self.criarDeRow(row)
-        return None
+            if row:
+                return self.criarDeRow(row)
+            return None
+    
+    def buscarPorIds(self, ids):
+        """Carrega vários registros com um único WHERE id IN (...); retorna {id: Avaliacao}"""
+        rows = CarregadorLote(self.__db, "SELECT * FROM avaliacao").carregar(ids)
+        return {id: self.criarDeRow(row) for id, row in rows.items()}
     
     def buscarPorNome(self, nome: str):
-        cur = self.__db.cursor()
-        cur.execute("SELECT * FROM avaliacao WHERE nome LIKE ?;", (f'%{nome}%',))
-        rows = cur.fetchall()
+        """Avaliações dos alunos cujo nome casa com a busca (avaliacao não tem nome próprio)"""
+        rows = buscarRows(
+            self.__db,
+            """
+                SELECT av.* FROM avaliacao av
+                JOIN aluno_fts f ON f.rowid = av.aluno_id
+                WHERE aluno_fts MATCH ? ORDER BY f.rank, av.data;
+            """,
+            """
+                SELECT av.* FROM avaliacao av
+                JOIN aluno a ON a.id = av.aluno_id
+                WHERE a.nome LIKE ? ORDER BY av.data;
+            """,
+            nome
+        )
         
         resultado = []
         for row in rows:
@@ -50,30 +151,83 @@ class AvaliacaoDAO:
         return resultado
     
     def listarTodos(self):
-        cur = self.__db.cursor()
-        cur.execute("SELECT * FROM avaliacao ORDER BY data;")
-        rows = cur.fetchall()
+        with self.__db.usarCursor() as cur:
+            cur.execute("SELECT * FROM avaliacao ORDER BY data;")
+            rows = cur.fetchall()
         
-        resultado = []
-        for row in rows:
-            resultado.append(self.criarDeRow(row))
-        return resultado
+            resultado = []
+            for row in rows:
+                resultado.append(self.criarDeRow(row))
+            return resultado
+    
+    def iterar(self, tamanhoLote: int = TAMANHO_LOTE):
+        """Mesmo conteúdo e ordem de listarTodos(), mas gerado aos poucos (fetchmany)"""
+        for lote in iterarLotes(self.__db, "SELECT * FROM avaliacao ORDER BY data;", (), tamanhoLote):
+            for row in lote:
+                yield self.criarDeRow(row)
+    
+    def pagina(self, aposId: int = 0, limite: int = LIMITE_PAGINA):
+        """Página por keyset: até `limite` registros com id > aposId, em ordem de id.
+        Para a próxima página passe o id do último registro recebido."""
+        with self.__db.usarCursor() as cur:
+            cur.execute("SELECT * FROM avaliacao WHERE id > ? ORDER BY id LIMIT ?;", (aposId, limite))
+            rows = cur.fetchall()
+        
+            resultado = []
+            for row in rows:
+                resultado.append(self.criarDeRow(row))
+            return resultado
+    
+    def consulta(self):
+        """Consulta composta sobre avaliacao; texto() busca pelo nome do aluno, ex.:
+        consulta().onde('evento_id', 1).onde('data', '2024-01-01', '>=').texto('ana').listar()"""
+        return Consulta(
+            self.__db, 'avaliacao',
+            fabrica=self.criarDeRow,
+            chaveTexto='aluno_id',
+            ftsTexto='aluno_fts'
+        )
+    
+    def existe(self, campo: str, valor):
+        """True se há avaliação com campo = valor (uma linha lida, nenhum objeto montado)"""
+        return existencia.existe(self.__db, 'avaliacao', campo, valor)
+    
+    def contar(self, filtros: dict | None = None):
+        """Quantidade de avaliações que atendem a todos os filtros {campo: valor}"""
+        return existencia.contar(self.__db, 'avaliacao', filtros)
     
     def criarDeRow(self, row):
         return Avaliacao(
             id=row['id'],
             data=row['data'],
-            examinador=row['examinador'],
-            aluno=row['aluno'],
-            nivel=row['nivel'],
-            evento=row['evento'],
+            examinador=self.__referencia('examinador', row['examinador_id']),
+            aluno=self.__referencia('aluno', row['aluno_id']),
+            nivel=self.__referencia('nivel', row['nivel_id']),
+            evento=self.__referencia('evento', row['evento_id']),
             obs=row['obs']
         )
     
+    def __referencia(self, relacao: str, id):
+        # Só o id; o objeto é buscado (buscarPorId, com mapa de identidade) no primeiro acesso
+        if id is None:
+            return None
+        return Referencia(id, self.__relacoes[relacao].buscarPorId)
+    
+    def prefetch(self, avaliacoes, *relacoes: str):
+        """Carrega antecipadamente as relações indicadas ('examinador', 'aluno', 'nivel', 'evento';
+        todas se nenhuma for passada): um IN por relação em vez de uma consulta por avaliação.
+        Retorna a lista de avaliações."""
+        avaliacoes = list(avaliacoes)
+        for relacao in relacoes or self.__relacoes:
+            if relacao not in self.__relacoes:
+                raise ValueError(f"Relação desconhecida em avaliacao: '{relacao}'")
+            prefetchReferencias(avaliacoes, relacao, self.__relacoes[relacao].buscarPorIds)
+        return avaliacoes
+    
     def deletar(self, avaliacao: Avaliacao):        
-        cur = self.__db.cursor()
-        cur.execute("DELETE FROM avaliacao WHERE id = ?;", (avaliacao.id,))
+        with self.__db.usarCursor() as cur:
+            cur.execute("DELETE FROM avaliacao WHERE id = ?;", (avaliacao.id,))
 
-        return cur.rowcount > 0
+            return cur.rowcount > 0
     
     
\ No newline at end of file
@@ -0,0 +1,30 @@
+"""
+Busca textual por nome sobre as tabelas FTS5 (aluno_fts, evento_fts, parametros_fts)
+criadas na migração 4 (ver bd/migracoes.py)
+"""
+import re
+import sqlite3
+
+def termoFts(texto: str):
+    """Converte o texto digitado numa consulta FTS5 de prefixo ('ana sil' -> '"ana"* "sil"*').
+    Retorna None quando não há nenhuma palavra para buscar."""
+    palavras = re.findall(r"\w+", texto or "")
+    if not palavras:
+        return None
+    return " ".join(f'"{palavra}"*' for palavra in palavras)
+
+def buscarRows(db, sqlFts: str, sqlLike: str, texto: str, *extras):
+    """Executa sqlFts com o termo FTS5 (ordenado por relevância) e cai para sqlLike
+    (LIKE '%texto%') quando o texto não tem palavras ou o banco não tem FTS5"""
+    termo = termoFts(texto)
+    with db.usarCursor() as cur:
+        if termo is not None:
+            try:
+                cur.execute(sqlFts, (termo, *extras))
+                return cur.fetchall()
+            except sqlite3.OperationalError:
+                # SQLite sem o módulo fts5: a migração 4 não criou as tabelas *_fts
+                pass
+
+        cur.execute(sqlLike, (f'%{texto}%', *extras))
+        return cur.fetchall()
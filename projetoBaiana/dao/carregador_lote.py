@@ -0,0 +1,55 @@
+"""
+Carregador em lote (estilo dataloader): junta as chaves estrangeiras de uma página
+de linhas e resolve todas com um único WHERE id IN (...) por tabela
+"""
+
+from bd.database import DatabaseConnection
+
+# Abaixo do limite de parâmetros por instrução das versões antigas do SQLite (999)
+TAMANHO_LOTE_IN = 900
+
+class CarregadorLote:
+    def __init__(self, db: DatabaseConnection, sql: str, coluna: str = 'id'):
+        self.__db = db
+        self.__sql = sql
+        self.__coluna = coluna
+        self.__pendentes = set()
+        self.__linhas = {}
+
+    def adicionar(self, chave):
+        """Registra uma chave para a próxima resolução (None e repetidas são ignoradas)"""
+        if chave is not None and chave not in self.__linhas:
+            self.__pendentes.add(chave)
+
+    def resolver(self):
+        """Busca as chaves pendentes e retorna {chave: row} de tudo que já foi carregado"""
+        pendentes = list(self.__pendentes)
+        self.__pendentes.clear()
+
+        with self.__db.usarCursor() as cur:
+            for inicio in range(0, len(pendentes), TAMANHO_LOTE_IN):
+                lote = pendentes[inicio:inicio + TAMANHO_LOTE_IN]
+                marcadores = ", ".join("?" * len(lote))
+                cur.execute(f"{self.__sql} WHERE {self.__coluna} IN ({marcadores});", lote)
+                for row in cur.fetchall():
+                    self.__linhas[row[self.__coluna]] = row
+
+        return self.__linhas
+
+    def carregar(self, chaves):
+        """Atalho: adiciona todas as chaves e resolve"""
+        for chave in chaves:
+            self.adicionar(chave)
+        return self.resolver()
+
+def prefetchReferencias(objetos, atributo: str, buscarPorIds):
+    """Preenche de uma vez as Referencias ainda não carregadas em objeto.<atributo>,
+    com um único buscarPorIds(ids) -> {id: objeto}"""
+    referencias = [getattr(o, atributo) for o in objetos]
+    referencias = [r for r in referencias if hasattr(r, 'preencher') and not r.carregada]
+    if not referencias:
+        return
+
+    carregados = buscarPorIds({r.id for r in referencias})
+    for referencia in referencias:
+        referencia.preencher(carregados.get(referencia.id))
@@ -0,0 +1,229 @@
+"""
+Construtor de consultas dos DAOs: combina critérios, busca por nome, ordenação, projeção
+e limite numa única instrução SQL parametrizada.
+
+O texto SQL depende só da "forma" da consulta (quais campos, operadores e cláusulas),
+nunca dos valores; por isso é compilado uma vez por forma e reaproveitado, e o SQLite
+reaproveita o mesmo prepared statement do cache de cada conexão.
+
+Uso:
+    alunoDao.consulta().onde('ativo', 1).onde('nivel_id', 3).texto('ana').ordenarPor('nome').limite(20).listar()
+"""
+import sqlite3
+from collections import namedtuple
+from functools import lru_cache
+from itertools import chain
+
+from bd.database import DatabaseConnection
+from dao import existencia
+from dao.busca_textual import termoFts
+from dao.paginacao import TAMANHO_LOTE, iterarLotes
+
+OPERADORES = ("=", "!=", "<>", "<", "<=", ">", ">=", "LIKE", "IN")
+
+@lru_cache(maxsize=256)
+def compilar(origem: str, projecao: str, criterios: tuple, texto: str | None,
+             ordem: tuple, limite: bool, deslocamento: bool):
+    """Monta o SQL de uma forma de consulta. Todos os argumentos descrevem a forma:
+    criterios = ((coluna, operador, quantidadeDeValores), ...), texto = fragmento de busca"""
+    condicoes = []
+    for coluna, operador, quantidade in criterios:
+        if operador in ("IS NULL", "IS NOT NULL"):
+            condicoes.append(f"{coluna} {operador}")
+        elif operador == "IN":
+            condicoes.append(f"{coluna} IN ({', '.join('?' * quantidade)})")
+        else:
+            condicoes.append(f"{coluna} {operador} ?")
+    if texto is not None:
+        condicoes.append(texto)
+
+    sql = f"SELECT {projecao} {origem}"
+    if condicoes:
+        sql += " WHERE " + " AND ".join(condicoes)
+    if ordem:
+        sql += " ORDER BY " + ", ".join(f"{coluna} {'DESC' if desc else 'ASC'}" for coluna, desc in ordem)
+    if limite:
+        sql += " LIMIT ?"
+        if deslocamento:
+            sql += " OFFSET ?"
+    return sql + ";"
+
+@lru_cache(maxsize=64)
+def tipoRegistro(campos: tuple):
+    """namedtuple com esses campos (uma classe por projeção, criada uma vez só)"""
+    return namedtuple("Registro", campos)
+
+class Consulta:
+    def __init__(self, db: DatabaseConnection, tabela: str, origem: str | None = None,
+                 projecao: str = "*", alias: str | None = None, fabrica=None,
+                 chaveTexto: str | None = None, ftsTexto: str | None = None):
+        """tabela: tabela principal (valida os nomes de campo); origem: cláusula FROM com os JOINs;
+        fabrica: converte uma row no objeto do modelo (criarDeRow do DAO);
+        chaveTexto/ftsTexto: coluna comparada com os rowids do índice FTS5 em texto()"""
+        self.__db = db
+        self.__tabela = tabela
+        self.__origem = origem or f"FROM {tabela}"
+        self.__projecaoPadrao = projecao
+        self.__prefixo = f"{alias}." if alias else ""
+        self.__fabrica = fabrica
+        self.__chaveTexto = chaveTexto
+        self.__ftsTexto = ftsTexto
+
+        self.__criterios = []
+        self.__valores = []
+        self.__texto = None
+        self.__projecao = None
+        self.__ordem = []
+        self.__limite = None
+        self.__deslocamento = None
+
+    def __coluna(self, campo: str):
+        existencia.validarCampo(self.__db, self.__tabela, campo)
+        return self.__prefixo + campo
+
+    def onde(self, campo: str, valor, operador: str = "="):
+        """Acrescenta o critério `campo operador valor` (combinado com AND).
+        valor None vira IS NULL com '=' e IS NOT NULL com '!='/'<>' (outros operadores
+        não aceitam None); com operador 'IN' o valor é uma lista."""
+        operador = operador.upper()
+        if operador not in OPERADORES:
+            raise ValueError(f"Operador não suportado: '{operador}'")
+
+        coluna = self.__coluna(campo)
+        if valor is None:
+            if operador == "=":
+                self.__criterios.append((coluna, "IS NULL", 0))
+            elif operador in ("!=", "<>"):
+                self.__criterios.append((coluna, "IS NOT NULL", 0))
+            else:
+                raise ValueError(f"Valor None não pode ser usado com '{operador}' em '{campo}'")
+        elif operador == "IN":
+            valores = list(valor)
+            if not valores:
+                raise ValueError(f"Lista vazia no filtro IN de '{campo}'")
+            self.__criterios.append((coluna, "IN", len(valores)))
+            self.__valores.extend(valores)
+        else:
+            self.__criterios.append((coluna, operador, 1))
+            self.__valores.append(valor)
+        return self
+
+    def texto(self, busca: str):
+        """Busca por prefixo de palavras no nome (FTS5), sem acento nem caixa"""
+        if self.__chaveTexto is None:
+            raise ValueError(f"Consulta de {self.__tabela} não tem busca por nome")
+        self.__texto = busca
+        return self
+
+    def selecionar(self, *campos: str):
+        """Projeção: traz só esses campos da tabela principal (use linhas(), não listar())"""
+        self.__projecao = tuple(self.__coluna(campo) for campo in campos)
+        return self
+
+    def ordenarPor(self, campo: str, decrescente: bool = False):
+        self.__ordem.append((self.__coluna(campo), decrescente))
+        return self
+
+    def limite(self, quantidade: int, deslocamento: int | None = None):
+        self.__limite = quantidade
+        self.__deslocamento = deslocamento
+        return self
+
+    def __montar(self, projecao: str, comFts: bool, contagem: bool = False):
+        parametros = list(self.__valores)
+        fragmento = None
+        if self.__texto is not None:
+            termo = termoFts(self.__texto) if comFts else None
+            if termo is not None:
+                fragmento = f"{self.__chaveTexto} IN (SELECT rowid FROM {self.__ftsTexto} WHERE {self.__ftsTexto} MATCH ?)"
+                parametros.append(termo)
+            else:
+                # Sem FTS5 (ou sem palavras): mesmo filtro com LIKE na tabela de conteúdo
+                conteudo = self.__ftsTexto.removesuffix("_fts")
+                fragmento = f"{self.__chaveTexto} IN (SELECT id FROM {conteudo} WHERE nome LIKE ?)"
+                parametros.append(f"%{self.__texto}%")
+
+        temLimite = self.__limite is not None and not contagem
+        temDeslocamento = temLimite and self.__deslocamento is not None
+        if temLimite:
+            parametros.append(self.__limite)
+        if temDeslocamento:
+            parametros.append(self.__deslocamento)
+
+        sql = compilar(self.__origem, projecao, tuple(self.__criterios), fragmento,
+                       () if contagem else tuple(self.__ordem), temLimite, temDeslocamento)
+        return sql, parametros
+
+    def compilar(self, comFts: bool = True):
+        """Retorna (sql, parametros) da consulta, sem executá-la"""
+        projecao = ", ".join(self.__projecao) if self.__projecao else self.__projecaoPadrao
+        return self.__montar(projecao, comFts)
+
+    def __executar(self, contagem: bool = False, tuplas: bool = False):
+        with self.__db.usarCursor() as cur:
+            if tuplas:
+                # Tuplas cruas do sqlite3, sem nem criar sqlite3.Row
+                cur.row_factory = None
+            try:
+                if contagem:
+                    cur.execute(*self.__montar("COUNT(*)", True, contagem=True))
+                else:
+                    cur.execute(*self.compilar())
+            except sqlite3.OperationalError:
+                if self.__texto is None:
+                    raise
+                # SQLite sem o módulo fts5: a migração 4 não criou as tabelas *_fts
+                if contagem:
+                    cur.execute(*self.__montar("COUNT(*)", False, contagem=True))
+                else:
+                    cur.execute(*self.compilar(comFts=False))
+            return cur.fetchall()
+
+    def linhas(self):
+        """Executa e retorna as rows (sqlite3.Row), sem montar objetos do modelo"""
+        return self.__executar()
+
+    def tuplas(self):
+        """Executa e retorna tuplas simples, na ordem dos campos de selecionar()"""
+        return self.__executar(tuplas=True)
+
+    def registros(self):
+        """Executa e retorna registros leves (namedtuple) com os campos de selecionar():
+        acesso por nome (r.id, r.nome) sem montar objetos do modelo"""
+        if not self.__projecao:
+            raise ValueError("registros() exige selecionar() com os campos desejados")
+        Registro = tipoRegistro(tuple(coluna.split('.')[-1] for coluna in self.__projecao))
+        return [Registro._make(linha) for linha in self.__executar(tuplas=True)]
+
+    def listar(self):
+        """Executa e retorna os objetos do modelo montados pela fábrica do DAO"""
+        if self.__projecao:
+            raise ValueError("Consulta com selecionar() retorna rows: use linhas()")
+        return [self.__fabrica(row) for row in self.__executar()]
+
+    def iterar(self, tamanhoLote: int = TAMANHO_LOTE):
+        """Como listar(), mas gerado aos poucos (fetchmany)"""
+        if self.__projecao:
+            raise ValueError("Consulta com selecionar() retorna rows: use linhas()")
+        lotes = iterarLotes(self.__db, *self.compilar(), tamanhoLote=tamanhoLote)
+        try:
+            primeiro = next(lotes, [])
+        except sqlite3.OperationalError:
+            if self.__texto is None:
+                raise
+            # SQLite sem o módulo fts5: mesmo filtro com LIKE, como em listar()
+            lotes = iterarLotes(self.__db, *self.compilar(comFts=False), tamanhoLote=tamanhoLote)
+            primeiro = next(lotes, [])
+        for lote in chain([primeiro], lotes):
+            for row in lote:
+                yield self.__fabrica(row)
+
+    def primeiro(self):
+        """Primeiro objeto do resultado (ou None)"""
+        self.limite(1)
+        resultado = self.listar()
+        return resultado[0] if resultado else None
+
+    def contar(self):
+        """COUNT(*) com os mesmos critérios (ignora ordenação e limite)"""
+        return self.__executar(contagem=True)[0][0]
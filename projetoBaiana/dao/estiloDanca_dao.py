@@ -3,71 +3,160 @@ DAO (Data Access Object) para operações de banco de dados da tabela estiloDanc
 """
 
 from bd.database import DatabaseConnection
+from dao.paginacao import LIMITE_PAGINA, TAMANHO_LOTE, iterarLotes
+from dao.consulta import Consulta
+from dao import existencia
+from dao.atualizacao import atualizar, atualizarVarios
 from model.estiloDanca_class import EstiloDanca
 
+# Propriedade do modelo -> coluna: salvar() grava só as alteradas (ver dao/atualizacao.py)
+COLUNAS = {'nome': 'nome'}
+
 class EstiloDancaDAO:
     def __init__(self, db: DatabaseConnection):
         self.__db = db
     
     def salvar(self, estiloDanca: EstiloDanca):
-        cur = self.__db.cursor()
-        
-        # Converter boolean para integer (SQLite)
-        if estiloDanca.id is None:
-            # INSERT
-            cur.execute("""
-                INSERT INTO estiloDanca (nome)
-                VALUES (?);
-            """, (estiloDanca.nome))
+        try:
+            with self.__db.usarCursor() as cur:
+                # Converter boolean para integer (SQLite)
+                if estiloDanca.id is None:
+                    # INSERT
+                    cur.execute("""
+                        INSERT INTO estiloDanca (nome)
+                        VALUES (?);
+                    """, (estiloDanca.nome,))
 
-            estiloDanca.id = cur.lastrowid
-        else:
-            # UPDATE
+                    estiloDanca.id = cur.lastrowid
+                    estiloDanca.limparAlteracoes()
+                else:
+                    # UPDATE: só as colunas alteradas (nenhuma instrução se nada mudou)
+                    atualizar(cur, 'estiloDanca', estiloDanca, COLUNAS)
+        
+                return estiloDanca.id
+        finally:
+            # Também quando a gravação falha: a instância compartilhada pelo mapa pode ter
+            # alterações que não foram para o banco
+            if estiloDanca.id is not None:
+                self.__db.mapaIdentidade.invalidar('estiloDanca', estiloDanca.id)
+    
+    def salvarVarios(self, estilos):
+        """Insere os novos e atualiza os existentes numa única transação (executemany).
+        Retorna os ids na mesma ordem de entrada."""
+        estilos = list(estilos)
+        novos = [e for e in estilos if e.id is None]
+        existentes = [e for e in estilos if e.id is not None]
+        
+        try:
+            with self.__db.transacao():
+                ids = self.__db.inserirVarios("INSERT INTO estiloDanca (nome) VALUES (?);", [(e.nome,) for e in novos])
+                for e, id in zip(novos, ids):
+                    e.id = id
+                    e.limparAlteracoes()
+            
+                atualizarVarios(self.__db, 'estiloDanca', existentes, COLUNAS)
+        finally:
+            for e in estilos:
+                if e.id is not None:
+                    self.__db.mapaIdentidade.invalidar('estiloDanca', e.id)
+        return [e.id for e in estilos]
+    
+    def inserirSeNovo(self, estiloDanca: EstiloDanca):
+        """Insere o estilo numa única instrução atômica (sem SELECT antes).
+        Retorna True se foi criado; False se já existe um estilo com esse nome."""
+        with self.__db.usarCursor() as cur:
             cur.execute("""
-                UPDATE estiloDanca SET nome = ?
-                WHERE id = ?;
-            """, (estiloDanca.nome))
+                INSERT INTO estiloDanca (nome) VALUES (?)
+                ON CONFLICT (nome) DO NOTHING
+                RETURNING id;
+            """, (estiloDanca.nome,))
+            row = cur.fetchone()
         
-        return estiloDanca.id
+            if row is None:
+                return False
+            estiloDanca.id = row['id']
+            estiloDanca.limparAlteracoes()
+            return True
     
     def buscarPorId(self, id: int):
-        cur = self.__db.cursor()
-        cur.execute("SELECT * FROM estiloDanca WHERE id = ?;", (id,))
-        row = cur.fetchone()
+        # Instância já carregada nesta sessão: nenhuma leitura no banco
+        estiloDanca = self.__db.mapaIdentidade.obter('estiloDanca', id)
+        if estiloDanca is not None:
+            return estiloDanca
         
-        if row:
-            return self.criarDeRow(row)
-        return None
+        with self.__db.usarCursor() as cur:
+            cur.execute("SELECT * FROM estiloDanca WHERE id = ?;", (id,))
+            row = cur.fetchone()
+        
+            if row:
+                return self.criarDeRow(row)
+            return None
     
     def buscarPorNome(self, nome: str):
-        cur = self.__db.cursor()
-        cur.execute("SELECT * FROM estiloDanca WHERE nome LIKE ?;", (f'%{nome}%',))
-        rows = cur.fetchall()
+        with self.__db.usarCursor() as cur:
+            cur.execute("SELECT * FROM estiloDanca WHERE nome LIKE ?;", (f'%{nome}%',))
+            rows = cur.fetchall()
         
-        resultado = []
-        for row in rows:
-            resultado.append(self.criarDeRow(row))
-        return resultado
+            resultado = []
+            for row in rows:
+                resultado.append(self.criarDeRow(row))
+            return resultado
     
     def listarTodos(self):
-        cur = self.__db.cursor()
-        cur.execute("SELECT * FROM estiloDanca ORDER BY nome;")
-        rows = cur.fetchall()
+        with self.__db.usarCursor() as cur:
+            cur.execute("SELECT * FROM estiloDanca ORDER BY nome;")
+            rows = cur.fetchall()
+        
+            resultado = []
+            for row in rows:
+                resultado.append(self.criarDeRow(row))
+            return resultado
+    
+    def iterar(self, tamanhoLote: int = TAMANHO_LOTE):
+        """Mesmo conteúdo e ordem de listarTodos(), mas gerado aos poucos (fetchmany)"""
+        for lote in iterarLotes(self.__db, "SELECT * FROM estiloDanca ORDER BY nome;", (), tamanhoLote):
+            for row in lote:
+                yield self.criarDeRow(row)
+    
+    def pagina(self, aposId: int = 0, limite: int = LIMITE_PAGINA):
+        """Página por keyset: até `limite` registros com id > aposId, em ordem de id.
+        Para a próxima página passe o id do último registro recebido."""
+        with self.__db.usarCursor() as cur:
+            cur.execute("SELECT * FROM estiloDanca WHERE id > ? ORDER BY id LIMIT ?;", (aposId, limite))
+            rows = cur.fetchall()
         
-        resultado = []
-        for row in rows:
-            resultado.append(self.criarDeRow(row))
-        return resultado
+            resultado = []
+            for row in rows:
+                resultado.append(self.criarDeRow(row))
+            return resultado
+    
+    def consulta(self):
+        """Consulta composta sobre estiloDanca, ex.:
+        consulta().selecionar('id', 'nome').ordenarPor('nome').tuplas()"""
+        return Consulta(self.__db, 'estiloDanca', fabrica=self.criarDeRow)
+    
+    def existe(self, campo: str, valor):
+        """True se há estilo com campo = valor (uma linha lida, nenhum objeto montado)"""
+        return existencia.existe(self.__db, 'estiloDanca', campo, valor)
+    
+    def contar(self, filtros: dict | None = None):
+        """Quantidade de estilos que atendem a todos os filtros {campo: valor}"""
+        return existencia.contar(self.__db, 'estiloDanca', filtros)
     
     def criarDeRow(self, row):
-        return EstiloDanca(
+        # Mesma instância para o mesmo id enquanto não houver salvar/deletar
+        return self.__db.mapaIdentidade.registrar('estiloDanca', row['id'], lambda: EstiloDanca(
             id=row['id'],
             nome=row['nome']
-        )
+        ))
     
     def deletar(self, estiloDanca: EstiloDanca):        
-        cur = self.__db.cursor()
-        cur.execute("DELETE FROM estiloDanca WHERE id = ?;", (estiloDanca.id,))
+        with self.__db.usarCursor() as cur:
+            cur.execute("DELETE FROM estiloDanca WHERE id = ?;", (estiloDanca.id,))
+            self.__db.mapaIdentidade.invalidar('estiloDanca', estiloDanca.id)
+            # Os parâmetros do estilo são apagados em cascata: descarta os caches derivados deles
+            # depois do COMMIT
+            self.__db.aoConfirmar(self.__db.invalidarCaches)
 
-        return cur.rowcount > 0
+            return cur.rowcount > 0
     
\ No newline at end of file
@@ -3,46 +3,85 @@ DAO (Data Access Object) para operações de banco de dados da tabela evento
 """
 
 from bd.database import DatabaseConnection
+from dao.busca_textual import buscarRows
+from dao.paginacao import LIMITE_PAGINA, TAMANHO_LOTE, iterarLotes
+from dao.carregador_lote import CarregadorLote
+from dao.consulta import Consulta
+from dao import existencia
+from dao.atualizacao import atualizar, atualizarVarios
 from model.evento_class import Evento
 
+# Propriedade do modelo -> coluna: salvar() grava só as alteradas (ver dao/atualizacao.py)
+COLUNAS = {'nome': 'nome', 'dataEvento': 'dataEvento', 'homenageado': 'homenageado'}
+
 class EventoDAO:
     def __init__(self, db: DatabaseConnection):
         self.__db = db
     
     def salvar(self, evento: Evento):
-        cur = self.__db.cursor()
+        with self.__db.usarCursor() as cur:
+            # Converter boolean para integer (SQLite)
+            if evento.id is None:
+                # INSERT
+                cur.execute("""
+                    INSERT INTO evento (nome, dataEvento, homenageado)
+                    VALUES (?, ?, ?);
+                """, (evento.nome, evento.dataEvento, evento.homenageado))
+
+                evento.id = cur.lastrowid
+                evento.limparAlteracoes()
+            else:
+                # UPDATE: só as colunas alteradas (nenhuma instrução se nada mudou)
+                atualizar(cur, 'evento', evento, COLUNAS)
         
-        # Converter boolean para integer (SQLite)
-        if evento.id is None:
-            # INSERT
-            cur.execute("""
+            return evento.id
+    
+    def salvarVarios(self, eventos):
+        """Insere os novos e atualiza os existentes numa única transação (executemany).
+        Retorna os ids na mesma ordem de entrada."""
+        eventos = list(eventos)
+        novos = [e for e in eventos if e.id is None]
+        existentes = [e for e in eventos if e.id is not None]
+        
+        with self.__db.transacao():
+            ids = self.__db.inserirVarios("""
                 INSERT INTO evento (nome, dataEvento, homenageado)
                 VALUES (?, ?, ?);
-            """, (evento.nome, evento.dataEvento, evento.homenageado))
-
-            evento.id = cur.lastrowid
-        else:
-            # UPDATE
-            cur.execute("""
-                UPDATE evento SET nome = ?, dataEvento = ?, homenageado = ?
-                WHERE id = ?;
-            """, (evento.nome, evento.dataEvento, evento.homenageado))
+            """, [(e.nome, e.dataEvento, e.homenageado) for e in novos])
+            for e, id in zip(novos, ids):
+                e.id = id
+                e.limparAlteracoes()
+            
+            atualizarVarios(self.__db, 'evento', existentes, COLUNAS)
         
-        return evento.id
+        return [e.id for e in eventos]
     
     def buscarPorId(self, id: int):
-        cur = self.__db.cursor()
-        cur.execute("SELECT * FROM evento WHERE id = ?;", (id,))
-        row = cur.fetchone()
+        with self.__db.usarCursor() as cur:
+            cur.execute("SELECT * FROM evento WHERE id = ?;", (id,))
+            row = cur.fetchone()
         
-        if row:
-            return self.criarDeRow(row)
-        return None
+            if row:
+                return self.criarDeRow(row)
+            return None
+    
+    def buscarPorIds(self, ids):
+        """Carrega vários registros com um único WHERE id IN (...); retorna {id: Evento}"""
+        rows = CarregadorLote(self.__db, "SELECT * FROM evento").carregar(ids)
+        return {id: self.criarDeRow(row) for id, row in rows.items()}
     
     def buscarPorNome(self, nome: str):
-        cur = self.__db.cursor()
-        cur.execute("SELECT * FROM evento WHERE nome LIKE ?;", (f'%{nome}%',))
-        rows = cur.fetchall()
+        """Busca por prefixo no nome do evento e no homenageado, sem acento nem caixa"""
+        rows = buscarRows(
+            self.__db,
+            """
+                SELECT e.* FROM evento e
+                JOIN evento_fts f ON f.rowid = e.id
+                WHERE evento_fts MATCH ? ORDER BY f.rank;
+            """,
+            "SELECT * FROM evento WHERE nome LIKE ?;",
+            nome
+        )
         
         resultado = []
         for row in rows:
@@ -50,14 +89,45 @@ class EventoDAO:
         return resultado
     
     def listarTodos(self):
-        cur = self.__db.cursor()
-        cur.execute("SELECT * FROM evento ORDER BY dataEvento;")
-        rows = cur.fetchall()
+        with self.__db.usarCursor() as cur:
+            cur.execute("SELECT * FROM evento ORDER BY dataEvento;")
+            rows = cur.fetchall()
         
-        resultado = []
-        for row in rows:
-            resultado.append(self.criarDeRow(row))
-        return resultado
+            resultado = []
+            for row in rows:
+                resultado.append(self.criarDeRow(row))
+            return resultado
+    
+    def iterar(self, tamanhoLote: int = TAMANHO_LOTE):
+        """Mesmo conteúdo e ordem de listarTodos(), mas gerado aos poucos (fetchmany)"""
+        for lote in iterarLotes(self.__db, "SELECT * FROM evento ORDER BY dataEvento;", (), tamanhoLote):
+            for row in lote:
+                yield self.criarDeRow(row)
+    
+    def pagina(self, aposId: int = 0, limite: int = LIMITE_PAGINA):
+        """Página por keyset: até `limite` registros com id > aposId, em ordem de id.
+        Para a próxima página passe o id do último registro recebido."""
+        with self.__db.usarCursor() as cur:
+            cur.execute("SELECT * FROM evento WHERE id > ? ORDER BY id LIMIT ?;", (aposId, limite))
+            rows = cur.fetchall()
+        
+            resultado = []
+            for row in rows:
+                resultado.append(self.criarDeRow(row))
+            return resultado
+    
+    def consulta(self):
+        """Consulta composta sobre evento, ex.:
+        consulta().selecionar('id', 'nome', 'dataEvento').ordenarPor('dataEvento').registros()"""
+        return Consulta(self.__db, 'evento', fabrica=self.criarDeRow, chaveTexto='id', ftsTexto='evento_fts')
+    
+    def existe(self, campo: str, valor):
+        """True se há evento com campo = valor (uma linha lida, nenhum objeto montado)"""
+        return existencia.existe(self.__db, 'evento', campo, valor)
+    
+    def contar(self, filtros: dict | None = None):
+        """Quantidade de eventos que atendem a todos os filtros {campo: valor}"""
+        return existencia.contar(self.__db, 'evento', filtros)
     
     def criarDeRow(self, row):
         return Evento(
@@ -68,8 +138,8 @@ class EventoDAO:
         )
     
     def deletar(self, evento: Evento):        
-        cur = self.__db.cursor()
-        cur.execute("DELETE FROM evento WHERE id = ?;", (evento.id,))
+        with self.__db.usarCursor() as cur:
+            cur.execute("DELETE FROM evento WHERE id = ?;", (evento.id,))
 
-        return cur.rowcount > 0
+            return cur.rowcount > 0
 
@@ -3,72 +3,209 @@ DAO (Data Access Object) para operações de banco de dados da tabela examinador
 """
 
 from bd.database import DatabaseConnection
+from dao.paginacao import LIMITE_PAGINA, TAMANHO_LOTE, iterarLotes
+from dao.carregador_lote import CarregadorLote
+from dao.consulta import Consulta
+from dao import existencia
+from dao.atualizacao import atualizar, atualizarVarios
 from model.examinador_class import Examinador
 
+# Propriedade do modelo -> coluna: salvar() grava só as alteradas (ver dao/atualizacao.py)
+COLUNAS = {'nome': 'nome', 'contato': 'contato'}
+
 class ExaminadorDAO:
     def __init__(self, db: DatabaseConnection):
         self.__db = db
     
     def salvar(self, examinador: Examinador):
-        cur = self.__db.cursor()
-        
-        # Converter boolean para integer (SQLite)
-        if examinador.id is None:
-            # INSERT
-            cur.execute("""
-                INSERT INTO examinador (nome, contato)
-                VALUES (?, ?);
-            """, (examinador.nome, examinador.contato))
+        try:
+            with self.__db.usarCursor() as cur:
+                # Converter boolean para integer (SQLite)
+                if examinador.id is None:
+                    # INSERT
+                    cur.execute("""
+                        INSERT INTO examinador (nome, contato)
+                        VALUES (?, ?);
+                    """, (examinador.nome, examinador.contato))
 
-            examinador.id = cur.lastrowid
-        else:
-            # UPDATE
+                    examinador.id = cur.lastrowid
+                    examinador.limparAlteracoes()
+                else:
+                    # UPDATE: só as colunas alteradas (nenhuma instrução se nada mudou)
+                    atualizar(cur, 'examinador', examinador, COLUNAS)
+        
+                return examinador.id
+        finally:
+            # Também quando a gravação falha: a instância compartilhada pelo mapa pode ter
+            # alterações que não foram para o banco
+            if examinador.id is not None:
+                self.__db.mapaIdentidade.invalidar('examinador', examinador.id)
+    
+    def salvarVarios(self, examinadores):
+        """Insere os novos e atualiza os existentes numa única transação (executemany).
+        Retorna os ids na mesma ordem de entrada."""
+        examinadores = list(examinadores)
+        novos = [e for e in examinadores if e.id is None]
+        existentes = [e for e in examinadores if e.id is not None]
+        
+        try:
+            with self.__db.transacao():
+                ids = self.__db.inserirVarios("""
+                    INSERT INTO examinador (nome, contato)
+                    VALUES (?, ?);
+                """, [(e.nome, e.contato) for e in novos])
+                for e, id in zip(novos, ids):
+                    e.id = id
+                    e.limparAlteracoes()
+            
+                atualizarVarios(self.__db, 'examinador', existentes, COLUNAS)
+        finally:
+            for e in examinadores:
+                if e.id is not None:
+                    self.__db.mapaIdentidade.invalidar('examinador', e.id)
+        return [e.id for e in examinadores]
+    
+    def inserirSeNovo(self, examinador: Examinador):
+        """Insere o examinador numa única instrução atômica (sem SELECT antes).
+        Retorna True se foi criado; False se o contato já está cadastrado."""
+        with self.__db.usarCursor() as cur:
             cur.execute("""
-                UPDATE examinador SET nome = ?, contato = ?
-                WHERE id = ?;
+                INSERT INTO examinador (nome, contato) VALUES (?, ?)
+                ON CONFLICT (contato) DO NOTHING
+                RETURNING id;
             """, (examinador.nome, examinador.contato))
+            row = cur.fetchone()
         
-        return examinador.id
+            if row is None:
+                return False
+            examinador.id = row['id']
+            examinador.limparAlteracoes()
+            return True
+    
+    def upsert(self, examinador: Examinador):
+        """Cria o examinador ou, se o contato já existe, atualiza o nome do registro existente.
+        Preenche examinador.id nos dois casos; retorna True se foi criado."""
+        with self.__db.transacao() as conn:
+            if self.inserirSeNovo(examinador):
+                return True
+            
+            row = conn.execute("""
+                UPDATE examinador SET nome = ?
+                WHERE contato = ?
+                RETURNING id;
+            """, (examinador.nome, examinador.contato)).fetchone()
+            examinador.id = row['id']
+            examinador.limparAlteracoes()
+        
+        self.__db.mapaIdentidade.invalidar('examinador', examinador.id)
+        return False
     
     def buscarPorId(self, id: int):
-        cur = self.__db.cursor()
-        cur.execute("SELECT * FROM examinador WHERE id = ?;", (id,))
-        row = cur.fetchone()
+        # Instância já carregada nesta sessão: nenhuma leitura no banco
+        examinador = self.__db.mapaIdentidade.obter('examinador', id)
+        if examinador is not None:
+            return examinador
+        
+        with self.__db.usarCursor() as cur:
+            cur.execute("SELECT * FROM examinador WHERE id = ?;", (id,))
+            row = cur.fetchone()
         
-        if row:
-            return self.criarDeRow(row)
-        return None
+            if row:
+                return self.criarDeRow(row)
+            return None
+    
+    def buscarPorIds(self, ids):
+        """Carrega vários examinadores com um único WHERE id IN (...); retorna {id: Examinador}.
+        Os que já estão no mapa de identidade não são lidos de novo."""
+        mapa = self.__db.mapaIdentidade
+        examinadores = {}
+        carregador = CarregadorLote(self.__db, "SELECT * FROM examinador")
+        for id in set(ids):
+            if id is None:
+                continue
+            examinador = mapa.obter('examinador', id)
+            if examinador is not None:
+                examinadores[id] = examinador
+            else:
+                carregador.adicionar(id)
+        
+        for id, row in carregador.resolver().items():
+            examinadores[id] = self.criarDeRow(row)
+        return examinadores
+    
+    def buscarPorContato(self, contato: str):
+        """Examinador com esse contato, sem diferenciar maiúsculas (usa idx_examinador_contato_nocase)"""
+        with self.__db.usarCursor() as cur:
+            cur.execute("SELECT * FROM examinador WHERE contato = ? COLLATE NOCASE;", (contato,))
+            row = cur.fetchone()
+        
+            if row:
+                return self.criarDeRow(row)
+            return None
     
     def buscarPorNome(self, nome: str):
-        cur = self.__db.cursor()
-        cur.execute("SELECT * FROM examinador WHERE nome LIKE ?;", (f'%{nome}%',))
-        rows = cur.fetchall()
+        with self.__db.usarCursor() as cur:
+            cur.execute("SELECT * FROM examinador WHERE nome LIKE ?;", (f'%{nome}%',))
+            rows = cur.fetchall()
         
-        resultado = []
-        for row in rows:
-            resultado.append(self.criarDeRow(row))
-        return resultado
+            resultado = []
+            for row in rows:
+                resultado.append(self.criarDeRow(row))
+            return resultado
     
     def listarTodos(self):
-        cur = self.__db.cursor()
-        cur.execute("SELECT * FROM examinador ORDER BY nome;")
-        rows = cur.fetchall()
+        with self.__db.usarCursor() as cur:
+            cur.execute("SELECT * FROM examinador ORDER BY nome;")
+            rows = cur.fetchall()
+        
+            resultado = []
+            for row in rows:
+                resultado.append(self.criarDeRow(row))
+            return resultado
+    
+    def iterar(self, tamanhoLote: int = TAMANHO_LOTE):
+        """Mesmo conteúdo e ordem de listarTodos(), mas gerado aos poucos (fetchmany)"""
+        for lote in iterarLotes(self.__db, "SELECT * FROM examinador ORDER BY nome;", (), tamanhoLote):
+            for row in lote:
+                yield self.criarDeRow(row)
+    
+    def pagina(self, aposId: int = 0, limite: int = LIMITE_PAGINA):
+        """Página por keyset: até `limite` registros com id > aposId, em ordem de id.
+        Para a próxima página passe o id do último registro recebido."""
+        with self.__db.usarCursor() as cur:
+            cur.execute("SELECT * FROM examinador WHERE id > ? ORDER BY id LIMIT ?;", (aposId, limite))
+            rows = cur.fetchall()
         
-        resultado = []
-        for row in rows:
-            resultado.append(self.criarDeRow(row))
-        return resultado
+            resultado = []
+            for row in rows:
+                resultado.append(self.criarDeRow(row))
+            return resultado
+    
+    def consulta(self):
+        """Consulta composta sobre examinador, ex.:
+        consulta().selecionar('id', 'nome').ordenarPor('nome').registros()"""
+        return Consulta(self.__db, 'examinador', fabrica=self.criarDeRow)
+    
+    def existe(self, campo: str, valor):
+        """True se há examinador com campo = valor (uma linha lida, nenhum objeto montado)"""
+        return existencia.existe(self.__db, 'examinador', campo, valor)
+    
+    def contar(self, filtros: dict | None = None):
+        """Quantidade de examinadores que atendem a todos os filtros {campo: valor}"""
+        return existencia.contar(self.__db, 'examinador', filtros)
     
     def criarDeRow(self, row):
-        return Examinador(
+        # Mesma instância para o mesmo id enquanto não houver salvar/deletar
+        return self.__db.mapaIdentidade.registrar('examinador', row['id'], lambda: Examinador(
             id=row['id'],
             nome=row['nome'],
             contato=row['contato']
-        )
+        ))
     
     def deletar(self, examinador: Examinador):        
-        cur = self.__db.cursor()
-        cur.execute("DELETE FROM examinador WHERE id = ?;", (examinador.id,))
+        with self.__db.usarCursor() as cur:
+            cur.execute("DELETE FROM examinador WHERE id = ?;", (examinador.id,))
+            self.__db.mapaIdentidade.invalidar('examinador', examinador.id)
 
-        return cur.rowcount > 0
+            return cur.rowcount > 0
 
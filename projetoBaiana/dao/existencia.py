@@ -0,0 +1,49 @@
+"""
+Consultas de existência e contagem usadas pelos DAOs (existe/contar): respondem com
+uma linha só, sem hidratar objetos do modelo
+"""
+
+from bd.database import DatabaseConnection
+
+# Colunas conhecidas por tabela (PRAGMA table_info), usadas para validar os nomes de
+# campo antes de montá-los no SQL
+_colunas = {}
+
+def colunasDe(db: DatabaseConnection, tabela: str, recarregar: bool = False):
+    if recarregar or tabela not in _colunas:
+        with db.usarCursor() as cur:
+            cur.execute(f"PRAGMA table_info({tabela});")
+            _colunas[tabela] = {row['name'] for row in cur.fetchall()}
+    return _colunas[tabela]
+
+def validarCampo(db: DatabaseConnection, tabela: str, campo: str):
+    """Garante que `campo` é uma coluna da tabela (nomes de coluna não podem ser parâmetros '?')"""
+    if campo not in colunasDe(db, tabela) and campo not in colunasDe(db, tabela, recarregar=True):
+        raise ValueError(f"Campo desconhecido em {tabela}: '{campo}'")
+    return campo
+
+def existe(db: DatabaseConnection, tabela: str, campo: str, valor):
+    """True se há pelo menos uma linha com campo = valor (para no primeiro registro)"""
+    validarCampo(db, tabela, campo)
+    with db.usarCursor() as cur:
+        cur.execute(f"SELECT EXISTS (SELECT 1 FROM {tabela} WHERE {campo} = ?);", (valor,))
+        return bool(cur.fetchone()[0])
+
+def contar(db: DatabaseConnection, tabela: str, filtros: dict | None = None):
+    """COUNT(*) das linhas que atendem a todos os filtros {campo: valor} (None vira IS NULL)"""
+    condicoes, parametros = [], []
+    for campo, valor in (filtros or {}).items():
+        validarCampo(db, tabela, campo)
+        if valor is None:
+            condicoes.append(f"{campo} IS NULL")
+        else:
+            condicoes.append(f"{campo} = ?")
+            parametros.append(valor)
+
+    sql = f"SELECT COUNT(*) FROM {tabela}"
+    if condicoes:
+        sql += " WHERE " + " AND ".join(condicoes)
+
+    with db.usarCursor() as cur:
+        cur.execute(sql + ";", parametros)
+        return cur.fetchone()[0]
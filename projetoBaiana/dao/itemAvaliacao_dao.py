@@ -3,62 +3,176 @@ DAO (Data Access Object) para operações de banco de dados da tabela itemAvalia
 """
 
 from bd.database import DatabaseConnection
+from dao.avaliacao_dao import AvaliacaoDAO
+from dao.carregador_lote import prefetchReferencias
+from dao.paginacao import LIMITE_PAGINA, TAMANHO_LOTE, iterarLotes
+from dao.consulta import Consulta
+from dao.parametros_dao import ParametrosDAO
+from dao import existencia
+from dao.atualizacao import atualizar, atualizarVarios
 from model.itemAvaliacao_class import ItemAvaliacao
+from model.referencia import Referencia
+
+# Propriedade do modelo -> coluna: salvar() grava só as alteradas (ver dao/atualizacao.py)
+COLUNAS = {'parametro': 'parametro_id', 'avaliacao': 'avaliacao_id', 'nota': 'nota'}
 
 class ItemAvaliacaoDAO:
     def __init__(self, db: DatabaseConnection):
         self.__db = db
+        # DAOs das relações carregadas sob demanda (ver criarDeRow e prefetch)
+        self.__relacoes = {
+            'parametro': ParametrosDAO(db),
+            'avaliacao': AvaliacaoDAO(db),
+        }
+    
+    def __idDe(self, valor):
+        # parametro/avaliacao podem vir como objeto do modelo, Referencia (ver criarDeRow) ou id cru
+        return getattr(valor, 'id', valor)
     
     def salvar(self, itemAvaliacao: ItemAvaliacao):
-        cur = self.__db.cursor()
+        with self.__db.usarCursor() as cur:
+            # Converter boolean para integer (SQLite)
+            if itemAvaliacao.id is None:
+                # INSERT
+                cur.execute("""
+                    INSERT INTO itemAvaliacao (parametro_id, avaliacao_id, nota)
+                    VALUES (?, ?, ?);
+                """, (self.__idDe(itemAvaliacao.parametro), self.__idDe(itemAvaliacao.avaliacao), itemAvaliacao.nota))
+
+                itemAvaliacao.id = cur.lastrowid
+                itemAvaliacao.limparAlteracoes()
+            else:
+                # UPDATE: só as colunas alteradas (nenhuma instrução se nada mudou)
+                atualizar(cur, 'itemAvaliacao', itemAvaliacao, COLUNAS)
+        
+            return itemAvaliacao.id
+    
+    def salvarVarios(self, itens):
+        """Insere os novos e atualiza os existentes numa única transação (executemany).
+        Retorna os ids na mesma ordem de entrada."""
+        itens = list(itens)
+        novos = [i for i in itens if i.id is None]
+        existentes = [i for i in itens if i.id is not None]
         
-        # Converter boolean para integer (SQLite)
-        if itemAvaliacao.id is None:
-            # INSERT
-            cur.execute("""
+        with self.__db.transacao():
+            ids = self.__db.inserirVarios("""
                 INSERT INTO itemAvaliacao (parametro_id, avaliacao_id, nota)
                 VALUES (?, ?, ?);
-            """, (itemAvaliacao.parametro_id, itemAvaliacao.avaliacao_id, itemAvaliacao.nota))
-
-            itemAvaliacao.id = cur.lastrowid
-        else:
-            # UPDATE
-            cur.execute("""
-                UPDATE itemAvaliacao SET parametro_id = ?, avaliacao_id = ?, nota = ?
-                WHERE id = ?;
-            """, (itemAvaliacao.parametro_id, itemAvaliacao.avaliacao_id, itemAvaliacao.nota))
+            """, [(self.__idDe(i.parametro), self.__idDe(i.avaliacao), i.nota) for i in novos])
+            for i, id in zip(novos, ids):
+                i.id = id
+                i.limparAlteracoes()
+            
+            atualizarVarios(self.__db, 'itemAvaliacao', existentes, COLUNAS)
         
-        return itemAvaliacao.id
+        return [i.id for i in itens]
     
+    def atualizarNotas(self, notas):
+        """Grava várias notas [(itemId, nota), ...] com um executemany numa única transação.
+        Retorna quantos itens foram atualizados."""
+        return self.__db.executarVarios(
+            "UPDATE itemAvaliacao SET nota = ? WHERE id = ?;",
+            [(nota, itemId) for itemId, nota in notas]
+        )
+
+    def notasDoEvento(self, eventoId: int, nivelId: int | None = None):
+        """Todas as células da grade alunos x parâmetros de um evento numa consulta só:
+        rows (avaliacao_id, aluno, parametro_id, parametro, item_id, nota) por aluno e parâmetro"""
+        sql = """
+            SELECT v.id AS avaliacao_id, a.nome AS aluno, p.id AS parametro_id, p.nome AS parametro,
+                   i.id AS item_id, i.nota
+            FROM avaliacao v
+            JOIN aluno a ON a.id = v.aluno_id
+            JOIN itemAvaliacao i ON i.avaliacao_id = v.id
+            JOIN parametros p ON p.id = i.parametro_id
+            WHERE v.evento_id = ?
+        """
+        parametros = [eventoId]
+        if nivelId is not None:
+            sql += " AND v.nivel_id = ?"
+            parametros.append(nivelId)
+
+        with self.__db.usarCursor() as cur:
+            cur.execute(sql + " ORDER BY a.nome, v.id, p.nome, p.id;", parametros)
+            return cur.fetchall()
+
     def buscarPorId(self, id: int):
-        cur = self.__db.cursor()
-        cur.execute("SELECT * FROM itemAvaliacao WHERE id = ?;", (id,))
-        row = cur.fetchone()
+        with self.__db.usarCursor() as cur:
+            cur.execute("SELECT * FROM itemAvaliacao WHERE id = ?;", (id,))
+            row = cur.fetchone()
         
-        if row:
-            return self.criarDeRow(row)
-        return None
+            if row:
+                return self.criarDeRow(row)
+            return None
     
     def listarTodos(self):
-        cur = self.__db.cursor()
-        cur.execute("SELECT * FROM itemAvaliacao ORDER BY avaliacao_id;")
-        rows = cur.fetchall()
+        with self.__db.usarCursor() as cur:
+            cur.execute("SELECT * FROM itemAvaliacao ORDER BY avaliacao_id;")
+            rows = cur.fetchall()
         
-        resultado = []
-        for row in rows:
-            resultado.append(self.criarDeRow(row))
-        return resultado
+            resultado = []
+            for row in rows:
+                resultado.append(self.criarDeRow(row))
+            return resultado
+    
+    def iterar(self, tamanhoLote: int = TAMANHO_LOTE):
+        """Mesmo conteúdo e ordem de listarTodos(), mas gerado aos poucos (fetchmany)"""
+        for lote in iterarLotes(self.__db, "SELECT * FROM itemAvaliacao ORDER BY avaliacao_id;", (), tamanhoLote):
+            for row in lote:
+                yield self.criarDeRow(row)
+    
+    def pagina(self, aposId: int = 0, limite: int = LIMITE_PAGINA):
+        """Página por keyset: até `limite` registros com id > aposId, em ordem de id.
+        Para a próxima página passe o id do último registro recebido."""
+        with self.__db.usarCursor() as cur:
+            cur.execute("SELECT * FROM itemAvaliacao WHERE id > ? ORDER BY id LIMIT ?;", (aposId, limite))
+            rows = cur.fetchall()
+        
+            resultado = []
+            for row in rows:
+                resultado.append(self.criarDeRow(row))
+            return resultado
+    
+    def consulta(self):
+        """Consulta composta sobre itemAvaliacao, ex.:
+        consulta().selecionar('parametro_id', 'nota').onde('avaliacao_id', 1).tuplas()"""
+        return Consulta(self.__db, 'itemAvaliacao', fabrica=self.criarDeRow)
+    
+    def existe(self, campo: str, valor):
+        """True se há item com campo = valor (uma linha lida, nenhum objeto montado)"""
+        return existencia.existe(self.__db, 'itemAvaliacao', campo, valor)
+    
+    def contar(self, filtros: dict | None = None):
+        """Quantidade de itens que atendem a todos os filtros {campo: valor}"""
+        return existencia.contar(self.__db, 'itemAvaliacao', filtros)
     
     def criarDeRow(self, row):
         return ItemAvaliacao(
             id=row['id'],
-            parametro=row['parametro_id'],
-            avaliacao=row['avaliacao_id'],
+            parametro=self.__referencia('parametro', row['parametro_id']),
+            avaliacao=self.__referencia('avaliacao', row['avaliacao_id']),
             nota=row['nota']
         )
     
+    def __referencia(self, relacao: str, id):
+        # Só o id; o objeto é buscado no primeiro acesso
+        if id is None:
+            return None
+        return Referencia(id, self.__relacoes[relacao].buscarPorId)
+    
+    def prefetch(self, itens, *relacoes: str):
+        """Carrega antecipadamente as relações indicadas ('parametro', 'avaliacao'; todas se
+        nenhuma for passada): um IN por relação em vez de uma consulta por item.
+        Retorna a lista de itens."""
+        itens = list(itens)
+        for relacao in relacoes or self.__relacoes:
+            if relacao not in self.__relacoes:
+                raise ValueError(f"Relação desconhecida em itemAvaliacao: '{relacao}'")
+            prefetchReferencias(itens, relacao, self.__relacoes[relacao].buscarPorIds)
+        return itens
+    
     def deletar(self, itemAvaliacao: ItemAvaliacao):        
-        cur = self.__db.cursor()
-        cur.execute("DELETE FROM itemAvaliacao WHERE id = ?;", (itemAvaliacao.id,))
+        with self.__db.usarCursor() as cur:
+            cur.execute("DELETE FROM itemAvaliacao WHERE id = ?;", (itemAvaliacao.id,))
 
-        return cur.rowcount > 0
\ No newline at end of file
+            return cur.rowcount > 0
\ No newline at end of file
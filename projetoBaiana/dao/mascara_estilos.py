@@ -0,0 +1,97 @@
+"""
+Índice em memória da relação N:N parametro_estilo: uma máscara inteira por estilo, com o
+bit `parametro_id` ligado para cada parâmetro vinculado. "Quais parâmetros valem para
+estes estilos" e "quais estilos compartilham parâmetros" viram OR/AND de inteiros, sem JOIN.
+"""
+import threading
+
+from bd.database import DatabaseConnection
+
+def idsDaMascara(mascara: int):
+    """ids (bits ligados) da máscara, em ordem crescente"""
+    ids = []
+    while mascara:
+        bit = mascara & -mascara
+        ids.append(bit.bit_length() - 1)
+        mascara ^= bit
+    return ids
+
+class MascaraEstilos:
+    def __init__(self, mascaras: dict | None = None):
+        self.__mascaras = dict(mascaras or {})
+        self.__lock = threading.Lock()
+
+    @classmethod
+    def carregar(cls, db: DatabaseConnection):
+        """Monta o índice com uma leitura só da tabela (pelo índice idx_parametro_estilo_estilo)"""
+        mascaras = {}
+        with db.usarCursor() as cur:
+            cur.row_factory = None
+            cur.execute("SELECT estilo_id, parametro_id FROM parametro_estilo;")
+            for estiloId, parametroId in cur.fetchall():
+                mascaras[estiloId] = mascaras.get(estiloId, 0) | (1 << parametroId)
+        return cls(mascaras)
+
+    def mascara(self, estiloId: int):
+        with self.__lock:
+            return self.__mascaras.get(estiloId, 0)
+
+    def __copia(self):
+        # O índice é compartilhado entre threads (cache da sessão): as consultas percorrem
+        # uma cópia tirada sob o lock, nunca o dicionário que os escritores alteram
+        with self.__lock:
+            return dict(self.__mascaras)
+
+    def estilos(self):
+        """ids dos estilos com pelo menos um parâmetro vinculado"""
+        return sorted(estilo for estilo, mascara in self.__copia().items() if mascara)
+
+    # Manutenção: chamada pelo ParametrosDAO depois de gravar no banco
+
+    def vincular(self, parametroId: int, estiloId: int):
+        with self.__lock:
+            self.__mascaras[estiloId] = self.__mascaras.get(estiloId, 0) | (1 << parametroId)
+
+    def desvincular(self, parametroId: int, estiloId: int):
+        with self.__lock:
+            self.__mascaras[estiloId] = self.__mascaras.get(estiloId, 0) & ~(1 << parametroId)
+
+    def removerParametro(self, parametroId: int):
+        with self.__lock:
+            bit = 1 << parametroId
+            for estiloId in self.__mascaras:
+                self.__mascaras[estiloId] &= ~bit
+
+    # Consultas
+
+    def parametrosDe(self, *estiloIds: int, todos: bool = False):
+        """ids dos parâmetros vinculados a algum dos estilos (OR) ou, com todos=True,
+        a todos eles ao mesmo tempo (AND)"""
+        if not estiloIds:
+            return []
+        copia = self.__copia()
+        mascaras = [copia.get(estiloId, 0) for estiloId in estiloIds]
+        resultado = mascaras[0]
+        for mascara in mascaras[1:]:
+            resultado = resultado & mascara if todos else resultado | mascara
+        return idsDaMascara(resultado)
+
+    def estilosDe(self, parametroId: int):
+        """ids dos estilos aos quais o parâmetro está vinculado"""
+        bit = 1 << parametroId
+        return sorted(estilo for estilo, mascara in self.__copia().items() if mascara & bit)
+
+    def compartilhados(self, estiloId: int, outroId: int):
+        """ids dos parâmetros vinculados aos dois estilos"""
+        copia = self.__copia()
+        return idsDaMascara(copia.get(estiloId, 0) & copia.get(outroId, 0))
+
+    def estilosQueCompartilham(self, estiloId: int):
+        """{outro estilo: quantidade de parâmetros em comum} para os estilos com algum em comum"""
+        copia = self.__copia()
+        mascara = copia.get(estiloId, 0)
+        resultado = {}
+        for outroId, outra in copia.items():
+            if outroId != estiloId and mascara & outra:
+                resultado[outroId] = (mascara & outra).bit_count()
+        return dict(sorted(resultado.items()))
@@ -2,65 +2,177 @@
 DAO (Data Access Object) para operações de banco de dados da tabela nivel
 """
 from bd.database import DatabaseConnection
+from dao.carregador_lote import CarregadorLote
+from dao.paginacao import LIMITE_PAGINA, TAMANHO_LOTE, iterarLotes
+from dao.consulta import Consulta
+from dao import existencia
+from dao.atualizacao import atualizar, atualizarVarios
 from model.nivel_class import Nivel
 
+# Propriedade do modelo -> coluna: salvar() grava só as alteradas (ver dao/atualizacao.py)
+COLUNAS = {'nome': 'nome'}
+
 class NivelDAO:
     def __init__(self, db: DatabaseConnection):
         self.__db = db
     
     def salvar(self, nivel: Nivel):
-        cur = self.__db.cursor()
+        try:
+            with self.__db.usarCursor() as cur:
+                if nivel.id is None:
+                    # INSERT
+                    cur.execute("INSERT INTO nivel (nome) VALUES (?);", (nivel.nome,))
+                    nivel.id = cur.lastrowid
+                    nivel.limparAlteracoes()
+                else:
+                    # UPDATE: só as colunas alteradas (nenhuma instrução se nada mudou)
+                    atualizar(cur, 'nivel', nivel, COLUNAS)
         
-        if nivel.id is None:
-            # INSERT
-            cur.execute("INSERT INTO nivel (nome) VALUES (?);", (nivel.nome,))
-            nivel.id = cur.lastrowid
-        else:
-            # UPDATE
-            cur.execute("UPDATE nivel SET nome = ? WHERE id = ?;", (nivel.nome, nivel.id))
+                return nivel.id
+        finally:
+            # Também quando a gravação falha: a instância compartilhada pelo mapa pode ter
+            # alterações que não foram para o banco
+            if nivel.id is not None:
+                self.__db.mapaIdentidade.invalidar('nivel', nivel.id)
+    
+    def salvarVarios(self, niveis):
+        """Insere os novos e atualiza os existentes numa única transação (executemany).
+        Retorna os ids na mesma ordem de entrada."""
+        niveis = list(niveis)
+        novos = [n for n in niveis if n.id is None]
+        existentes = [n for n in niveis if n.id is not None]
         
-        return nivel.id
+        try:
+            with self.__db.transacao():
+                ids = self.__db.inserirVarios("INSERT INTO nivel (nome) VALUES (?);", [(n.nome,) for n in novos])
+                for n, id in zip(novos, ids):
+                    n.id = id
+                    n.limparAlteracoes()
+            
+                atualizarVarios(self.__db, 'nivel', existentes, COLUNAS)
+        finally:
+            for n in niveis:
+                if n.id is not None:
+                    self.__db.mapaIdentidade.invalidar('nivel', n.id)
+        return [n.id for n in niveis]
+    
+    def inserirSeNovo(self, nivel: Nivel):
+        """Insere o nivel numa única instrução atômica (sem SELECT antes).
+        Retorna True se foi criado; False se já existe um nivel com esse nome."""
+        with self.__db.usarCursor() as cur:
+            cur.execute("""
+                INSERT INTO nivel (nome) VALUES (?)
+                ON CONFLICT (nome) DO NOTHING
+                RETURNING id;
+            """, (nivel.nome,))
+            row = cur.fetchone()
+        
+            if row is None:
+                return False
+            nivel.id = row['id']
+            nivel.limparAlteracoes()
+            return True
     
     def buscarPorId(self, id: int):
-        cur = self.__db.cursor()
-        cur.execute("SELECT * FROM nivel WHERE id = ?;", (id,))
-        row = cur.fetchone()
+        # Instância já carregada nesta sessão: nenhuma leitura no banco
+        nivel = self.__db.mapaIdentidade.obter('nivel', id)
+        if nivel is not None:
+            return nivel
+        
+        with self.__db.usarCursor() as cur:
+            cur.execute("SELECT * FROM nivel WHERE id = ?;", (id,))
+            row = cur.fetchone()
+        
+            if row:
+                return self.criarDeRow(row)
+            return None
+    
+    def buscarPorIds(self, ids):
+        """Carrega vários niveis com um único WHERE id IN (...); retorna {id: Nivel}.
+        Os que já estão no mapa de identidade não são lidos de novo."""
+        mapa = self.__db.mapaIdentidade
+        niveis = {}
+        carregador = CarregadorLote(self.__db, "SELECT * FROM nivel")
+        for id in set(ids):
+            if id is None:
+                continue
+            nivel = mapa.obter('nivel', id)
+            if nivel is not None:
+                niveis[id] = nivel
+            else:
+                carregador.adicionar(id)
         
-        if row:
-            return self.criarDeRow(row)
-        return None
+        for id, row in carregador.resolver().items():
+            niveis[id] = self.criarDeRow(row)
+        return niveis
     
     def buscarPorNome(self, nome: str):
-        cur = self.__db.cursor()
-        cur.execute("SELECT * FROM nivel WHERE nome = ?;", (nome,))
-        row = cur.fetchone()
+        with self.__db.usarCursor() as cur:
+            cur.execute("SELECT * FROM nivel WHERE nome = ?;", (nome,))
+            row = cur.fetchone()
         
-        if row:
-            return self.criarDeRow(row)
-        return None
+            if row:
+                return self.criarDeRow(row)
+            return None
     
     def listarTodas(self):
-        cur = self.__db.cursor()
-        cur.execute("SELECT * FROM nivel ORDER BY nome;")
-        rows = cur.fetchall()
+        with self.__db.usarCursor() as cur:
+            cur.execute("SELECT * FROM nivel ORDER BY nome;")
+            rows = cur.fetchall()
+        
+            resultado = []
+            for row in rows:
+                resultado.append(self.criarDeRow(row))
+            return resultado
+    
+    def iterar(self, tamanhoLote: int = TAMANHO_LOTE):
+        """Mesmo conteúdo e ordem de listarTodas(), mas gerado aos poucos (fetchmany)"""
+        for lote in iterarLotes(self.__db, "SELECT * FROM nivel ORDER BY nome;", (), tamanhoLote):
+            for row in lote:
+                yield self.criarDeRow(row)
+    
+    def pagina(self, aposId: int = 0, limite: int = LIMITE_PAGINA):
+        """Página por keyset: até `limite` registros com id > aposId, em ordem de id.
+        Para a próxima página passe o id do último registro recebido."""
+        with self.__db.usarCursor() as cur:
+            cur.execute("SELECT * FROM nivel WHERE id > ? ORDER BY id LIMIT ?;", (aposId, limite))
+            rows = cur.fetchall()
         
-        resultado = []
-        for row in rows:
-            resultado.append(self.criarDeRow(row))
-        return resultado
+            resultado = []
+            for row in rows:
+                resultado.append(self.criarDeRow(row))
+            return resultado
+    
+    def consulta(self):
+        """Consulta composta sobre nivel, ex.:
+        consulta().selecionar('id', 'nome').ordenarPor('nome').tuplas()"""
+        return Consulta(self.__db, 'nivel', fabrica=self.criarDeRow)
+    
+    def existe(self, campo: str, valor):
+        """True se há nivel com campo = valor (uma linha lida, nenhum objeto montado)"""
+        return existencia.existe(self.__db, 'nivel', campo, valor)
+    
+    def contar(self, filtros: dict | None = None):
+        """Quantidade de niveis que atendem a todos os filtros {campo: valor}"""
+        return existencia.contar(self.__db, 'nivel', filtros)
     
     def criarDeRow(self, row):
-        return Nivel(
+        # Mesma instância para o mesmo id enquanto não houver salvar/deletar
+        return self.__db.mapaIdentidade.registrar('nivel', row['id'], lambda: Nivel(
             id=row['id'],
             nome=row['nome']
-        )
+        ))
     
     def deletar(self, nivel: Nivel):
         if nivel.id is None:
             return False
         
-        cur = self.__db.cursor()
-        cur.execute("DELETE FROM nivel WHERE id = ?;", (nivel.id,))
+        with self.__db.usarCursor() as cur:
+            cur.execute("DELETE FROM nivel WHERE id = ?;", (nivel.id,))
+            self.__db.mapaIdentidade.invalidar('nivel', nivel.id)
+            # Os parâmetros do nível são apagados em cascata: descarta os caches derivados deles
+            # depois do COMMIT
+            self.__db.aoConfirmar(self.__db.invalidarCaches)
 
-        return cur.rowcount > 0
+            return cur.rowcount > 0
 
@@ -0,0 +1,81 @@
+"""
+Carregamento colunar da tabela itemAvaliacao para estatísticas (model/notasColunares_class.py):
+lê só avaliacao_id, parametro_id e nota, em lotes, direto para array('i')
+"""
+from array import array
+
+from bd.database import DatabaseConnection
+from dao.paginacao import TAMANHO_LOTE
+from model.notasColunares_class import NotasColunares
+
+# Lotes maiores que os de iterar(): aqui cada linha custa só três inteiros
+TAMANHO_LOTE_COLUNAR = TAMANHO_LOTE * 20
+
+class NotasColunaresDAO:
+    def __init__(self, db: DatabaseConnection):
+        self.__db = db
+
+    def carregar(self, eventoId: int | None = None, nivelId: int | None = None,
+                 usarNumpy: bool | None = None, tamanhoLote: int = TAMANHO_LOTE_COLUNAR):
+        """Notas de todas as avaliações (ou só de um evento e/ou nível).
+        Itens sem nota, sem parâmetro ou sem avaliação ficam de fora."""
+        sql = """
+            SELECT i.avaliacao_id, i.parametro_id, i.nota
+            FROM itemAvaliacao i
+        """
+        condicoes = ["i.nota IS NOT NULL", "i.parametro_id IS NOT NULL", "i.avaliacao_id IS NOT NULL"]
+        parametros = []
+        if eventoId is not None or nivelId is not None:
+            sql += " JOIN avaliacao a ON a.id = i.avaliacao_id"
+            for coluna, valor in (("a.evento_id", eventoId), ("a.nivel_id", nivelId)):
+                if valor is not None:
+                    condicoes.append(f"{coluna} = ?")
+                    parametros.append(valor)
+        sql += " WHERE " + " AND ".join(condicoes) + " ORDER BY i.avaliacao_id;"
+
+        avaliacoes, parametrosIds, notas = array('i'), array('i'), array('i')
+        with self.__db.usarCursor() as cur:
+            # Tuplas cruas: nenhum sqlite3.Row nem objeto do modelo por linha
+            cur.row_factory = None
+            cur.execute(sql, parametros)
+            while True:
+                lote = cur.fetchmany(tamanhoLote)
+                if not lote:
+                    break
+                colunas = tuple(zip(*lote))
+                avaliacoes.extend(colunas[0])
+                parametrosIds.extend(colunas[1])
+                notas.extend(colunas[2])
+
+        return NotasColunares(avaliacoes, parametrosIds, notas, usarNumpy)
+
+    def carregarParaPromocao(self, eventoIds=None, tamanhoLote: int = TAMANHO_LOTE_COLUNAR):
+        """Colunas (alunos, avaliacoes, niveis, notas, pesos) das notas dos eventos indicados
+        (todos, se None), numa consulta só. Entram apenas alunos ativos avaliados no nível em
+        que ainda estão; pesos vêm de parametros.peso (1 sem parâmetro)."""
+        sql = """
+            SELECT v.aluno_id, v.id, v.nivel_id, i.nota, COALESCE(p.peso, 1)
+            FROM itemAvaliacao i
+            JOIN avaliacao v ON v.id = i.avaliacao_id
+            JOIN aluno a ON a.id = v.aluno_id AND a.nivel_id = v.nivel_id AND a.ativo = 1
+            LEFT JOIN parametros p ON p.id = i.parametro_id
+            WHERE i.nota IS NOT NULL
+        """
+        eventoIds = None if eventoIds is None else list(eventoIds)
+        if eventoIds is not None:
+            sql += f" AND v.evento_id IN ({', '.join('?' * len(eventoIds))})"
+
+        colunas = (array('i'), array('i'), array('i'), array('i'), array('d'))
+        if eventoIds == []:
+            return colunas
+        with self.__db.usarCursor() as cur:
+            cur.row_factory = None
+            # Sem ORDER BY: o agrupamento por aluno é feito depois, em memória
+            cur.execute(sql + ";", eventoIds or ())
+            while True:
+                lote = cur.fetchmany(tamanhoLote)
+                if not lote:
+                    break
+                for coluna, valores in zip(colunas, zip(*lote)):
+                    coluna.extend(valores)
+        return colunas
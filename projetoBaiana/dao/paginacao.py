@@ -0,0 +1,24 @@
+"""
+Leitura em lotes para os métodos iterar() dos DAOs: as linhas chegam do cursor com
+fetchmany, sem montar a lista inteira em memória
+"""
+
+from bd.database import DatabaseConnection
+
+# Linhas trazidas do SQLite por vez em iterar()
+TAMANHO_LOTE = 500
+# Tamanho padrão de página em pagina(aposId, limite)
+LIMITE_PAGINA = 50
+
+def iterarLotes(db: DatabaseConnection, sql: str, parametros=(), tamanhoLote: int = TAMANHO_LOTE):
+    """Gera listas de até tamanhoLote rows. A conexão da thread fica emprestada até o
+    gerador terminar (ou ser fechado com close()), então consuma-o por inteiro.
+    Dentro de transacao() também lê aos poucos, com um cursor próprio na conexão da
+    transação (ela só volta ao pool depois do COMMIT e do fim do gerador)."""
+    with db.usarCursor() as cur:
+        cur.execute(sql, parametros)
+        while True:
+            lote = cur.fetchmany(tamanhoLote)
+            if not lote:
+                return
+            yield lote
@@ -3,47 +3,120 @@ DAO (Data Access Object) para operações de banco de dados da tabela parametros
 """
 
 from bd.database import DatabaseConnection
+from dao.busca_textual import buscarRows
+from dao.paginacao import LIMITE_PAGINA, TAMANHO_LOTE, iterarLotes
+from dao.carregador_lote import CarregadorLote
+from dao.consulta import Consulta
+from dao import existencia
+from dao.atualizacao import atualizar, atualizarVarios
+from dao.estiloDanca_dao import EstiloDancaDAO
+from dao.mascara_estilos import MascaraEstilos
 from model.parametros_class import Parametros
 from model.estiloDanca_class import EstiloDanca
 
+# Propriedade do modelo -> coluna: salvar() grava só as alteradas (ver dao/atualizacao.py)
+COLUNAS = {'nome': 'nome', 'tipoConducao': 'tipoConducao', 'estilo': 'estilo_id', 'nivel': 'nivel_id', 'peso': 'peso'}
+
+# Nome do cache da sessão com os modelos de ficha (ver modeloFicha)
+CACHE_MODELOS_FICHA = 'modelosFicha'
+# Nome do cache da sessão com o índice de bits parametro x estilo (ver mascaraEstilos)
+CACHE_MASCARA_ESTILOS = 'mascaraEstilos'
+
 class ParametrosDAO:
     def __init__(self, db: DatabaseConnection):
         self.__db = db
+        self.__estiloDancaDao = EstiloDancaDAO(db)
+    
+    def __idDe(self, valor):
+        # estilo/nivel podem vir como objeto do modelo ou como id cru (ver criarDeRow)
+        return getattr(valor, 'id', valor)
     
     def salvar(self, parametros: Parametros):
-        cur = self.__db.cursor()
-        
-        # Converter boolean para integer (SQLite)
-        if parametros.id is None:
-            # INSERT
-            cur.execute("""
-                INSERT INTO parametros (nome, tipoConducao, estilo, nivel)
-                VALUES (?, ?, ?, ?);
-            """, (parametros.nome, parametros.tipoConducao, parametros.estilo, parametros.nivel))
+        with self.__db.usarCursor() as cur:
+            # Converter boolean para integer (SQLite)
+            if parametros.id is None:
+                # INSERT
+                cur.execute("""
+                    INSERT INTO parametros (nome, tipoConducao, estilo_id, nivel_id, peso)
+                    VALUES (?, ?, ?, ?, ?);
+                """, (parametros.nome, parametros.tipoConducao, self.__idDe(parametros.estilo), self.__idDe(parametros.nivel), parametros.peso))
 
-            parametros.id = cur.lastrowid
-        else:
-            # UPDATE
+                parametros.id = cur.lastrowid
+                parametros.limparAlteracoes()
+                self.__invalidarModelos()
+            # UPDATE: só as colunas alteradas (nenhuma instrução se nada mudou)
+            elif atualizar(cur, 'parametros', parametros, COLUNAS):
+                self.__invalidarModelos()
+        
+            return parametros.id
+    
+    def salvarVarios(self, parametros):
+        """Insere os novos e atualiza os existentes numa única transação (executemany).
+        Retorna os ids na mesma ordem de entrada."""
+        parametros = list(parametros)
+        novos = [p for p in parametros if p.id is None]
+        existentes = [p for p in parametros if p.id is not None]
+        
+        with self.__db.transacao():
+            ids = self.__db.inserirVarios("""
+                INSERT INTO parametros (nome, tipoConducao, estilo_id, nivel_id, peso)
+                VALUES (?, ?, ?, ?, ?);
+            """, [(p.nome, p.tipoConducao, self.__idDe(p.estilo), self.__idDe(p.nivel), p.peso) for p in novos])
+            for p, id in zip(novos, ids):
+                p.id = id
+                p.limparAlteracoes()
+            
+            atualizarVarios(self.__db, 'parametros', existentes, COLUNAS)
+        
+        self.__invalidarModelos()
+        return [p.id for p in parametros]
+    
+    def inserirSeNovo(self, parametros: Parametros):
+        """Insere o parâmetro numa única instrução atômica (sem SELECT antes).
+        Retorna True se foi criado; False se já existe um parâmetro com esse nome."""
+        with self.__db.usarCursor() as cur:
             cur.execute("""
-                UPDATE parametros SET nome = ?, tipoConducao = ?, estilo = ?, nivel = ?
-                WHERE id = ?;
-            """, (parametros.nome, parametros.tipoConducao, parametros.estilo, parametros.nivel))
+                INSERT INTO parametros (nome, tipoConducao, estilo_id, nivel_id, peso)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (nome) DO NOTHING
+                RETURNING id;
+            """, (parametros.nome, parametros.tipoConducao,
+                  self.__idDe(parametros.estilo), self.__idDe(parametros.nivel), parametros.peso))
+            row = cur.fetchone()
         
-        return parametros.id
+            if row is None:
+                return False
+            parametros.id = row['id']
+            parametros.limparAlteracoes()
+            self.__invalidarModelos()
+            return True
     
     def buscarPorId(self, id: int):
-        cur = self.__db.cursor()
-        cur.execute("SELECT * FROM parametros WHERE id = ?;", (id,))
-        row = cur.fetchone()
+        with self.__db.usarCursor() as cur:
+            cur.execute("SELECT * FROM parametros WHERE id = ?;", (id,))
+            row = cur.fetchone()
         
-        if row:
-            return self.criarDeRow(row)
-        return None
+            if row:
+                return self.criarDeRow(row)
+            return None
+    
+    def buscarPorIds(self, ids):
+        """Carrega vários registros com um único WHERE id IN (...); retorna {id: Parametros}"""
+        rows = CarregadorLote(self.__db, "SELECT * FROM parametros").carregar(ids)
+        return {id: self.criarDeRow(row) for id, row in rows.items()}
     
     def buscarPorNome(self, nome: str):
-        cur = self.__db.cursor()
-        cur.execute("SELECT * FROM parametros WHERE nome LIKE ?;", (f'%{nome}%',))
-        rows = cur.fetchall()
+        """Busca por prefixo de palavras no nome, sem acento nem caixa"""
+        rows = buscarRows(
+            self.__db,
+            """
+                SELECT p.* FROM parametros p
+                JOIN parametros_fts f ON f.rowid = p.id
+                WHERE parametros_fts MATCH ? ORDER BY f.rank;
+            """,
+            "SELECT * FROM parametros WHERE nome LIKE ?;",
+            nome
+        )
         
         resultado = []
         for row in rows:
@@ -51,94 +124,192 @@ class ParametrosDAO:
         return resultado
     
     def listarTodos(self):
-        cur = self.__db.cursor()
-        cur.execute("SELECT * FROM parametros ORDER BY nome;")
-        rows = cur.fetchall()
+        with self.__db.usarCursor() as cur:
+            cur.execute("SELECT * FROM parametros ORDER BY nome;")
+            rows = cur.fetchall()
         
-        resultado = []
-        for row in rows:
-            resultado.append(self.criarDeRow(row))
-        return resultado
+            resultado = []
+            for row in rows:
+                resultado.append(self.criarDeRow(row))
+            return resultado
+    
+    def iterar(self, tamanhoLote: int = TAMANHO_LOTE):
+        """Mesmo conteúdo e ordem de listarTodos(), mas gerado aos poucos (fetchmany)"""
+        for lote in iterarLotes(self.__db, "SELECT * FROM parametros ORDER BY nome;", (), tamanhoLote):
+            for row in lote:
+                yield self.criarDeRow(row)
+    
+    def pagina(self, aposId: int = 0, limite: int = LIMITE_PAGINA):
+        """Página por keyset: até `limite` registros com id > aposId, em ordem de id.
+        Para a próxima página passe o id do último registro recebido."""
+        with self.__db.usarCursor() as cur:
+            cur.execute("SELECT * FROM parametros WHERE id > ? ORDER BY id LIMIT ?;", (aposId, limite))
+            rows = cur.fetchall()
+        
+            resultado = []
+            for row in rows:
+                resultado.append(self.criarDeRow(row))
+            return resultado
+    
+    def consulta(self):
+        """Consulta composta sobre parametros, ex.:
+        consulta().onde('nivel_id', 2).texto('giro').ordenarPor('nome').listar()"""
+        return Consulta(self.__db, 'parametros', fabrica=self.criarDeRow, chaveTexto='id', ftsTexto='parametros_fts')
+    
+    def existe(self, campo: str, valor):
+        """True se há parâmetro com campo = valor (uma linha lida, nenhum objeto montado)"""
+        return existencia.existe(self.__db, 'parametros', campo, valor)
+    
+    def contar(self, filtros: dict | None = None):
+        """Quantidade de parâmetros que atendem a todos os filtros {campo: valor}"""
+        return existencia.contar(self.__db, 'parametros', filtros)
     
     def criarDeRow(self, row):
         return Parametros(
             id=row['id'],
-            data=row['nome'],
+            nome=row['nome'],
             tipoConducao=row['tipoConducao'],
-            estilo=row['estilo'],
-            nivel=row['nivel']
+            estilo=row['estilo_id'],
+            nivel=row['nivel_id'],
+            peso=row['peso']
         )
     
     def deletar(self, parametros: Parametros):        
-        cur = self.__db.cursor()
-        cur.execute("DELETE FROM parametros WHERE id = ?;", (parametros.id,))
+        with self.__db.usarCursor() as cur:
+            cur.execute("DELETE FROM parametros WHERE id = ?;", (parametros.id,))
+            self.__invalidarModelos()
+            self.__atualizarMascara(lambda m: m.removerParametro(parametros.id))
 
-        return cur.rowcount > 0
+            return cur.rowcount > 0
     
     # Métodos para gerenciar relacionamento N:N com Pessoa
     
+    def vincular(self, parametroId: int, estiloId: int):
+        """Cria o vínculo parâmetro-estilo numa única instrução atômica.
+        Retorna True se foi criado; False se o vínculo já existia."""
+        with self.__db.usarCursor() as cur:
+            cur.execute("""
+                INSERT INTO parametro_estilo (parametro_id, estilo_id)
+                VALUES (?, ?)
+                ON CONFLICT (parametro_id, estilo_id) DO NOTHING
+                RETURNING parametro_id;
+            """, (parametroId, estiloId))
+        
+            criado = cur.fetchone() is not None
+            if criado:
+                self.__invalidarModelos()
+                self.__atualizarMascara(lambda m: m.vincular(parametroId, estiloId))
+            return criado
+    
     def vincularEstilo(self, parametros: Parametros, estiloDanca: EstiloDanca):
         """Vincula uma parâmetro a um estilo de dança"""
-        cur = self.__db.cursor()
-        
-        # Verificar se já existe o vínculo
-        cur.execute("""
-            SELECT * FROM parametro_estilo
-            WHERE parametro_id = ? AND estilo_id = ?;
-        """, (parametros.id, estiloDanca.id))
-        
-        if cur.fetchone():
-            return False  # Já existe o vínculo
-        
-        cur.execute("""
-            INSERT INTO parametro_estilo (parametro_id, estilo_id)
-            VALUES (?, ?);
-        """, (parametros.id, estiloDanca.id))
-        
-        return True
+        return self.vincular(parametros.id, estiloDanca.id)
     
     def desvincularEstilo(self, parametros: Parametros, estiloDanca: EstiloDanca):
         """Remove o vínculo entre um parâmetro e um estilo"""
-        cur = self.__db.cursor()
-        cur.execute("""
-            DELETE FROM parametro_estilo 
-            WHERE parametro_id = ? AND estilo_id = ?;
-        """, (parametros.id, estiloDanca.id))
+        with self.__db.usarCursor() as cur:
+            cur.execute("""
+                DELETE FROM parametro_estilo 
+                WHERE parametro_id = ? AND estilo_id = ?;
+            """, (parametros.id, estiloDanca.id))
+            self.__invalidarModelos()
+            self.__atualizarMascara(lambda m: m.desvincular(parametros.id, estiloDanca.id))
         
-        return cur.rowcount > 0
+            return cur.rowcount > 0
     
     def buscarParametrosPorEstilo(self, estiloId: int):
         """Retorna todos os parametros vinculadas a um estilo"""
-        cur = self.__db.cursor()
-        cur.execute("""
-            SELECT p.*
-            FROM parametros p
-            INNER JOIN parametro_estilo pe ON p.id = pe.parametro_id
-            WHERE pe.estilo_id = ?
-            ORDER BY p.nome;
-        """, (estiloId,))
+        with self.__db.usarCursor() as cur:
+            cur.execute("""
+                SELECT p.*
+                FROM parametros p
+                INNER JOIN parametro_estilo pe ON p.id = pe.parametro_id
+                WHERE pe.estilo_id = ?
+                ORDER BY p.nome;
+            """, (estiloId,))
         
-        rows = cur.fetchall()
-        parametrosDao = ParametrosDAO(self.__db)
+            rows = cur.fetchall()
+            parametrosDao = ParametrosDAO(self.__db)
         
-        resultado = []
-        for row in rows:
-            resultado.append(parametrosDao.criarDeRow(row))
-        return resultado
+            resultado = []
+            for row in rows:
+                resultado.append(parametrosDao.criarDeRow(row))
+            return resultado
     
     def buscarEstilosPorParametro(self, parametrosId: int):
         """Retorna todos as estilos vinculadas a um parametro"""
-        cur = self.__db.cursor()
-        cur.execute("""
-            SELECT e.*
-            FROM estiloDanca e
-            INNER JOIN parametro_estilo pe ON e.id = pd.estilo_id
-            WHERE pd.parametro_id = ?
-            ORDER BY e.nome;
-        """, (parametrosId,))
+        with self.__db.usarCursor() as cur:
+            cur.execute("""
+                SELECT e.*
+                FROM estiloDanca e
+                INNER JOIN parametro_estilo pe ON e.id = pe.estilo_id
+                WHERE pe.parametro_id = ?
+                ORDER BY e.nome;
+            """, (parametrosId,))
         
-        rows = cur.fetchall()
-        resultado = []
+            rows = cur.fetchall()
+            resultado = []
+            for row in rows:
+                resultado.append(self.__estiloDancaDao.criarDeRow(row))
+            return resultado
+    
+    # Modelos de ficha: parâmetros aplicáveis a (nível, estilo, tipo de condução)
+    
+    def modeloFicha(self, nivelId: int, estiloId: int, tipoConducao: str):
+        """Parâmetros de uma ficha de avaliação, em ordem de nome: os do nível, vinculados ao
+        estilo (parametro_estilo) e do tipo de condução (sem diferenciar maiúsculas), mais os
+        sem tipo de condução, que valem para todos.
+        Vem do cache da sessão; os objetos são compartilhados, não os altere."""
+        modelos = self.__db.cacheSessao(CACHE_MODELOS_FICHA, self.__carregarModelos)
+        chave = (nivelId, estiloId, (tipoConducao or '').lower())
+        return modelos.get(chave) or modelos.get((nivelId, estiloId, None), ())
+    
+    def __carregarModelos(self):
+        # Todos os modelos de uma vez: uma consulta, depois só buscas no dicionário
+        with self.__db.usarCursor() as cur:
+            cur.execute("""
+                SELECT p.*, pe.estilo_id AS estilo_vinculado
+                FROM parametros p
+                INNER JOIN parametro_estilo pe ON p.id = pe.parametro_id
+                ORDER BY p.nome, p.id;
+            """)
+            rows = cur.fetchall()
+        
+        # Chave (nível, estilo, tipo); os parâmetros sem tipo de condução ficam em tipo None
+        modelos = {}
         for row in rows:
-            resultado.append(self.criarDeRow(row))
-        return resultado
\ No newline at end of file
+            tipo = row['tipoConducao'].lower() if row['tipoConducao'] is not None else None
+            modelos.setdefault((row['nivel_id'], row['estilo_vinculado'], tipo), []).append(self.criarDeRow(row))
+        
+        # Cada tipo já leva junto os parâmetros que valem para todos, na mesma ordem da consulta
+        for (nivelId, estiloId, tipo), parametros in modelos.items():
+            gerais = modelos.get((nivelId, estiloId, None))
+            if tipo is not None and gerais:
+                parametros.extend(gerais)
+                parametros.sort(key=lambda p: (p.nome, p.id))
+        return {chave: tuple(parametros) for chave, parametros in modelos.items()}
+    
+    def __invalidarModelos(self):
+        # Qualquer escrita em parametros/parametro_estilo pode mudar os modelos; o cache é
+        # compartilhado entre threads, então só é descartado depois do COMMIT
+        self.__db.aoConfirmar(lambda: self.__db.invalidarCaches(CACHE_MODELOS_FICHA))
+    
+    # Índice de bits parametro x estilo (dao/mascara_estilos.py)
+    
+    def mascaraEstilos(self):
+        """Índice em memória de parametro_estilo (uma máscara de bits por estilo), carregado
+        de uma vez e atualizado pelas escritas deste DAO. Ex.:
+        mascaraEstilos().parametrosDe(1, 2, todos=True), mascaraEstilos().estilosQueCompartilham(1)"""
+        return self.__db.cacheSessao(CACHE_MASCARA_ESTILOS, lambda: MascaraEstilos.carregar(self.__db))
+    
+    def __atualizarMascara(self, alterar):
+        # Só depois do COMMIT (as outras threads não podem ver vínculos não confirmados).
+        # Índice já carregado: aplica a mudança no lugar. Senão descarta uma carga em
+        # andamento (que pode ter lido antes desta escrita); a próxima já lê a mudança.
+        def aplicar():
+            mascara = self.__db.cacheCarregado(CACHE_MASCARA_ESTILOS)
+            if mascara is not None:
+                alterar(mascara)
+            else:
+                self.__db.invalidarCaches(CACHE_MASCARA_ESTILOS)
+        self.__db.aoConfirmar(aplicar)
\ No newline at end of file
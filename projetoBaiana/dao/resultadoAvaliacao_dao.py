@@ -0,0 +1,92 @@
+"""
+DAO (Data Access Object) para a tabela resultadoAvaliacao: a nota final de cada avaliação,
+calculada no SQLite (média das notas ponderada por parametros.peso) e mantida em dia pelos
+gatilhos da migração 8, que aplicam só a diferença de cada item. Ler um resultado é uma
+busca pela chave primária.
+"""
+
+from bd.database import DatabaseConnection
+from bd.migracoes import recalcularResultado
+from dao.avaliacao_dao import AvaliacaoDAO
+from model.referencia import Referencia
+from model.resultadoAvaliacao_class import ResultadoAvaliacao
+
+class ResultadoAvaliacaoDAO:
+    def __init__(self, db: DatabaseConnection):
+        self.__db = db
+        self.__avaliacaoDao = AvaliacaoDAO(db)
+    
+    def buscarPorAvaliacao(self, avaliacaoId: int):
+        """Resultado da avaliação (None se ela ainda não tem notas)"""
+        with self.__db.usarCursor() as cur:
+            cur.execute("SELECT * FROM resultadoAvaliacao WHERE avaliacao_id = ?;", (avaliacaoId,))
+            row = cur.fetchone()
+        
+            if row:
+                return self.criarDeRow(row)
+            return None
+    
+    def media(self, avaliacaoId: int):
+        """Só a nota final da avaliação (None se não há notas), sem montar objetos"""
+        with self.__db.usarCursor() as cur:
+            cur.execute("SELECT media FROM resultadoAvaliacao WHERE avaliacao_id = ?;", (avaliacaoId,))
+            row = cur.fetchone()
+            return row['media'] if row else None
+    
+    def listarPorAluno(self, alunoId: int):
+        """Resultados de todas as avaliações do aluno, da mais recente para a mais antiga"""
+        with self.__db.usarCursor() as cur:
+            cur.execute("""
+                SELECT r.*
+                FROM avaliacao a
+                JOIN resultadoAvaliacao r ON r.avaliacao_id = a.id
+                WHERE a.aluno_id = ?
+                ORDER BY a.data DESC;
+            """, (alunoId,))
+            rows = cur.fetchall()
+        
+            resultado = []
+            for row in rows:
+                resultado.append(self.criarDeRow(row))
+            return resultado
+    
+    def classificacao(self, eventoId: int, nivelId: int | None = None, limite: int = -1):
+        """Resultados de um evento (e nível) da maior para a menor média"""
+        sql = """
+            SELECT r.*
+            FROM avaliacao a
+            JOIN resultadoAvaliacao r ON r.avaliacao_id = a.id
+            WHERE a.evento_id = ?
+        """
+        parametros = [eventoId]
+        if nivelId is not None:
+            sql += " AND a.nivel_id = ?"
+            parametros.append(nivelId)
+        sql += " ORDER BY r.media DESC LIMIT ?;"
+        parametros.append(limite)
+        
+        with self.__db.usarCursor() as cur:
+            cur.execute(sql, parametros)
+            rows = cur.fetchall()
+        
+            resultado = []
+            for row in rows:
+                resultado.append(self.criarDeRow(row))
+            return resultado
+    
+    def recalcular(self):
+        """Refaz a tabela inteira a partir de itemAvaliacao: reparo e conferência de
+        consistência (os gatilhos já a mantêm em dia). Retorna quantas linhas ficaram."""
+        with self.__db.transacao() as conn:
+            for instrucao in recalcularResultado("IS NOT NULL"):
+                conn.execute(instrucao)
+            return conn.execute("SELECT COUNT(*) FROM resultadoAvaliacao;").fetchone()[0]
+    
+    def criarDeRow(self, row):
+        return ResultadoAvaliacao(
+            avaliacao=Referencia(row['avaliacao_id'], self.__avaliacaoDao.buscarPorId),
+            quantidade=row['quantidade'],
+            somaPesos=row['somaPesos'],
+            somaPonderada=row['somaPonderada'],
+            media=row['media']
+        )
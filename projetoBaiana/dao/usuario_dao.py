@@ -4,71 +4,154 @@ DAO (Data Access Object) para operações de banco de dados da tabela usuario
 
 from bd.database import DatabaseConnection
 from dao.aluno_dao import AlunoDAO
+from dao.paginacao import LIMITE_PAGINA, TAMANHO_LOTE, iterarLotes
+from dao.consulta import Consulta
+from dao import existencia
+from dao.atualizacao import atualizar, atualizarVarios
 from model.usuario_class import Usuario
 
+# Propriedade do modelo -> coluna: salvar() grava só as alteradas (ver dao/atualizacao.py)
+COLUNAS = {'login': 'login', 'senha': 'senha', 'tipo': 'tipo'}
+
 class UsuarioDAO:
     def __init__(self, db: DatabaseConnection):
         self.__db = db
     
     def salvar(self, usuario: Usuario):
-        cur = self.__db.cursor()
+        with self.__db.usarCursor() as cur:
+            alunoId = usuario.aluno.id
         
-        alunoId = usuario.aluno.id
+            if usuario.id is None:
+                # INSERT - o id do usuário é o mesmo id do aluno (relacionamento 1:1)
+                cur.execute("""
+                    INSERT INTO usuario (id, login, senha, tipo)
+                    VALUES (?, ?, ?, ?);
+                """, (alunoId, usuario.login, usuario.senha, usuario.tipo))
+            
+                usuario.id = alunoId
+                usuario.limparAlteracoes()
+            else:
+                # UPDATE: só as colunas alteradas (nenhuma instrução se nada mudou)
+                atualizar(cur, 'usuario', usuario, COLUNAS)
         
-        if usuario.id is None:
-            # INSERT - o id do usuário é o mesmo id do aluno (relacionamento 1:1)
-            cur.execute("""
+            return usuario.id
+    
+    def salvarVarios(self, usuarios):
+        """Insere os novos e atualiza os existentes numa única transação (executemany).
+        Retorna os ids na mesma ordem de entrada."""
+        usuarios = list(usuarios)
+        novos = [u for u in usuarios if u.id is None]
+        existentes = [u for u in usuarios if u.id is not None]
+        
+        with self.__db.transacao():
+            # O id do usuário é o mesmo id do aluno (relacionamento 1:1), nada a gerar
+            self.__db.executarVarios("""
                 INSERT INTO usuario (id, login, senha, tipo)
                 VALUES (?, ?, ?, ?);
-            """, (alunoId, usuario.login, usuario.senha, usuario.tipo))
+            """, [(u.aluno.id, u.login, u.senha, u.tipo) for u in novos])
+            for u in novos:
+                u.id = u.aluno.id
+                u.limparAlteracoes()
             
-            usuario.id = alunoId
-        else:
-            # UPDATE
+            atualizarVarios(self.__db, 'usuario', existentes, COLUNAS)
+        
+        return [u.id for u in usuarios]
+    
+    def inserirSeNovo(self, usuario: Usuario):
+        """Insere o usuário numa única instrução atômica (sem SELECT antes).
+        Retorna True se foi criado; False se o aluno já tem usuário ou o login já existe."""
+        with self.__db.usarCursor() as cur:
+            # O id do usuário é o mesmo id do aluno (relacionamento 1:1)
             cur.execute("""
-                UPDATE usuario SET login = ?, senha = ?, tipo = ?
-                WHERE id = ?;
-            """, (usuario.login, usuario.senha, usuario.tipo, usuario.id))
+                INSERT INTO usuario (id, login, senha, tipo)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT DO NOTHING
+                RETURNING id;
+            """, (usuario.aluno.id, usuario.login, usuario.senha, usuario.tipo))
+            row = cur.fetchone()
         
-        return usuario.id
+            if row is None:
+                return False
+            usuario.id = row['id']
+            usuario.limparAlteracoes()
+            return True
     
     def buscarPorId(self, id: int):
-        cur = self.__db.cursor()
-        cur.execute("SELECT * FROM usuario WHERE id = ?;", (id,))
-        row = cur.fetchone()
+        with self.__db.usarCursor() as cur:
+            cur.execute("SELECT * FROM usuario WHERE id = ?;", (id,))
+            row = cur.fetchone()
         
-        if row:
-            return self.criarDeRow(row)
-        return None
+            if row:
+                return self.criarDeRow(row)
+            return None
     
     def buscarPorLogin(self, login: str):
-        cur = self.__db.cursor()
-        cur.execute("SELECT * FROM usuario WHERE login = ?;", (login,))
-        row = cur.fetchone()
+        with self.__db.usarCursor() as cur:
+            cur.execute("SELECT * FROM usuario WHERE login = ?;", (login,))
+            row = cur.fetchone()
         
-        if row:
-            return self.criarDeRow(row)
-        return None
+            if row:
+                return self.criarDeRow(row)
+            return None
     
     def buscarPorAlunoId(self, alunoId: int):
-        cur = self.__db.cursor()
-        # O id do usuário é o mesmo id do aluno (relacionamento 1:1)
-        cur.execute("SELECT * FROM usuario WHERE id = ?;", (alunoId,))
-        row = cur.fetchone()
+        with self.__db.usarCursor() as cur:
+            # O id do usuário é o mesmo id do aluno (relacionamento 1:1)
+            cur.execute("SELECT * FROM usuario WHERE id = ?;", (alunoId,))
+            row = cur.fetchone()
         
-        if row:
-            return self.criarDeRow(row)
-        return None
+            if row:
+                return self.criarDeRow(row)
+            return None
     
     def listarTodos(self):
-        cur = self.__db.cursor()
-        cur.execute("SELECT * FROM usuario ORDER BY login;")
-        rows = cur.fetchall()
+        with self.__db.usarCursor() as cur:
+            cur.execute("SELECT * FROM usuario ORDER BY login;")
+            rows = cur.fetchall()
+        
+            # Alunos (e seus niveis) da página inteira em lote, em vez de um buscarPorId por usuário
+            alunos = AlunoDAO(self.__db).buscarPorIds(row['id'] for row in rows)
         
-        resultado = []
-        for row in rows:
-            resultado.append(self.criarDeRow(row))
-        return resultado
+            resultado = []
+            for row in rows:
+                resultado.append(self.__montar(row, alunos.get(row['id'])))
+            return resultado
+    
+    def iterar(self, tamanhoLote: int = TAMANHO_LOTE):
+        """Mesmo conteúdo e ordem de listarTodos(), mas gerado aos poucos (fetchmany).
+        Os alunos são carregados em lote a cada bloco de linhas."""
+        alunoDao = AlunoDAO(self.__db)
+        for lote in iterarLotes(self.__db, "SELECT * FROM usuario ORDER BY login;", (), tamanhoLote):
+            alunos = alunoDao.buscarPorIds(row['id'] for row in lote)
+            for row in lote:
+                yield self.__montar(row, alunos.get(row['id']))
+    
+    def pagina(self, aposId: int = 0, limite: int = LIMITE_PAGINA):
+        """Página por keyset: até `limite` usuários com id > aposId, em ordem de id.
+        Para a próxima página passe o id do último usuário recebido."""
+        with self.__db.usarCursor() as cur:
+            cur.execute("SELECT * FROM usuario WHERE id > ? ORDER BY id LIMIT ?;", (aposId, limite))
+            rows = cur.fetchall()
+        
+            alunos = AlunoDAO(self.__db).buscarPorIds(row['id'] for row in rows)
+        
+            resultado = []
+            for row in rows:
+                resultado.append(self.__montar(row, alunos.get(row['id'])))
+            return resultado
+    
+    def consulta(self):
+        """Consulta composta sobre usuario, ex.:
+        consulta().selecionar('id', 'login').ordenarPor('login').registros()"""
+        return Consulta(self.__db, 'usuario', fabrica=self.criarDeRow)
+    
+    def existe(self, campo: str, valor):
+        """True se há usuário com campo = valor (uma linha lida, nenhum objeto montado)"""
+        return existencia.existe(self.__db, 'usuario', campo, valor)
+    
+    def contar(self, filtros: dict | None = None):
+        """Quantidade de usuários que atendem a todos os filtros {campo: valor}"""
+        return existencia.contar(self.__db, 'usuario', filtros)
     
     def criarDeRow(self, row):
         # Buscar a aluno usando o AlunoDAO
@@ -76,6 +159,9 @@ class UsuarioDAO:
         alunoDao = AlunoDAO(self.__db)
         aluno = alunoDao.buscarPorId(row['id'])
         
+        return self.__montar(row, aluno)
+    
+    def __montar(self, row, aluno):
         return Usuario(
             id=row['id'],
             login=row['login'],
@@ -85,8 +171,8 @@ class UsuarioDAO:
         )
     
     def deletar(self, usuario: Usuario):
-        cur = self.__db.cursor()
-        cur.execute("DELETE FROM usuario WHERE id = ?;", (usuario.id,))
+        with self.__db.usarCursor() as cur:
+            cur.execute("DELETE FROM usuario WHERE id = ?;", (usuario.id,))
         
-        return cur.rowcount > 0
+            return cur.rowcount > 0
 
@@ -1,7 +1,11 @@
 from model.nivel_class import Nivel
 from model.parametros_class import Parametros
+from model.rastreavel import Rastreavel
+
+class Aluno(Rastreavel):
+  # Sem __dict__ por instância: os alunos são carregados aos milhares nas listagens
+  __slots__ = ('__id', '__nome', '__contato', '__nivel', '__tipoConducao', '__ativo')
 
-class Aluno:
   def __init__(self, id: int, nome: str, contato: str, nivel: Nivel, tipoConducao: Parametros, ativo: bool = True):
     self.__id = id
     self.__nome = nome
@@ -24,7 +28,7 @@ class Aluno:
   
   @nome.setter
   def nome(self, value):
-    self.__nome = value
+    self.__nome = self._alterar('nome', self.__nome, value)
   
   @property
   def contato(self):
@@ -32,7 +36,7 @@ class Aluno:
   
   @contato.setter
   def contato(self, value):
-    self.__contato = value
+    self.__contato = self._alterar('contato', self.__contato, value)
   
   @property
   def nivel(self):
@@ -40,7 +44,7 @@ class Aluno:
   
   @nivel.setter
   def nivel(self, value):
-    self.__nivel = value
+    self.__nivel = self._alterar('nivel', self.__nivel, value)
 
   @property
   def tipoConducao(self):
@@ -48,7 +52,7 @@ class Aluno:
   
   @tipoConducao.setter
   def tipoConducao(self, value):
-    self.__tipoConducao = value
+    self.__tipoConducao = self._alterar('tipoConducao', self.__tipoConducao, value)
 
   @property
   def ativo(self):
@@ -56,7 +60,7 @@ class Aluno:
   
   @ativo.setter
   def ativo(self, value):
-    self.__ativo = value
+    self.__ativo = self._alterar('ativo', self.__ativo, value)
 
   def __str__(self):
     return (f"Aluno(id={self.__id}, nome='{self.__nome}', tipoConducao='{self.__tipoConducao}', "
@@ -2,8 +2,11 @@ from model.examinador_class import Examinador
 from model.aluno_class import Aluno
 from model.nivel_class import Nivel
 from model.evento_class import Evento
+from model.rastreavel import Rastreavel
+
+class Avaliacao(Rastreavel):
+  __slots__ = ('__id', '__data', '__examinador', '__aluno', '__nivel', '__evento', '__obs')
 
-class Avaliacao:
   def __init__(self, id: int, data: str, examinador: Examinador, aluno: Aluno, nivel: Nivel, evento: Evento, obs: str | None = None):
     self.__id = id
     self.__data = data
@@ -27,7 +30,7 @@ class Avaliacao:
   
   @data.setter
   def data(self, value):
-    self.__data = value
+    self.__data = self._alterar('data', self.__data, value)
 
   @property
   def examinador(self):
@@ -35,7 +38,7 @@ class Avaliacao:
   
   @examinador.setter
   def examinador(self, value):
-    self.__examinador = value
+    self.__examinador = self._alterar('examinador', self.__examinador, value)
   
   @property
   def aluno(self):
@@ -43,7 +46,7 @@ class Avaliacao:
   
   @aluno.setter
   def aluno(self, value):
-    self.__aluno = value
+    self.__aluno = self._alterar('aluno', self.__aluno, value)
   
   @property
   def nivel(self):
@@ -51,7 +54,7 @@ class Avaliacao:
   
   @nivel.setter
   def nivel(self, value):
-    self.__nivel = value
+    self.__nivel = self._alterar('nivel', self.__nivel, value)
   
   @property
   def evento(self):
@@ -59,7 +62,7 @@ class Avaliacao:
   
   @evento.setter
   def evento(self, value):
-    self.__evento = value
+    self.__evento = self._alterar('evento', self.__evento, value)
 
   @property
   def obs(self):
@@ -67,7 +70,7 @@ class Avaliacao:
   
   @obs.setter
   def obs(self, value):
-    self.__obs = value
+    self.__obs = self._alterar('obs', self.__obs, value)
 
   def __str__(self):
     return (f"Avaliacao(id={self.__id}, data='{self.__data}', examinador='{self.__examinador}', aluno='{self.__aluno}', evento='{self.__evento}', aluno='{self.__aluno}', nivel='{self.__nivel}')")
\ No newline at end of file
@@ -1,4 +1,6 @@
-class EstiloDanca:
+from model.rastreavel import Rastreavel
+
+class EstiloDanca(Rastreavel):
   def __init__(self, id: int, nome: str):
     self.__id = id
     self.__nome = nome
@@ -17,7 +19,7 @@ class EstiloDanca:
   
   @nome.setter
   def nome(self, value):
-    self.__nome = value
+    self.__nome = self._alterar('nome', self.__nome, value)
 
   def __str__(self):
     return (f"Evento(id={self.__id}, nome='{self.__nome}')")
\ No newline at end of file
@@ -1,4 +1,6 @@
-class Evento:
+from model.rastreavel import Rastreavel
+
+class Evento(Rastreavel):
   def __init__(self, id: int, nome: str, dataEvento: str, homenageado: str):
     self.__id = id
     self.__nome = nome
@@ -19,7 +21,7 @@ class Evento:
   
   @nome.setter
   def nome(self, value):
-    self.__nome = value
+    self.__nome = self._alterar('nome', self.__nome, value)
   
   @property
   def dataEvento(self):
@@ -27,7 +29,7 @@ class Evento:
   
   @dataEvento.setter
   def dataEvento(self, value):
-    self.__dataEvento = value
+    self.__dataEvento = self._alterar('dataEvento', self.__dataEvento, value)
   
   @property
   def homenageado(self):
@@ -35,7 +37,7 @@ class Evento:
   
   @homenageado.setter
   def homenageado(self, value):
-    self.__homenageado = value
+    self.__homenageado = self._alterar('homenageado', self.__homenageado, value)
 
   def __str__(self):
     return (f"Evento(id={self.__id}, nome='{self.__nome}', dataEvento='{self.__dataEvento}', homenageado='{self.__homenageado}')")
\ No newline at end of file
@@ -1,4 +1,6 @@
-class Examinador:
+from model.rastreavel import Rastreavel
+
+class Examinador(Rastreavel):
   def __init__(self, id: int, nome: str, contato: str):
     self.__id = id
     self.__nome = nome
@@ -18,7 +20,7 @@ class Examinador:
   
   @nome.setter
   def nome(self, value):
-    self.__nome = value
+    self.__nome = self._alterar('nome', self.__nome, value)
 
   @property
   def contato(self):
@@ -26,7 +28,7 @@ class Examinador:
   
   @contato.setter
   def contato(self, value):
-    self.__contato = value
+    self.__contato = self._alterar('contato', self.__contato, value)
 
   def __str__(self):
     return (f"Evento(id={self.__id}, nome='{self.__nome}', contato='{self.__contato}')")
\ No newline at end of file
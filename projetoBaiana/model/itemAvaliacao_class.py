@@ -1,7 +1,11 @@
-from parametros_class import Parametros
-from avaliacao_class import Avaliacao
+from model.parametros_class import Parametros
+from model.avaliacao_class import Avaliacao
+from model.rastreavel import Rastreavel
+
+class ItemAvaliacao(Rastreavel):
+  # Centenas de milhares de itens em memória nos relatórios de temporada: sem __dict__
+  __slots__ = ('__id', '__parametro', '__avaliacao', '__nota')
 
-class ItemAvaliacao:
   def __init__(self, id: int, parametro: Parametros, avaliacao: Avaliacao, nota: int):
     self.__id = id
     self.__parametro = parametro
@@ -22,15 +26,7 @@ class ItemAvaliacao:
   
   @parametro.setter
   def parametro(self, value):
-    self.__parametro = value
-
-  @property
-  def parametro(self):
-    return self.__parametro
-  
-  @parametro.setter
-  def parametro(self, value):
-    self.__parametro = value
+    self.__parametro = self._alterar('parametro', self.__parametro, value)
 
   @property
   def avaliacao(self):
@@ -38,7 +34,7 @@ class ItemAvaliacao:
   
   @avaliacao.setter
   def avaliacao(self, value):
-    self.__avaliacao = value
+    self.__avaliacao = self._alterar('avaliacao', self.__avaliacao, value)
 
   @property
   def nota(self):
@@ -46,7 +42,7 @@ class ItemAvaliacao:
   
   @nota.setter
   def nota(self, value):
-    self.__nota = value
+    self.__nota = self._alterar('nota', self.__nota, value)
 
   def __str__(self):
     return (f"ItemAvaliacao(id={self.__id}, parametro='{self.__parametro}', avaliacao='{self.__avaliacao}', nota='{self.__nota}')")
@@ -1,7 +1,9 @@
-class Nivel():
+from model.rastreavel import Rastreavel
+
+class Nivel(Rastreavel):
   def __init__(self, id: int, nome: str):
-    self.id = id
-    self.nome = nome
+    self.__id = id
+    self.__nome = nome
 
   @property
   def id(self):
@@ -17,7 +19,7 @@ class Nivel():
   
   @nome.setter
   def nome(self, value):
-    self.__nome = value
+    self.__nome = self._alterar('nome', self.__nome, value)
   
   def __str__(self):
     return f"Nivel(id={self.__id}, nome='{self.__nome}')"
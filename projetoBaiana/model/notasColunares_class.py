@@ -0,0 +1,145 @@
+"""
+Notas da tabela itemAvaliacao em colunas paralelas (avaliacao_id, parametro_id, nota):
+estatísticas de temporada sem montar um ItemAvaliacao por linha.
+
+As colunas são array('i'); com NumPy instalado os kernels usam vetores NumPy sobre o
+mesmo buffer (sem cópia), sem NumPy usam Python puro.
+"""
+from array import array
+from math import floor, sqrt
+
+try:
+  import numpy as np
+except ImportError:
+  # NumPy é opcional
+  np = None
+
+# Chaves aceitas em agruparPor
+CHAVES = ('avaliacao', 'parametro')
+
+class NotasColunares:
+  __slots__ = ('__avaliacoes', '__parametros', '__notas', '__numpy')
+
+  def __init__(self, avaliacoes: array, parametros: array, notas: array, usarNumpy: bool | None = None):
+    """Colunas do mesmo tamanho; usarNumpy=None usa NumPy se estiver instalado"""
+    if not len(avaliacoes) == len(parametros) == len(notas):
+      raise ValueError("Colunas de tamanhos diferentes")
+    if usarNumpy and np is None:
+      raise ValueError("NumPy não está instalado")
+
+    self.__numpy = np is not None if usarNumpy is None else usarNumpy
+    if self.__numpy:
+      avaliacoes, parametros, notas = (np.frombuffer(c, dtype=np.intc) for c in (avaliacoes, parametros, notas))
+    self.__avaliacoes = avaliacoes
+    self.__parametros = parametros
+    self.__notas = notas
+
+  @property
+  def avaliacoes(self):
+    return self.__avaliacoes
+
+  @property
+  def parametros(self):
+    return self.__parametros
+
+  @property
+  def notas(self):
+    return self.__notas
+
+  @property
+  def usaNumpy(self):
+    return self.__numpy
+
+  def __len__(self):
+    return len(self.__notas)
+
+  def __chaves(self, agruparPor: str):
+    if agruparPor not in CHAVES:
+      raise ValueError(f"Agrupamento desconhecido: '{agruparPor}' (use {', '.join(CHAVES)})")
+    return self.__avaliacoes if agruparPor == 'avaliacao' else self.__parametros
+
+  def __grupos(self, agruparPor: str):
+    """{chave: notas do grupo}, na ordem crescente das chaves"""
+    chaves = self.__chaves(agruparPor)
+    if self.__numpy:
+      ordem = np.argsort(chaves, kind='stable')
+      unicas, inicios = np.unique(chaves[ordem], return_index=True)
+      return dict(zip(unicas.tolist(), np.split(self.__notas[ordem], inicios[1:])))
+
+    grupos = {}
+    for chave, nota in zip(chaves, self.__notas):
+      grupos.setdefault(chave, []).append(nota)
+    return dict(sorted(grupos.items()))
+
+  def __somas(self, agruparPor: str):
+    """{chave: (quantidade, soma, soma dos quadrados)} numa passada só, em inteiros exatos"""
+    if self.__numpy:
+      chaves = self.__chaves(agruparPor)
+      notas = self.__notas.astype(np.int64)
+      unicas, indices, quantidades = np.unique(chaves, return_inverse=True, return_counts=True)
+      somas = np.bincount(indices, weights=notas, minlength=len(unicas))
+      quadrados = np.bincount(indices, weights=notas * notas, minlength=len(unicas))
+      return {chave: (q, int(s), int(s2)) for chave, q, s, s2
+              in zip(unicas.tolist(), quantidades.tolist(), somas.tolist(), quadrados.tolist())}
+
+    acumulado = {}
+    for chave, nota in zip(self.__chaves(agruparPor), self.__notas):
+      q, s, s2 = acumulado.get(chave, (0, 0, 0))
+      acumulado[chave] = (q + 1, s + nota, s2 + nota * nota)
+    return dict(sorted(acumulado.items()))
+
+  @staticmethod
+  def __media(quantidade, soma, _quadrados):
+    return soma / quantidade
+
+  @staticmethod
+  def __desvio(quantidade, soma, quadrados):
+    # Desvio padrão populacional; a variância sai exata das somas inteiras
+    return sqrt((quantidade * quadrados - soma * soma) / (quantidade * quantidade))
+
+  def __total(self):
+    if self.__numpy:
+      notas = self.__notas.astype(np.int64)
+      return len(notas), int(notas.sum()), int((notas * notas).sum())
+    return len(self.__notas), sum(self.__notas), sum(n * n for n in self.__notas)
+
+  def __estatistica(self, funcao, agruparPor: str | None):
+    if agruparPor is None:
+      total = self.__total()
+      return funcao(*total) if total[0] else None
+    return {chave: funcao(*somas) for chave, somas in self.__somas(agruparPor).items()}
+
+  def quantidade(self, agruparPor: str | None = None):
+    """Quantidade de notas (ou {chave: quantidade} com agruparPor='avaliacao'/'parametro')"""
+    if agruparPor is None:
+      return len(self)
+    return {chave: somas[0] for chave, somas in self.__somas(agruparPor).items()}
+
+  def media(self, agruparPor: str | None = None):
+    """Média das notas (None se vazio), ou {chave: média} por avaliação/parâmetro"""
+    return self.__estatistica(self.__media, agruparPor)
+
+  def desvioPadrao(self, agruparPor: str | None = None):
+    """Desvio padrão populacional das notas, ou {chave: desvio} por avaliação/parâmetro"""
+    return self.__estatistica(self.__desvio, agruparPor)
+
+  def percentil(self, p: float, agruparPor: str | None = None):
+    """Percentil p (0 a 100) com interpolação linear, como o padrão do NumPy"""
+    if not 0 <= p <= 100:
+      raise ValueError("Percentil deve estar entre 0 e 100")
+    if agruparPor is None:
+      return self.__percentil(self.__notas, p) if len(self) else None
+    return {chave: self.__percentil(notas, p) for chave, notas in self.__grupos(agruparPor).items()}
+
+  def __percentil(self, notas, p: float):
+    if self.__numpy:
+      return float(np.percentile(notas, p))
+
+    ordenadas = sorted(notas)
+    posicao = (len(ordenadas) - 1) * p / 100
+    abaixo = floor(posicao)
+    acima = min(abaixo + 1, len(ordenadas) - 1)
+    return ordenadas[abaixo] + (ordenadas[acima] - ordenadas[abaixo]) * (posicao - abaixo)
+
+  def __str__(self):
+    return f"NotasColunares({len(self)} notas, {'NumPy' if self.__numpy else 'array'})"
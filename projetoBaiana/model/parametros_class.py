@@ -1,13 +1,15 @@
 from model.nivel_class import Nivel
 from model.estiloDanca_class import EstiloDanca
+from model.rastreavel import Rastreavel
 
-class Parametros:
-  def __init__(self, id: int, nome: str, tipoConducao: str, estilo: EstiloDanca, nivel: Nivel):
+class Parametros(Rastreavel):
+  def __init__(self, id: int, nome: str, tipoConducao: str, estilo: EstiloDanca, nivel: Nivel, peso: float = 1.0):
     self.__id = id
     self.__nome = nome
     self.__tipoConducao = tipoConducao
     self.__estilo = estilo
     self.__nivel = nivel
+    self.__peso = peso
 
   @property
   def id(self):
@@ -23,7 +25,7 @@ class Parametros:
   
   @nome.setter
   def nome(self, value):
-    self.__nome = value
+    self.__nome = self._alterar('nome', self.__nome, value)
 
   @property
   def tipoConducao(self):
@@ -31,7 +33,7 @@ class Parametros:
   
   @tipoConducao.setter
   def tipoConducao(self, value):
-    self.__tipoConducao = value
+    self.__tipoConducao = self._alterar('tipoConducao', self.__tipoConducao, value)
 
   @property
   def estilo(self):
@@ -39,7 +41,7 @@ class Parametros:
   
   @estilo.setter
   def estilo(self, value):
-    self.__estilo = value
+    self.__estilo = self._alterar('estilo', self.__estilo, value)
 
   @property
   def nivel(self):
@@ -47,7 +49,16 @@ class Parametros:
   
   @nivel.setter
   def nivel(self, value):
-    self.__nivel = value
+    self.__nivel = self._alterar('nivel', self.__nivel, value)
+
+  @property
+  def peso(self):
+    # Peso do parâmetro na média ponderada da avaliação (ver dao/resultadoAvaliacao_dao.py)
+    return self.__peso
+  
+  @peso.setter
+  def peso(self, value):
+    self.__peso = self._alterar('peso', self.__peso, value)
 
   def __str__(self):
-    return (f"Parametros(id={self.__id}, nome='{self.__nome}', tipoConducao='{self.__tipoConducao}', estilo='{self.__estilo}', nivel='{self.__nivel}')")
\ No newline at end of file
+    return (f"Parametros(id={self.__id}, nome='{self.__nome}', tipoConducao='{self.__tipoConducao}', estilo='{self.__estilo}', nivel='{self.__nivel}', peso={self.__peso})")
\ No newline at end of file
@@ -0,0 +1,30 @@
+"""
+Rastreamento de alterações dos modelos: os setters marcam as propriedades que mudaram
+e os DAOs gravam só essas colunas (ou nada, se nada mudou)
+"""
+
+class Rastreavel:
+  # Slot vazio até a primeira alteração; permite que os modelos com __slots__ herdem daqui
+  __slots__ = ('_alterados',)
+
+  def _alterar(self, campo: str, atual, novo):
+    """Usado nos setters: marca `campo` como alterado se o valor realmente mudou"""
+    if novo is not atual and novo != atual:
+      self.__pendentes().add(campo)
+    return novo
+
+  def __pendentes(self):
+    try:
+      return self._alterados
+    except AttributeError:
+      self._alterados = set()
+      return self._alterados
+
+  @property
+  def alterados(self):
+    """Propriedades alteradas desde a última leitura/gravação"""
+    return frozenset(self.__pendentes())
+
+  def limparAlteracoes(self):
+    """Chamado pelo DAO depois de gravar: o objeto volta a refletir o banco"""
+    self.__pendentes().clear()
@@ -0,0 +1,55 @@
+"""
+Referência preguiçosa a um objeto relacionado (ex.: Avaliacao.aluno): guarda só o id
+e carrega o objeto na primeira vez que um atributo dele é acessado
+"""
+
+class Referencia:
+  __slots__ = ('_id', '_carregar', '_alvo', '_carregada')
+
+  def __init__(self, id: int, carregar):
+    # carregar(id) -> objeto; normalmente o buscarPorId do DAO (que usa o mapa de identidade)
+    self._id = id
+    self._carregar = carregar
+    self._alvo = None
+    self._carregada = False
+
+  @property
+  def id(self):
+    # O id já está na linha: ler referencia.id nunca vai ao banco
+    return self._id
+
+  @property
+  def carregada(self):
+    return self._carregada
+
+  def resolver(self):
+    """Retorna o objeto relacionado, carregando-o na primeira chamada"""
+    if not self._carregada:
+      self._alvo = self._carregar(self._id)
+      self._carregada = True
+    return self._alvo
+
+  def preencher(self, alvo):
+    """Entrega o objeto já carregado por fora (prefetch), sem consulta"""
+    self._alvo = alvo
+    self._carregada = True
+
+  def __getattr__(self, nome):
+    # Só é chamado para atributos que a Referencia não tem: delega ao objeto real
+    alvo = self.resolver()
+    if alvo is None:
+      raise AttributeError(f"Registro relacionado com id={self._id} não existe (atributo '{nome}')")
+    return getattr(alvo, nome)
+
+  def __eq__(self, outro):
+    return getattr(outro, 'id', outro) == self._id
+
+  def __hash__(self):
+    return hash(self._id)
+
+  def __str__(self):
+    return str(self.resolver())
+
+  def __repr__(self):
+    estado = "carregada" if self._carregada else "não carregada"
+    return f"Referencia(id={self._id}, {estado})"
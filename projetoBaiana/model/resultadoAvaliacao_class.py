@@ -0,0 +1,41 @@
+"""
+Classe modelo para a tabela resultadoAvaliacao: resumo das notas de uma avaliação,
+mantido pelo banco (gatilhos em itemAvaliacao e parametros.peso). Só leitura.
+"""
+from model.avaliacao_class import Avaliacao
+
+class ResultadoAvaliacao:
+  __slots__ = ('__avaliacao', '__quantidade', '__somaPesos', '__somaPonderada', '__media')
+
+  def __init__(self, avaliacao: Avaliacao, quantidade: int, somaPesos: float, somaPonderada: float, media: float | None):
+    self.__avaliacao = avaliacao
+    self.__quantidade = quantidade
+    self.__somaPesos = somaPesos
+    self.__somaPonderada = somaPonderada
+    self.__media = media
+
+  @property
+  def avaliacao(self):
+    return self.__avaliacao
+
+  @property
+  def quantidade(self):
+    # Itens com nota que entraram na média
+    return self.__quantidade
+
+  @property
+  def somaPesos(self):
+    return self.__somaPesos
+
+  @property
+  def somaPonderada(self):
+    return self.__somaPonderada
+
+  @property
+  def media(self):
+    # Média ponderada pelos pesos dos parâmetros (None se a soma dos pesos for 0)
+    return self.__media
+
+  def __str__(self):
+    return (f"ResultadoAvaliacao(avaliacao_id={self.__avaliacao.id}, quantidade={self.__quantidade}, "
+            f"media={self.__media})")
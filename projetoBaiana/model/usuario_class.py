@@ -2,8 +2,11 @@
 Classe modelo para a tabela usuario (relacionamento 1:1 com Aluno)
 """
 from model.aluno_class import Aluno
+from model.rastreavel import Rastreavel
+
+class Usuario(Rastreavel):
+    __slots__ = ('__id', '__login', '__senha', '__tipo', '__aluno')
 
-class Usuario:
     def __init__(self, id: int, login: str, senha: str, tipo: str, aluno: Aluno):
         self.__id = id
         self.__login = login
@@ -25,7 +28,7 @@ class Usuario:
     
     @login.setter
     def login(self, value):
-        self.__login = value
+        self.__login = self._alterar('login', self.__login, value)
     
     @property
     def senha(self):
@@ -33,7 +36,7 @@ class Usuario:
     
     @senha.setter
     def senha(self, value):
-        self.__senha = value
+        self.__senha = self._alterar('senha', self.__senha, value)
     
     @property
     def tipo(self):
@@ -41,7 +44,7 @@ class Usuario:
     
     @tipo.setter
     def tipo(self, value):
-        self.__tipo = value
+        self.__tipo = self._alterar('tipo', self.__tipo, value)
     
     @property
     def aluno(self):
@@ -49,7 +52,7 @@ class Usuario:
     
     @aluno.setter
     def aluno(self, value):
-        self.__aluno = value
+        self.__aluno = self._alterar('aluno', self.__aluno, value)
     
     def __str__(self):
         return (f"Usuario(id={self.__id}, login='{self.__login}', "